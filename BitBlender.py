@@ -1,14 +1,28 @@
 import bpy
+import contextlib
+import asyncio
+import bisect
+import csv
+import hashlib
+import json
+import math
 import socket
+import struct
 import threading
-import speech_recognition as sr
+import time
+import unicodedata
+import wave
+import numpy as np
 import os
-from google.cloud import speech_v1p1beta1 as speech
-from google.oauth2 import service_account
+import random
+import re
+import subprocess
 from mathutils import Vector, Quaternion
-from bpy.props import EnumProperty, PointerProperty, FloatProperty, BoolProperty, StringProperty
+from bpy.props import EnumProperty, PointerProperty, FloatProperty, BoolProperty, StringProperty, IntProperty
 from bpy.types import Operator, Panel, Menu
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 
 bl_info = {
     "description": "Viewport Joystick Navigation with Voice",
@@ -16,283 +30,2990 @@ bl_info = {
     "category": "3D View",
 }
 
+class JoystickState:
+    """Leitura imutável do joystick.
+
+    A thread UDP cria um estado novo a cada pacote e troca a referência
+    `ControllerDevice.state` de uma vez; o modal lê essa referência uma vez por
+    tick e sempre enxerga um pacote inteiro, sem precisar de lock.
+    """
+    __slots__ = ("x", "y", "button", "zoom", "voice", "seq", "device_ms", "timestamp")
+
+    def __init__(self, x=0.0, y=0.0, button=False, zoom=False, voice=False,
+                 seq=None, device_ms=None, timestamp=0.0):
+        set_attr = object.__setattr__
+        set_attr(self, "x", x)
+        set_attr(self, "y", y)
+        set_attr(self, "button", button)
+        set_attr(self, "zoom", zoom)
+        set_attr(self, "voice", voice)
+        set_attr(self, "seq", seq)            # None para pacotes de texto legado
+        set_attr(self, "device_ms", device_ms)
+        set_attr(self, "timestamp", timestamp)  # time.monotonic() da chegada
+
+    def __setattr__(self, name, value):
+        raise AttributeError("JoystickState é imutável")
+
+    def __repr__(self):
+        return (f"JoystickState(x={self.x:.3f}, y={self.y:.3f}, button={self.button}, "
+                f"zoom={self.zoom}, voice={self.voice}, seq={self.seq})")
+
+class InputFilter:
+    """Filtro de um eixo entre o receptor UDP e o modal (sem suavização).
+
+    Subclasses implementam `filter(value, dt)`; para adicionar um filtro novo basta
+    registrá-lo em INPUT_FILTERS.
+    """
+    def __init__(self, smoothing=0.5):
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def filter(self, value, dt):
+        self.value = value
+        return value
+
+class ExponentialFilter(InputFilter):
+    """Suavização exponencial com constante de tempo proporcional a `smoothing`"""
+    def filter(self, value, dt):
+        if self.value is None or self.smoothing <= 0.0:
+            self.value = value
+        else:
+            tau = self.smoothing * 0.2
+            alpha = 1.0 - math.exp(-dt / tau)
+            self.value += alpha * (value - self.value)
+        return self.value
+
+class OneEuroFilter(InputFilter):
+    """Filtro One Euro (Casiez et al.): suaviza parado, responde rápido em movimento"""
+    beta = 0.5
+    derivative_cutoff = 1.0
+
+    def reset(self):
+        self.value = None
+        self.derivative = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filter(self, value, dt):
+        if self.value is None or dt <= 0.0:
+            self.value = value
+            return value
+        derivative = (value - self.value) / dt
+        self.derivative += self._alpha(self.derivative_cutoff, dt) * (derivative - self.derivative)
+        min_cutoff = 0.2 + (1.0 - self.smoothing) * 4.8
+        cutoff = min_cutoff + self.beta * abs(self.derivative)
+        self.value += self._alpha(cutoff, dt) * (value - self.value)
+        return self.value
+
+INPUT_FILTERS = {
+    'NONE': InputFilter,
+    'EXPONENTIAL': ExponentialFilter,
+    'ONE_EURO': OneEuroFilter,
+}
+
+class JoystickInputStage:
+    """Transforma os snapshots de ~10 Hz em uma entrada contínua para o modal.
+
+    Entre pacotes, extrapola cada eixo pela velocidade dos dois últimos pacotes
+    (até `horizon` segundos) e depois passa o valor pelo filtro escolhido. A
+    velocidade usa o relógio da placa: o Wi-Fi entrega pacotes em rajadas, e dois
+    pacotes enviados a 100 ms um do outro podem chegar com 2 ms de diferença. A
+    extrapolação só afasta o eixo do centro: ao soltar o stick (eixo voltando para
+    zero, parado na zona morta ou trocando de sinal) o último valor é mantido, senão
+    a câmera daria um tranco para o lado contrário.
+    """
+    def __init__(self, filter_type='ONE_EURO', smoothing=0.5, horizon=0.1):
+        self.filter_type = filter_type
+        self.horizon = horizon
+        filter_class = INPUT_FILTERS.get(filter_type, InputFilter)
+        self.filters = (filter_class(smoothing), filter_class(smoothing))
+        self.last_state = None
+        self.velocity = (0.0, 0.0)
+
+    def sample(self, state, now, dt):
+        """Retorna (x, y) filtrados para o instante `now` (time.monotonic())"""
+        last = self.last_state
+        if last is not state:
+            if last is not None and state.timestamp > last.timestamp:
+                packet_dt = self._packet_interval(last, state)
+                self.velocity = tuple(0.0 if old * new < 0.0 else (new - old) / packet_dt
+                                      for old, new in ((last.x, state.x), (last.y, state.y)))
+            else:
+                self.velocity = (0.0, 0.0)
+            self.last_state = state
+
+        ahead = min(max(now - state.timestamp, 0.0), self.horizon)
+        x = self._extrapolate(state.x, self.velocity[0], ahead)
+        y = self._extrapolate(state.y, self.velocity[1], ahead)
+        return self.filters[0].filter(x, dt), self.filters[1].filter(y, dt)
+
+    @staticmethod
+    def _packet_interval(last, state):
+        """Segundos entre dois pacotes pelo relógio da placa; sem ele, pela chegada,
+        nunca menos que o intervalo nominal do firmware"""
+        if state.device_ms is not None and last.device_ms is not None:
+            elapsed = ((state.device_ms - last.device_ms) & 0xFFFFFFFF) / 1000.0
+            if 0.0 < elapsed < INPUT_STALE_AFTER:
+                return elapsed
+        return max(state.timestamp - last.timestamp, PACKET_INTERVAL)
+
+    @staticmethod
+    def _extrapolate(value, velocity, ahead):
+        if abs(value) < MOTION_THRESHOLD or velocity * value <= 0.0:
+            return value  # no centro ou voltando para ele: nunca passa do último pacote
+        return max(-1.0, min(1.0, value + velocity * ahead))
+
+JOYSTICK_MODE_ITEMS = [
+    ('FREE', "Livre", "Navegação livre da viewport"),
+    ('ORBIT', "Orbital", "Orbitar em torno do objeto"),
+    ('ROTATE_X', "Rotacionar X", "Rotacionar objeto no eixo X"),
+    ('ROTATE_Y', "Rotacionar Y", "Rotacionar objeto no eixo Y")
+]
+
+class ControllerDevice:
+    """Uma placa BitDogLab, identificada pelo endereço de origem (IP, porta).
+
+    `state` é trocado pela thread de rede a cada pacote; os campos de navegação
+    (filtro, gravação, botão anterior...) pertencem só ao modal.
+    """
+    def __init__(self, address, index):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.state = JoystickState()
+        self.last_seq = None
+        self.last_device_ms = None  # relógio da placa no último pacote aceito
+        self.last_seen = time.monotonic()
+        self.mode = 'DEFAULT'   # 'DEFAULT' segue o modo escolhido no painel
+        self.area_index = index  # qual VIEW_3D da tela esta placa controla
+        self.profile = profiles.get(address[0], default_profile)
+        self.raw = (2048, 2048)  # última leitura crua do ADC, usada na calibração
+        self.buttons = 0          # máscara de botões do último pacote
+        self.press_counts = None  # contadores de toques do último pacote v2
+        self.last_press = {}      # botão -> time.monotonic() do último toque aceito
+        self.reset_counters()
+        self.reset_navigation()
+
+    def reset_counters(self):
+        self.packets = 0
+        self.lost = 0            # lacunas na sequência
+        self.jitter = 0.0        # variação do tempo de trânsito (RFC 3550), em segundos
+        self.transit = None      # chegada - tempo da placa do último pacote
+        self.min_transit = None  # menor trânsito visto: base do atraso relativo
+        self.rate = 0.0          # pacotes por segundo
+        self._rate_mark = (0, time.monotonic())
+        self.last_consumed = None  # último estado lido pelo modal
+        self.stale_state = None    # estado neutro usado quando a placa fica muda
+
+    def update_rate(self, now):
+        packets, since = self._rate_mark
+        if now > since:
+            self.rate = (self.packets - packets) / (now - since)
+        self._rate_mark = (self.packets, now)
+
+    def counters(self):
+        total = self.packets + self.lost
+        return {
+            "placa": self.name,
+            "pacotes": self.packets,
+            "perdidos": self.lost,
+            "perda_pct": self.lost / total * 100 if total else 0.0,
+            "taxa_hz": self.rate,
+            "jitter_ms": self.jitter * 1000,
+        }
+
+    def reset_navigation(self):
+        self.input = None
+        self.recorder = RotationRecorder()
+        self.selection = SelectionTransform()
+        self.initial_distance = None
+        self.last_view = None
+
+class LatencyHistogram:
+    """Histograma de latências com baldes fixos em escala logarítmica.
+
+    Registrar custa uma busca binária e um incremento, sem alocar nada, então pode
+    ficar ligado o tempo todo. Os percentis saem do limite superior do balde (20
+    baldes por década, erro de até ~12%).
+    """
+    edges = tuple(0.0001 * 10 ** (i / 20) for i in range(101))  # 0,1 ms a 10 s
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(self.edges, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(self.edges[index], self.max) if index < len(self.edges) else self.max
+        return self.max
+
+    def summary(self):
+        """Resumo em milissegundos"""
+        return {
+            "etapa": self.name,
+            "amostras": self.count,
+            "media_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+class Metrics:
+    """Latência de cada etapa do joystick e da voz, medida com relógios monotônicos.
+
+    As etapas registradas estão em METRIC_STAGES; os contadores por placa (taxa,
+    perda, jitter) ficam no próprio ControllerDevice.
+    """
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram(stage) for stage, _ in METRIC_STAGES}
+        self.redraw_pending = None  # perf_counter() do tick que pediu redesenho
+        self.started = time.monotonic()
+
+    def record(self, stage, seconds):
+        self.histograms[stage].record(seconds)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        for device in list(devices.values()):
+            device.reset_counters()
+        recognition.reset()
+        self.started = time.monotonic()
+
+    def rows(self):
+        return [self.histograms[stage].summary() for stage, _ in METRIC_STAGES]
+
+    def device_rows(self):
+        return [device.counters() for device in list(devices.values())]
+
+    def export(self, path):
+        """Grava as métricas em JSON ou, se o arquivo terminar em .csv, em CSV"""
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=list(LatencyHistogram("").summary()))
+                writer.writeheader()
+                writer.writerows(self.rows())
+                device_rows = self.device_rows()
+                if device_rows:
+                    f.write("\n")
+                    writer = csv.DictWriter(f, fieldnames=list(device_rows[0]))
+                    writer.writeheader()
+                    writer.writerows(device_rows)
+                backend_rows = recognition.rows()
+                if backend_rows:
+                    f.write("\n")
+                    writer = csv.DictWriter(f, fieldnames=list(backend_rows[0]))
+                    writer.writeheader()
+                    writer.writerows(backend_rows)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "exportado_em": datetime.now().isoformat(timespec="seconds"),
+                    "duracao_s": time.monotonic() - self.started,
+                    "etapas": self.rows(),
+                    "placas": self.device_rows(),
+                    "motores_de_voz": recognition.rows(),
+                }, f, indent=2, ensure_ascii=False)
+
+def metrics_draw_callback():
+    """Fecha a medição tick → desenho quando a viewport realmente redesenha"""
+    pending = metrics.redraw_pending
+    if pending is not None:
+        metrics.redraw_pending = None
+        metrics.record('redraw', time.perf_counter() - pending)
+
 # Variáveis globais
-joystick_data = {"x": 0.0, "y": 0.0, "button": False, "zoom": False}
-stop_threads = False
+devices = {}  # (IP, porta) de origem -> ControllerDevice
 modal_operator_instance = None
-previous_button_state = False
-DEADZONE = 0.1
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-# Configurações de voz
-mic = sr.Microphone()
-voice_recognizer = sr.Recognizer()
-voice_recognizer.energy_threshold = 300
-voice_recognizer.dynamic_energy_threshold = False
-voice_recognizer.pause_threshold = 1.0
+DEADZONE = 0.1         # zona morta radial padrão (perfil de uma placa não calibrada)
+MOTION_THRESHOLD = 0.01  # abaixo disso a entrada filtrada é considerada parada
+TICK_INTERVAL = 0.02  # intervalo do timer do modal; as velocidades são calibradas para ele
+MAX_TICK_DT = 0.1     # limita o passo depois de um travamento do Blender
+IDLE_TICK_INTERVAL = 0.1  # timer do modal com o joystick parado (uma vez por pacote da placa)
+PACKET_INTERVAL = 0.1     # intervalo nominal entre pacotes do firmware (sleep_ms(100))
+IDLE_AFTER = 1.0          # segundos na zona morta antes de reduzir a taxa do timer
+
+# Etapas medidas por Metrics, na ordem do painel
+METRIC_STAGES = [
+    ('network', "Rede (atraso relativo)"),
+    ('packet_age', "Pacote → tick"),
+    ('timer_interval', "Intervalo do timer"),
+    ('tick', "Processamento do tick"),
+    ('redraw', "Tick → desenho"),
+    ('button', "Botão → ação"),
+    ('voice_activation', "Voz: botão → sessão"),
+    ('voice_capture', "Voz: gravação"),
+    ('voice_prepare', "Voz: preparo do áudio"),
+    ('voice_local', "Voz: reconhecimento local"),
+    ('voice_recognition', "Voz: reconhecimento"),
+    ('voice_streaming', "Voz: streaming"),
+    ('voice_queue', "Voz: fila"),
+    ('voice_execute', "Voz: execução"),
+    ('voice_total', "Voz: botão → comando"),
+]
+METRICS_PANEL_STAGES = ('network', 'packet_age', 'tick', 'redraw', 'button', 'voice_recognition', 'voice_total')
+metrics = Metrics()
+metrics_draw_handler = None
+
+# Protocolo binário do joystick (ver embarcaHack.c)
+# magic(2) versão(1) botões(1) sequência(4) tempo da placa em ms(4) VRX(2) VRY(2)
+# A versão 2 acrescenta contadores de toques JOY(1) ZOOM(1) VOZ(1) e um byte reservado
+PACKET_MAGIC = b"BB"
+PACKET_VERSION = 1
+PACKET_VERSION_PRESSES = 2
+PACKET_STRUCT = struct.Struct("<2sBBIIHH")
+PACKET_STRUCT_V2 = struct.Struct("<2sBBIIHHBBBx")
+BUTTON_JOYSTICK = 0x01
+BUTTON_ZOOM = 0x02
+BUTTON_VOICE = 0x04
+BUTTON_BITS = (BUTTON_JOYSTICK, BUTTON_ZOOM, BUTTON_VOICE)  # mesma ordem dos contadores
+BUTTON_DEBOUNCE = 0.03     # segundos entre toques aceitos (placas sem contadores)
+BUTTON_MAX_PRESSES = 16    # saltos maiores no contador são tratados como reinício da placa
+BUTTON_STALE_AFTER = 2.0   # toques mais antigos que isso são descartados
+button_events = deque(maxlen=64)
+button_event_seq = 0
+last_button_event_seq = 0
+SEQ_RESET_WINDOW = 1000  # recuo maior que isso indica que a placa reiniciou
+DEVICE_CLOCK_RESET_WINDOW = 1000  # recuo do relógio da placa (ms) maior que isso também
+UDP_PORTS = [8080]
+UDP_RCVBUF = 256 * 1024  # SO_RCVBUF pedido ao sistema (o kernel pode ajustar)
+UDP_BUFFER_SIZE = 2048   # maior datagrama aceito
+UDP_DRAIN_MAX = 4096     # datagramas lidos por despertar antes de devolver o laço
+IO_STOP_WAIT = 0.5       # quanto o stop espera a thread de IO antes de deixá-la fechar sozinha
+IO_RESTART_TIMEOUT = 10.0  # quanto o start espera o fechamento de um ciclo anterior
+INPUT_STALE_AFTER = 0.5  # segundos sem pacotes até a entrada da placa ser zerada
+DEVICE_TIMEOUT = 60.0    # segundos sem pacotes até a placa sair da lista
+
+# Calibração das placas
+ADC_MAX = 4095           # leitura máxima do ADC de 12 bits
+PROFILE_TABLE_SIZE = 4096
+PROFILES_PATH = os.path.join(os.path.dirname(__file__), "joystick_profiles.json")
+CALIBRATION_REST_SECONDS = 2.0
+CALIBRATION_RANGE_SECONDS = 5.0
+CALIBRATION_MIN_DEADZONE = 0.03
+CALIBRATION_MIN_TRAVEL = 300  # deslocamento mínimo do centro para aceitar um limite medido
+
+class JoystickProfile:
+    """Calibração de uma placa, compilada em tabelas de consulta.
+
+    `axis_x`/`axis_y` levam a leitura crua de 12 bits direto ao valor normalizado
+    (-1 a 1) com o centro e os limites medidos. A zona morta radial, a curva expo
+    e o ganho dependem do raio, então ficam numa terceira tabela indexada por
+    x² + y², com o fator que multiplica os dois eixos. No caminho quente sobram
+    três consultas e duas multiplicações por pacote.
+    """
+    fields = ("center_x", "center_y", "min_x", "max_x", "min_y", "max_y", "deadzone", "expo", "gain")
+
+    def __init__(self, center_x=2048, center_y=2048, min_x=0, max_x=ADC_MAX, min_y=0, max_y=ADC_MAX,
+                 deadzone=DEADZONE, expo=0.0, gain=1.0):
+        self.center_x = center_x
+        self.center_y = center_y
+        self.min_x = min_x
+        self.max_x = max_x
+        self.min_y = min_y
+        self.max_y = max_y
+        self.deadzone = deadzone
+        self.expo = expo
+        self.gain = gain
+        self.compile()
+
+    @staticmethod
+    def _axis_table(center, low, high):
+        raw = np.arange(ADC_MAX + 1, dtype=np.float64)
+        below = (raw - center) / max(center - low, 1)
+        above = (raw - center) / max(high - center, 1)
+        return np.clip(np.where(raw < center, below, above), -1.0, 1.0)
+
+    def compile(self):
+        self.axis_x = self._axis_table(self.center_x, self.min_x, self.max_x).tolist()
+        self.axis_y = self._axis_table(self.center_y, self.min_y, self.max_y).tolist()
+        radius = np.sqrt(np.arange(PROFILE_TABLE_SIZE, dtype=np.float64) / (PROFILE_TABLE_SIZE - 1))
+        shaped = np.clip((radius - self.deadzone) / (1.0 - self.deadzone), 0.0, 1.0)
+        shaped = ((1.0 - self.expo) * shaped + self.expo * shaped ** 3) * self.gain
+        self.radial = np.divide(shaped, radius, out=np.zeros_like(shaped), where=radius > 0).tolist()
+
+    def apply(self, vrx, vry):
+        """Leitura crua (0–4095) -> (x, y) já com zona morta, curva e ganho"""
+        x = self.axis_x[min(max(vrx, 0), ADC_MAX)]
+        y = self.axis_y[min(max(vry, 0), ADC_MAX)]
+        r2 = x * x + y * y
+        if r2 < 1.0:
+            scale = self.radial[int(r2 * (PROFILE_TABLE_SIZE - 1))]
+        else:
+            scale = self.radial[-1] / math.sqrt(r2)  # diagonais: raio limitado a 1
+        return x * scale, y * scale
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.fields}
+
+default_profile = JoystickProfile()
+profiles = {}  # IP da placa -> JoystickProfile
+
+def load_profiles():
+    """Lê os perfis salvos em PROFILES_PATH"""
+    profiles.clear()
+    if not os.path.exists(PROFILES_PATH):
+        return
+    try:
+        with open(PROFILES_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        for ip, values in data.items():
+            profiles[ip] = JoystickProfile(**{k: v for k, v in values.items() if k in JoystickProfile.fields})
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Erro ao ler os perfis das placas: {e}")
+    for device in list(devices.values()):
+        device.profile = profiles.get(device.address[0], default_profile)
+
+def save_profiles():
+    try:
+        with open(PROFILES_PATH, "w", encoding="utf-8") as f:
+            json.dump({ip: profile.to_dict() for ip, profile in profiles.items()}, f, indent=2)
+    except OSError as e:
+        print(f"Erro ao salvar os perfis das placas: {e}")
+
+def set_profile(device, profile):
+    """Associa um perfil ao IP da placa, aplica e salva"""
+    profiles[device.address[0]] = profile
+    device.profile = profile
+    save_profiles()
+
+
+# Log binário de sessões de navegação
+SESSION_MAGIC = b"BBSESS01"
+SESSION_DTYPE = np.dtype([
+    ('now', '<f8'), ('dt', '<f4'), ('device', '<u2'), ('mode', 'u1'), ('buttons', 'u1'),
+    ('x', '<f4'), ('y', '<f4'), ('stamp', '<f8'),  # stamp: chegada do pacote em uso
+    ('location', '<f4', (3,)), ('rotation', '<f4', (4,)), ('distance', '<f4'),
+])
+SESSION_MODE_CODES = {mode: code for code, (mode, _, _) in enumerate(JOYSTICK_MODE_ITEMS)}
+SESSION_SETTINGS = ('joystick_sensitivity', 'joystick_orbit_speed', 'joystick_filter', 'joystick_smoothing')
+SESSION_FLUSH_ROWS = 256
+
+# Benchmark com placa e voz simuladas
+BENCHMARK_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+BENCHMARK_TOLERANCE = 0.25     # piora relativa aceita antes de acusar regressão
+BENCHMARK_PACKET_RATE = 200.0  # pacotes por segundo nas fases de navegação
+BENCHMARK_PHASE_SECONDS = 3.0
+BENCHMARK_SETTLE = 0.5
+BENCHMARK_PARSE_PACKETS = 20000
+BENCHMARK_COMMANDS = 20
+BENCHMARK_SELECTION_SIZES = (100, 1000, 10000)
+BENCHMARK_SELECTION_TICKS = 50
+
+# Configurações de voz (carregadas sob demanda por load_voice_support)
+sr = None        # módulo speech_recognition
+speech = None    # módulo google.cloud.speech_v1p1beta1
+voice_recognizer = None
+voice_loaded = False
+voice_lock = threading.Lock()
+VOICE_WARMUP_DELAY = 3.0  # segundos após iniciar o servidor até pré-carregar a voz
 is_listening = False
-stop_voice_thread = False
-last_voice_activation = datetime.now() - timedelta(seconds=10)
+VOICE_REQUEST_TTL = 3.0  # toques de voz mais velhos que isso (p.ex. feitos durante outra sessão) são ignorados
+microphone_names = None  # cache de sr.Microphone.list_microphone_names(); None força nova varredura
+use_streaming_recognition = True
+STREAMING_STABILITY = 0.6  # estabilidade mínima para agir sobre um resultado parcial
+KEYWORD_SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "keyword_samples")
+KWS_SAMPLE_RATE = 16000
+KWS_CONFIDENCE = 0.25        # abaixo disso o comando vai para a nuvem
+KWS_REJECT_DISTANCE = 40.0   # distância DTW de referência quando só há uma ação gravada
+RECOGNITION_WORKERS = 4         # threads do pool que consulta os motores em paralelo
+RECOGNITION_MIN_CONFIDENCE = 0.6  # confiança mínima para um motor da nuvem vencer sem esperar os outros
+RECOGNITION_TIMEOUT = 8.0       # espera máxima por todos os motores
+FUZZY_MIN_LENGTH = 4     # palavras menores só valem por correspondência exata
+PREFIX_WEIGHT = 0.9      # peso de uma palavra que começa com um apelido
+FUZZY_WEIGHT = 0.8       # peso de uma palavra com uma letra de diferença
+PHONETIC_WEIGHT = 0.7    # peso de uma palavra com o mesmo som
+GENERIC_WEIGHT = 0.3     # peso de verbos genéricos: em "gerar cubo" o substantivo vence
+GENERIC_WORDS = ('gerar', 'gravar', 'trava', 'travar', 'criar', 'fazer')
+COMMAND_DRAIN_INTERVAL = 0.05  # intervalo do timer que executa os comandos de voz
+COMMAND_BATCH_SIZE = 8         # comandos executados por passagem do timer
+COMMAND_STALE_AFTER = 5.0      # comandos mais antigos que isso são descartados
+COMMAND_MERGE_WINDOW = 1.0     # repetições do mesmo comando nesse intervalo viram uma só
+command_queue = deque(maxlen=32)
+command_history = deque(maxlen=50)
+AUDIO_RING_SECONDS = 10        # histórico mantido pelo microfone persistente
+PREROLL_SECONDS = 0.4          # áudio anterior ao botão incluído na frase
+NOISE_RECALIBRATE_INTERVAL = 2.0
+MIN_ENERGY_THRESHOLD = 50
+UPLOAD_SAMPLE_RATE = 16000     # taxa enviada ao reconhecimento (suficiente para fala)
+RESAMPLE_TAPS = 63             # passa-baixa FIR (windowed-sinc) antes de reduzir a taxa
+RESAMPLE_CUTOFF = 0.45         # corte do passa-baixa, em fração da taxa de destino
+VAD_FRAME_SECONDS = 0.02       # quadro do corte de silêncio
+VAD_PADDING_SECONDS = 0.15     # margem mantida antes e depois da fala
+upload_encoding = 'FLAC'       # 'FLAC' ou 'LINEAR16'; volta para LINEAR16 se o FLAC falhar
+RENDER_OUTPUT_DIR = "//renders/"
+RENDER_QUEUE_MAX = 8          # renderizações pendentes aceitas (fila + em execução)
+RENDER_HISTORY = 20           # jobs mantidos na lista, contando os terminados
+RENDER_POLL_INTERVAL = 0.5
+RENDER_PANEL_JOBS = 4         # jobs mais recentes mostrados no painel
+# Cycles: "Sample 32/128"; EEVEE: "Rendering 5 / 64 samples"
+RENDER_PROGRESS_PATTERN = re.compile(r"Sample (\d+)/(\d+)|Rendering (\d+) / (\d+) samples")
+UV_ANGLE_LIMIT = 66           # parâmetros do smart_project usados pelo comando "textura"
+UV_ISLAND_MARGIN = 0.03
+UV_HASH_PROPERTY = "bitblender_uv_hash"  # propriedade da malha com o hash do último desembrulho
+uv_seconds_per_vertex = None  # custo medido do desembrulho, para estimar o tempo economizado
+VOICE_SELECTION_STEP = 1.0     # unidades movidas por comando de voz no escopo Seleção
+VOICE_PHRASES = ["teste", "cubo", "esfera", "frente", "trás", "render", "renderizar", "cuba", "cilindro", 'textura', 'texture']
 
 # Configurações do Google Cloud Speech
 #Credentials Ocultada
 GOOGLE_CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), "Sua Credencial Google Aqui")
 google_client = None
-if os.path.exists(GOOGLE_CREDENTIALS_PATH):
-    credentials = service_account.Credentials.from_service_account_file(GOOGLE_CREDENTIALS_PATH)
-    google_client = speech.SpeechClient(credentials=credentials)
 
 def rotate_object(obj, axis, angle):
-    """Rotaciona objeto no eixo especificado"""
+    """Rotaciona objeto no eixo especificado (as chaves ficam com o RotationRecorder)"""
     if axis == 'X':
         obj.rotation_euler.x += angle
     elif axis == 'Y':
         obj.rotation_euler.y += angle
-    obj.keyframe_insert(data_path="rotation_euler")
 
-def process_voice_command(command):
+def simplify_curve(points, tolerance):
+    """Ramer–Douglas–Peucker sobre pontos (frame, valor), usando o erro vertical da curva"""
+    if len(points) < 3 or tolerance <= 0.0:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        f0, v0 = points[first]
+        f1, v1 = points[last]
+        slope = (v1 - v0) / (f1 - f0) if f1 != f0 else 0.0
+        worst, worst_error = None, tolerance
+        for i in range(first + 1, last):
+            f, v = points[i]
+            error = abs(v - (v0 + slope * (f - f0)))
+            if error > worst_error:
+                worst, worst_error = i, error
+        if worst is not None:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+    return [p for p, k in zip(points, keep) if k]
+
+def write_fcurve_keys(obj, data_path, index, points):
+    """Grava pontos (frame, valor) numa F-Curve de uma vez com keyframe_points.add + foreach_set"""
+    if not points:
+        return
+    anim = obj.animation_data or obj.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(name=f"{obj.name}Action")
+    fcurve = anim.action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = anim.action.fcurves.new(data_path, index=index, action_group="Object Transforms")
+
+    # Chaves antigas dentro do trecho gravado são substituídas
+    first, last = points[0][0], points[-1][0]
+    keyframes = fcurve.keyframe_points
+    for key in reversed([k for k in keyframes if first <= k.co[0] <= last]):
+        keyframes.remove(key, fast=True)
+
+    start = len(keyframes)
+    keyframes.add(len(points))
+    co = [0.0] * (2 * len(keyframes))
+    keyframes.foreach_get("co", co)
+    co[2 * start:] = [c for point in points for c in point]
+    keyframes.foreach_set("co", co)
+    fcurve.update()  # ordena e recalcula as alças
+
+class RotationRecorder:
+    """Acumula a rotação de um gesto do joystick e grava as chaves só quando ele termina.
+
+    KEYFRAME insere uma única chave no frame atual, RECORD grava o gesto ao longo
+    do tempo (simplificado com RDP) e PREVIEW não grava nada.
+    """
+    def __init__(self):
+        self.obj = None
+        self.index = 0
+        self.samples = []
+        self.keying = 'KEYFRAME'
+        self.tolerance = 0.0
+
+    def add(self, obj, index, now, keying, tolerance):
+        """Registra o valor atual do eixo antes de aplicar a rotação do tick"""
+        if self.obj is not obj or self.index != index:
+            self.finish(now)
+            self.obj = obj
+            self.index = index
+            self.keying = keying
+            self.tolerance = tolerance
+        self.samples.append((now, obj.rotation_euler[index]))
+
+    def finish(self, now):
+        """Fecha o gesto em andamento e grava as chaves conforme o modo"""
+        obj, samples = self.obj, self.samples
+        self.obj = None
+        self.samples = []
+        if obj is None or not samples:
+            return
+        try:
+            samples.append((now, obj.rotation_euler[self.index]))
+            if self.keying == 'KEYFRAME':
+                obj.keyframe_insert(data_path="rotation_euler", index=self.index)
+            elif self.keying == 'RECORD':
+                scene = bpy.context.scene
+                fps = scene.render.fps / scene.render.fps_base
+                start_time = samples[0][0]
+                points = [(scene.frame_current + (t - start_time) * fps, value) for t, value in samples]
+                write_fcurve_keys(obj, "rotation_euler", self.index, simplify_curve(points, self.tolerance))
+        except ReferenceError:
+            pass  # o objeto foi apagado durante o gesto
+
+class SelectionTransform:
+    """Transforma a seleção inteira de uma vez com foreach_get/foreach_set.
+
+    Os valores de todos os objetos selecionados vão para um array NumPy, recebem o
+    deslocamento numa única operação vetorizada e voltam num único foreach_set, sem
+    laço Python por objeto. O buffer é reaproveitado enquanto a seleção não muda de
+    tamanho. As chaves de um gesto são inseridas de uma vez quando ele termina.
+    """
+    def __init__(self):
+        self._buffer = None
+        self.revision = 0       # muda a cada deslocamento (usado para pedir redesenho)
+        self.in_gesture = False
+
+    def offset(self, objects, data_path, index, amount):
+        """Soma `amount` ao componente `index` de `data_path` em todos os objetos"""
+        count = len(objects)
+        if count == 0:
+            return 0
+        if self._buffer is None or len(self._buffer) != count * 3:
+            self._buffer = np.empty(count * 3, dtype=np.float32)
+        objects.foreach_get(data_path, self._buffer)
+        self._buffer[index::3] += amount
+        objects.foreach_set(data_path, self._buffer)
+        self.revision += 1
+        return count
+
+    def rotate(self, context, index, angle):
+        if self.offset(context.view_layer.objects.selected, "rotation_euler", index, angle):
+            self.in_gesture = True
+
+    def finish(self, context, keying):
+        """Fecha o gesto; fora do modo PREVIEW insere uma chave de rotação em toda a seleção"""
+        if not self.in_gesture:
+            return
+        self.in_gesture = False
+        if keying != 'PREVIEW' and context.selected_editable_objects:
+            bpy.ops.anim.keyframe_insert_by_name(type="Rotation")
+
+selection_transform = SelectionTransform()  # usado pelos comandos de voz
+
+def normalize_text(text):
+    """Minúsculas, sem acentos nem pontuação"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return "".join(c if c.isalnum() else " " for c in text).split()
+
+PHONETIC_RULES = [
+    ("ch", "x"), ("lh", "li"), ("nh", "ni"), ("ph", "f"), ("qu", "k"), ("gu", "g"),
+    ("ss", "s"), ("rr", "r"), ("ce", "se"), ("ci", "si"), ("c", "k"), ("w", "u"),
+    ("y", "i"), ("z", "s"), ("h", ""),
+]
+
+def phonetic_key(word):
+    """Chave fonética simples para português: agrupa grafias que soam igual"""
+    for pattern, replacement in PHONETIC_RULES:
+        word = word.replace(pattern, replacement)
+    # vogais finais átonas variam muito no reconhecimento (cilindro/cilindru)
+    word = word.replace("o", "u").replace("e", "i")
+    return "".join(c for i, c in enumerate(word) if i == 0 or c != word[i - 1])
+
+def edit_distance(a, b, limit):
+    """Levenshtein com corte: retorna limit + 1 se a distância passar do limite"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+class CommandRegistry:
+    """Vocabulário de comandos de voz compilado em índices de busca.
+
+    `register` associa apelidos a uma ação e à função que a executa; `compile`
+    monta um índice por primeira palavra (frases mais longas primeiro) e índices
+    aproximados por prefixo, remoção de letras e chave fonética. `match` escolhe a
+    correspondência de maior pontuação: frases exatas mais longas vencem, depois
+    palavras parecidas. Cada letra vale 1, exceto nas palavras genéricas
+    (`generic_words`, p.ex. "gerar"), que valem GENERIC_WEIGHT: elas só decidem o
+    comando quando nenhuma outra palavra da frase corresponde.
+    """
+    def __init__(self):
+        self.aliases = {}   # ação -> lista de apelidos
+        self.handlers = {}  # ação -> função sem argumentos
+        self.generic_words = set(GENERIC_WORDS)
+        self._phrases = None
+
+    @property
+    def actions(self):
+        return list(self.aliases)
+
+    def register(self, action, aliases, handler):
+        """Adiciona (ou estende) um comando; pode ser chamado por outros scripts"""
+        self.aliases.setdefault(action, [])
+        self.aliases[action].extend(a for a in aliases if a not in self.aliases[action])
+        self.handlers[action] = handler
+        self._phrases = None  # recompila na próxima busca
+
+    def mark_generic(self, *words):
+        """Marca palavras que sozinhas não devem ganhar de um substantivo na mesma frase"""
+        self.generic_words.update(" ".join(normalize_text(word)) for word in words)
+        self._phrases = None
+
+    def _weight(self, word):
+        return len(word) * (GENERIC_WEIGHT if word in self._generic else 1.0)
+
+    def compile(self):
+        self._generic = {" ".join(normalize_text(word)) for word in self.generic_words}
+        phrases = {}
+        words = {}
+        deletions = {}
+        phonetic = {}
+        for action, aliases in self.aliases.items():
+            for alias in aliases:
+                tokens = tuple(normalize_text(alias))
+                if not tokens:
+                    continue
+                phrases.setdefault(tokens[0], []).append((tokens, action))
+                if len(tokens) == 1 and len(tokens[0]) >= FUZZY_MIN_LENGTH:
+                    word = tokens[0]
+                    words[word] = action
+                    for variant in {word} | {word[:i] + word[i + 1:] for i in range(len(word))}:
+                        deletions.setdefault(variant, set()).add((word, action))
+                    phonetic.setdefault(phonetic_key(word), set()).add((word, action))
+        for candidates in phrases.values():
+            candidates.sort(key=lambda item: -sum(self._weight(t) for t in item[0]))
+        self._phrases, self._words = phrases, words
+        self._deletions, self._phonetic = deletions, phonetic
+
+    def match(self, text):
+        """Retorna a ação do texto reconhecido, ou None"""
+        if self._phrases is None:
+            self.compile()
+        tokens = normalize_text(text)
+        best_action, best_score = None, 0.0
+        for i, token in enumerate(tokens):
+            # Frases exatas começando nesta palavra (a primeira que casa é a mais longa)
+            for phrase, action in self._phrases.get(token, ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    score = sum(self._weight(t) for t in phrase) + len(phrase) - 1
+                    if score > best_score:
+                        best_action, best_score = action, score
+                    break
+            else:
+                action, score = self._fuzzy(token)
+                if score > best_score:
+                    best_action, best_score = action, score
+        return best_action
+
+    def _fuzzy(self, token):
+        """Palavra não encontrada: busca por prefixo, por até uma letra de diferença e por som"""
+        if len(token) < FUZZY_MIN_LENGTH:
+            return None, 0.0
+        best_action, best_score = None, 0.0
+        for end in range(len(token) - 1, FUZZY_MIN_LENGTH - 1, -1):
+            action = self._words.get(token[:end])
+            if action:  # ex.: "renderização" começa com "render"
+                best_action, best_score = action, self._weight(token[:end]) * PREFIX_WEIGHT
+                break
+        candidates = set(self._deletions.get(token, ()))
+        for i in range(len(token)):
+            candidates |= self._deletions.get(token[:i] + token[i + 1:], set())
+        for word, action in candidates:
+            distance = edit_distance(token, word, 1)
+            if distance <= 1:
+                score = self._weight(word) * FUZZY_WEIGHT
+                if score > best_score:
+                    best_action, best_score = action, score
+        for word, action in self._phonetic.get(phonetic_key(token), ()):
+            score = self._weight(word) * PHONETIC_WEIGHT
+            if score > best_score:
+                best_action, best_score = action, score
+        return best_action, best_score
+
+def move_view(axis, amount):
+    """Desloca a vista 3D atual no eixo indicado"""
+    location = bpy.context.space_data.region_3d.view_location
+    setattr(location, axis, getattr(location, axis) + amount)
+
+def move_command(axis, direction):
+    """Move a seleção (escopo Seleção) ou a vista 3D no eixo indicado"""
+    context = bpy.context
+    if context.window_manager.joystick_scope == 'SELECTION':
+        index = "xyz".index(axis)
+        if selection_transform.offset(context.view_layer.objects.selected, "location", index,
+                                      direction * VOICE_SELECTION_STEP):
+            return
+    move_view(axis, direction * 100)
+
+class RenderJob:
+    """Uma renderização em segundo plano: snapshot do .blend, vista e saída únicas"""
+    def __init__(self, job_id, snapshot, output, frame, view):
+        self.id = job_id
+        self.snapshot = snapshot
+        self.output = output    # prefixo; o Blender acrescenta o frame e a extensão
+        self.frame = frame
+        self.view = view        # (matriz da câmera, lente, ortográfica, escala) ou None
+        self.status = 'QUEUED'  # QUEUED, RUNNING, DONE, FAILED, CANCELLED
+        self.progress = 0.0
+        self.saved = None       # arquivo gravado pelo worker
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.process = None
+        self._reader = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def command(self):
+        # --factory-startup: o worker não carrega addons (nem abre outro servidor UDP)
+        args = [bpy.app.binary_path, "--factory-startup", "-b", self.snapshot]
+        if self.view:
+            matrix, lens, ortho, scale = self.view
+            # Cria uma câmera com a vista capturada e a torna ativa antes de renderizar
+            args += ["--python-expr", (
+                "import bpy, mathutils\n"
+                "scene = bpy.context.scene\n"
+                "data = bpy.data.cameras.new('BitBlenderView')\n"
+                f"data.lens = {lens!r}\n"
+                f"data.type = {'ORTHO' if ortho else 'PERSP'!r}\n"
+                f"data.ortho_scale = {scale!r}\n"
+                "camera = bpy.data.objects.new('BitBlenderView', data)\n"
+                "scene.collection.objects.link(camera)\n"
+                f"camera.matrix_world = mathutils.Matrix({matrix!r})\n"
+                "scene.camera = camera\n")]
+        return args + ["-o", self.output + "####", "-F", "PNG", "-x", "1", "-f", str(self.frame)]
+
+    def start(self):
+        self.status = 'RUNNING'
+        self.started = time.monotonic()
+        try:
+            self.process = subprocess.Popen(self.command(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                            stdin=subprocess.DEVNULL, text=True, errors="replace")
+        except OSError as e:
+            print(f"Renderização {self.id}: erro ao iniciar o Blender: {e}")
+            self._end('FAILED')
+            return
+        self._reader = threading.Thread(target=self._read_output, name=f"bitblender-render-{self.id}",
+                                        daemon=True)
+        self._reader.start()
+
+    def _read_output(self):
+        """Acompanha o log do worker: progresso das amostras e arquivo salvo"""
+        for line in self.process.stdout:
+            match = RENDER_PROGRESS_PATTERN.search(line)
+            if match:
+                done, total = int(match.group(1) or match.group(3)), int(match.group(2) or match.group(4))
+                if total:
+                    self.progress = min(done / total, 1.0)
+            elif line.startswith("Saved:"):
+                self.saved = line.split(":", 1)[1].strip().strip("'\"")
+        self.process.wait()
+
+    def poll(self):
+        """Atualiza o estado do job em execução; retorna True se ele terminou"""
+        if self.status != 'RUNNING':
+            return self.status != 'QUEUED'
+        if self.process is None or self.process.poll() is None:
+            return False
+        if self._reader:
+            self._reader.join(1.0)
+        self._end('DONE' if self.process.returncode == 0 and self.saved else 'FAILED')
+        return True
+
+    def cancel(self):
+        if self.status == 'RUNNING' and self.process and self.process.poll() is None:
+            self.process.terminate()
+            self._end('CANCELLED')
+        elif self.status == 'QUEUED':
+            self._end('CANCELLED')
+
+    def _end(self, status):
+        self.status = status
+        self.finished = time.monotonic()
+        if status == 'DONE':
+            self.progress = 1.0
+        try:
+            os.remove(self.snapshot)
+        except OSError:
+            pass
+        label = {'DONE': f"salva em {self.saved}", 'FAILED': "falhou", 'CANCELLED': "cancelada"}[status]
+        print(f"Renderização {self.id} {label} ({self.elapsed:.1f} s)")
+
+class RenderQueue:
+    """Fila de renderizações executadas por processos `blender -b`.
+
+    `submit` roda na thread principal: salva uma cópia do .blend (save_as_mainfile
+    com copy=True, sem mudar o arquivo aberto) e captura a vista atual. Um timer
+    inicia até `workers` processos por vez e acompanha o progresso; a sessão
+    interativa continua livre enquanto eles renderizam.
+    """
+    def __init__(self):
+        self.jobs = []
+        self.workers = 1
+        self._next_id = 1
+        # O Blender compara timers por identidade; `self.update` cria um método novo a cada acesso
+        self._update = self.update
+
+    @property
+    def pending(self):
+        return [job for job in self.jobs if job.status in {'QUEUED', 'RUNNING'}]
+
+    def submit(self, context):
+        if len(self.pending) >= RENDER_QUEUE_MAX:
+            print("Fila de renderização cheia; comando ignorado")
+            return None
+        job_id = self._next_id
+        self._next_id += 1
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        snapshot = os.path.join(bpy.app.tempdir, f"bitblender_render_{stamp}_{job_id}.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=snapshot, copy=True)
+
+        folder = bpy.path.abspath(RENDER_OUTPUT_DIR) if bpy.data.filepath else os.path.join(bpy.app.tempdir, "renders")
+        os.makedirs(folder, exist_ok=True)
+        output = os.path.join(folder, f"render_{stamp}_{job_id}_")
+        job = RenderJob(job_id, snapshot, output, context.scene.frame_current, self._capture_view(context))
+        self.jobs.append(job)
+        excess = len(self.jobs) - RENDER_HISTORY
+        if excess > 0:
+            finished = [j for j in self.jobs if j.status not in {'QUEUED', 'RUNNING'}][:excess]
+            self.jobs = [j for j in self.jobs if j not in finished]
+        if not bpy.app.timers.is_registered(self._update):
+            bpy.app.timers.register(self._update, first_interval=0.0, persistent=True)
+        return job
+
+    @staticmethod
+    def _capture_view(context):
+        """Vista da viewport como câmera; None quando ela já olha pela câmera da cena"""
+        space = context.space_data
+        region = getattr(space, "region_3d", None)
+        if region is None or region.view_perspective == 'CAMERA':
+            return None
+        matrix = [list(row) for row in region.view_matrix.inverted()]
+        # A viewport usa zoom 2 sobre um sensor de 36 mm: a lente equivalente é a metade
+        return (matrix, space.lens / 2.0, not region.is_perspective,
+                region.view_distance * 72.0 / space.lens)
+
+    def update(self):
+        """Timer: inicia jobs da fila conforme há workers livres e acompanha os em execução"""
+        running = 0
+        for job in self.jobs:
+            if job.status == 'RUNNING' and not job.poll():
+                running += 1
+        for job in self.jobs:
+            if running >= self.workers:
+                break
+            if job.status == 'QUEUED':
+                job.start()
+                running += job.status == 'RUNNING'
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+        return RENDER_POLL_INTERVAL if self.pending else None
+
+    def cancel(self, job_id=None):
+        for job in self.jobs:
+            if job_id is None or job.id == job_id:
+                job.cancel()
+
+render_queue = RenderQueue()
+
+def render_command():
+    """Coloca uma renderização da vista atual na fila de workers em segundo plano"""
+    job = render_queue.submit(bpy.context)
+    if job:
+        print(f"Renderização {job.id} na fila ({len(render_queue.pending)} pendentes)")
+
+def mesh_fingerprint(mesh):
+    """Hash barato da geometria (vértices e faces) e dos parâmetros do desembrulho"""
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", sizes)
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (coords, loops, sizes):
+        digest.update(array.tobytes())
+    digest.update(repr((UV_ANGLE_LIMIT, UV_ISLAND_MARGIN)).encode())
+    return digest.hexdigest()
+
+def batch_unwrap(context, force=False):
+    """Desembrulha todas as malhas selecionadas numa única sessão de edição multiobjeto.
+
+    Malhas cujo hash (guardado na própria malha) não mudou desde o último
+    desembrulho são puladas. Retorna (desembrulhadas, puladas, segundos, segundos
+    economizados estimados).
+    """
+    global uv_seconds_per_vertex
+    view_layer = context.view_layer
+    active = view_layer.objects.active
+    selected = [obj for obj in context.selected_objects if obj.type == 'MESH']
+    if not selected and active and active.type == 'MESH':
+        selected = [active]
+    if not selected:
+        return 0, 0, 0.0, 0.0
+
+    previous_mode = context.mode
+    if context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')  # grava as edições pendentes na malha
+
+    todo = {}  # malha -> (objeto que a representa, hash)
+    skipped_vertices = 0
+    skipped = 0
+    for obj in selected:
+        mesh = obj.data
+        if mesh in todo or mesh.library:
+            continue
+        fingerprint = mesh_fingerprint(mesh)
+        if not force and mesh.uv_layers and mesh.get(UV_HASH_PROPERTY) == fingerprint:
+            skipped += 1
+            skipped_vertices += len(mesh.vertices)
+            continue
+        todo[mesh] = (obj, fingerprint)
+
+    start = time.perf_counter()
+    if todo:
+        previous_selection = list(context.selected_objects)
+        for obj in previous_selection:
+            obj.select_set(False)
+        objects = [obj for obj, _ in todo.values()]
+        for obj in objects:
+            obj.select_set(True)
+        view_layer.objects.active = objects[0]
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.uv.smart_project(angle_limit=UV_ANGLE_LIMIT, island_margin=UV_ISLAND_MARGIN)
+        bpy.ops.object.mode_set(mode='OBJECT')
+        for mesh, (_, fingerprint) in todo.items():
+            mesh[UV_HASH_PROPERTY] = fingerprint
+
+        for obj in objects:
+            obj.select_set(False)
+        for obj in previous_selection:
+            obj.select_set(True)
+        view_layer.objects.active = active
+    elapsed = time.perf_counter() - start
+
+    vertices = sum(len(mesh.vertices) for mesh in todo)
+    if vertices:
+        rate = elapsed / vertices
+        uv_seconds_per_vertex = rate if uv_seconds_per_vertex is None else 0.5 * (uv_seconds_per_vertex + rate)
+    saved = skipped_vertices * (uv_seconds_per_vertex or 0.0)
+
+    if previous_mode == 'EDIT_MESH' and active and active.type == 'MESH':
+        bpy.ops.object.mode_set(mode='EDIT')
+    return len(todo), skipped, elapsed, saved
+
+def texture_command():
+    unwrapped, skipped, elapsed, saved = batch_unwrap(bpy.context)
+    print(f"UV: {unwrapped} malhas desembrulhadas em {elapsed:.2f} s, {skipped} sem mudanças puladas "
+          f"(~{saved:.2f} s economizados)")
+
+voice_commands = CommandRegistry()
+voice_commands.register('cube', ['cubo', 'cube', 'cuba', 'cobrir', 'cobe'],
+                        lambda: bpy.ops.mesh.primitive_cube_add())
+voice_commands.register('sphere', ['sphere', 'create sphere', 'add sphere', 'ball', 'esfera'],
+                        lambda: bpy.ops.mesh.primitive_uv_sphere_add())
+voice_commands.register('front', ['front', 'forward', 'move front', 'ahead', 'frente'],
+                        lambda: move_command('x', 1))
+voice_commands.register('back', ['back', 'backward', 'move back', 'behind', 'trás', 'tras'],
+                        lambda: move_command('x', -1))
+voice_commands.register('left', ['left', 'move left', 'to left', 'esquerda'],
+                        lambda: move_command('y', 1))
+voice_commands.register('right', ['right', 'move right', 'to right', 'direita'],
+                        lambda: move_command('y', -1))
+voice_commands.register('up', ['up', 'move up', 'rise', 'sobe', 'subir'],
+                        lambda: move_command('z', 1))
+voice_commands.register('down', ['down', 'move down', 'lower', 'desce', 'descer'],
+                        lambda: move_command('z', -1))
+voice_commands.register('render', ['render', 'rende', 'renderizar', 'gravar', 'gerar imagem', 'gerar', 'trava', 'travar'],
+                        render_command)
+voice_commands.register('cylinder', ['cylinder', 'cilindro', 'cili', 'cilindru', 'cilin'],
+                        lambda: bpy.ops.mesh.primitive_cylinder_add(radius=1, depth=2, location=(0, 0, 0)))
+voice_commands.register('texture', ['texture', 'textura', 'smart', 'testura'],
+                        texture_command)
+
+def find_voice_command(command):
+    """Retorna a ação correspondente ao texto reconhecido, ou None"""
+    return voice_commands.match(command)
+
+def process_voice_command(command, action=None):
     """Executa comandos no Blender com reconhecimento de voz"""
     command = command.lower().strip()
     context = bpy.context
     context.window_manager.last_voice_command = command
     
-    command_map = {
-        'cube': ['cubo', 'cube', 'cuba', 'cobrir', 'cobe'],
-        'sphere': ['sphere', 'create sphere', 'add sphere', 'ball', 'esfera'],
-        'front': ['front', 'forward', 'move front', 'ahead', 'frente'],
-        'back': ['back', 'backward', 'move back', 'behind', 'trás', 'tras'],
-        'left': ['left', 'move left', 'to left', 'esquerda'],
-        'right': ['right', 'move right', 'to right', 'direita'],
-        'up': ['up', 'move up', 'rise', 'sobe', 'subir'],
-        'down': ['down', 'move down', 'lower', 'desce', 'descer'],
-        'render': ['render', 'rende', 'renderizar', 'gravar', 'gerar imagem', 'gerar', 'trava', 'travar'],
-        'cylinder': ['cylinder', 'cilindro', 'cili', 'cilindru', 'cilin'],
-        'texture': ['texture', 'textura', 'smart', 'testura']
-    }
-    
     try:
-        for action, keywords in command_map.items():
-            if any(keyword in command for keyword in keywords):
-                print(f"Executing command: {action}")
-                
-                if action == "cube":
-                    bpy.ops.mesh.primitive_cube_add()
-                elif action == "sphere":
-                    bpy.ops.mesh.primitive_uv_sphere_add()
-                elif action == "front":
-                    bpy.context.space_data.region_3d.view_location.x += 100
-                elif action == "back":
-                    bpy.context.space_data.region_3d.view_location.x -= 100
-                elif action == "left":
-                    bpy.context.space_data.region_3d.view_location.y += 100
-                elif action == "right":
-                    bpy.context.space_data.region_3d.view_location.y -= 100
-                elif action == "up":
-                    bpy.context.space_data.region_3d.view_location.z += 100
-                elif action == "down":
-                    bpy.context.space_data.region_3d.view_location.z -= 100
-                elif action == "cylinder":
-                    bpy.ops.mesh.primitive_cylinder_add(radius=1, depth=2, location=(0, 0, 0))
-                elif action == 'render':
-                    # Configura o renderizador
-                    scene = bpy.context.scene
-                    scene.render.image_settings.file_format = 'PNG'
-                    scene.render.filepath = "//renders/render_"
-    
-                    # Executa de forma assíncrona
-                    bpy.app.timers.register(
-                        lambda: bpy.ops.render.render('INVOKE_DEFAULT', animation=False),
-                        first_interval=0.5
-                    )
-                    print("Comando de renderização recebido - processando...")
-
-                elif action == "texture":
-                    obj = bpy.context.active_object
-                    if obj and obj.type == 'MESH':
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                        bpy.ops.object.select_all(action='DESELECT')
-                        obj.select_set(True)
-                        bpy.context.view_layer.objects.active = obj
-                        bpy.ops.object.mode_set(mode='EDIT')
-                        bpy.ops.uv.smart_project(angle_limit=66, island_margin=0.03)
-                        bpy.ops.object.mode_set(mode='OBJECT')
-
-                return True
-                
-        print(f"Command not recognized: {command}")
-        return False
+        if action is None:
+            action = find_voice_command(command)
+        if action is None:
+            print(f"Command not recognized: {command}")
+            return False
+
+        print(f"Executing command: {action}")
+        voice_commands.handlers[action]()
+        return True
         
     except Exception as e:
         print(f"Error executing command: {e}")
         return False
 
+class VoiceCommand:
+    """Comando reconhecido numa thread e aguardando execução na thread principal"""
+    __slots__ = ("text", "action", "enqueued", "pressed", "wait", "duration")
+
+    def __init__(self, text, action, pressed=None):
+        self.text = text
+        self.action = action
+        self.enqueued = time.perf_counter()
+        self.pressed = pressed  # time.monotonic() do botão que iniciou a sessão
+        self.wait = 0.0      # tempo na fila
+        self.duration = 0.0  # tempo de execução
+
+def enqueue_voice_command(text, action=None, pressed=None):
+    """Entrega um comando reconhecido à thread principal (seguro para qualquer thread)"""
+    if action is None:
+        action = find_voice_command(text)
+    command_queue.append(VoiceCommand(text, action, pressed))
+
+def view3d_override(index=0):
+    """Contexto com a área 3D de número `index`, para operadores chamados fora de um evento de UI"""
+    areas = [(window, area) for window in bpy.context.window_manager.windows
+             for area in window.screen.areas if area.type == 'VIEW_3D']
+    if not areas:
+        return contextlib.nullcontext()
+    window, area = areas[index % len(areas)]
+    region = next((r for r in area.regions if r.type == 'WINDOW'), None)
+    return bpy.context.temp_override(window=window, area=area, region=region)
+
+def drain_command_queue():
+    """Timer da thread principal: executa os toques de botão e os comandos de voz pendentes.
+
+    Os comandos de uma passagem ficam num único passo de desfazer.
+    """
+    if button_events:
+        drain_button_events()
+    if not command_queue:
+        return COMMAND_DRAIN_INTERVAL
+
+    batch = []
+    now = time.perf_counter()
+    while command_queue and len(batch) < COMMAND_BATCH_SIZE:
+        command = command_queue.popleft()
+        if now - command.enqueued > COMMAND_STALE_AFTER:
+            print(f"Comando descartado (antigo): {command.text}")
+            continue
+        previous = batch[-1] if batch else None
+        if (previous and command.action and previous.action == command.action
+                and command.enqueued - previous.enqueued < COMMAND_MERGE_WINDOW):
+            continue  # mesmo comando repetido (ex.: parcial + final)
+        batch.append(command)
+
+    executed = []
+    with view3d_override():
+        for command in batch:
+            start = time.perf_counter()
+            command.wait = start - command.enqueued
+            if process_voice_command(command.text, command.action):
+                executed.append(command.action)
+            command.duration = time.perf_counter() - start
+            command_history.append(command)
+            metrics.record('voice_queue', command.wait)
+            metrics.record('voice_execute', command.duration)
+            if command.pressed is not None:
+                metrics.record('voice_total', time.monotonic() - command.pressed)
+            print(f"Comando {command.action}: fila {command.wait * 1000:.0f} ms, "
+                  f"execução {command.duration * 1000:.0f} ms")
+        if executed:
+            bpy.ops.ed.undo_push(message="BitBlender: " + ", ".join(executed))
+    return COMMAND_DRAIN_INTERVAL
+
+def build_recognition_config(sample_rate, encoding='LINEAR16'):
+    """Configuração do Google Cloud para o áudio enviado (codificação e taxa)"""
+    return speech.RecognitionConfig(
+        encoding=getattr(speech.RecognitionConfig.AudioEncoding, encoding),
+        sample_rate_hertz=sample_rate,
+        language_code='pt-BR',
+        enable_automatic_punctuation=False,
+        model='command_and_search',
+        speech_contexts=[{
+            "phrases": VOICE_PHRASES,
+            "boost": 15.0
+        }]
+    )
+
+class RecognizerBackend:
+    """Interface dos motores de reconhecimento de fala.
+
+    `recognize` recebe um sr.AudioData já reduzido por prepare_audio e retorna
+    (texto, confiança) ou None.
+    Motores com `supports_streaming` também implementam `stream`, que consome um
+    iterador de pedaços PCM de 16 bits e gera (texto, final, estabilidade) conforme
+    as hipóteses chegam. Qualquer objeto com essa interface (por exemplo um servidor
+    falso local) pode substituir o Google.
+    """
+    name = "base"
+    supports_streaming = False
+    min_confidence = RECOGNITION_MIN_CONFIDENCE  # limiar para vencer no RecognitionOrchestrator
+    metric = None  # etapa de Metrics que recebe a latência deste motor
+
+    def recognize(self, audio):
+        raise NotImplementedError
+
+    def stream(self, chunks, sample_rate):
+        raise NotImplementedError
+
+class GoogleCloudBackend(RecognizerBackend):
+    """Google Cloud Speech-to-Text, com e sem streaming"""
+    name = "Google Cloud"
+    supports_streaming = True
+
+    def __init__(self, client):
+        self.client = client
+
+    def recognize(self, audio):
+        content, encoding = encode_audio(audio)
+        response = self.client.recognize(
+            config=build_recognition_config(audio.sample_rate, encoding),
+            audio={"content": content}
+        )
+        if response.results:
+            result = response.results[0].alternatives[0]
+            return result.transcript, result.confidence
+        return None
+
+    def stream(self, chunks, sample_rate):
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=build_recognition_config(sample_rate),
+            interim_results=True,
+            single_utterance=True
+        )
+        requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in chunks)
+        for response in self.client.streaming_recognize(config=streaming_config, requests=requests):
+            for result in response.results:
+                if result.alternatives:
+                    yield result.alternatives[0].transcript, result.is_final, result.stability
+
+class WebSpeechBackend(RecognizerBackend):
+    """API web gratuita do Google via speech_recognition (sem confiança)"""
+    name = "Google Web"
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        try:
+            return self.recognizer.recognize_google(audio, language='pt-BR'), None
+        except sr.UnknownValueError:
+            return None
+
+google_backend = None
+web_backend = None
+streaming_backend = None  # substitui o Google no streaming (p.ex. um servidor falso local)
+
+def active_streaming_backend():
+    """Motor que recebe o áudio em streaming: o substituto, se houver, ou o Google"""
+    return streaming_backend or google_backend
+
+class RecognitionRace:
+    """Decide quem age numa sessão de voz: o streaming ou o reconhecimento da frase gravada.
+
+    O primeiro a chamar `claim` executa o comando; `done` acorda os demais para que
+    parem de gravar e de enviar áudio. `finish` encerra a sessão sem vencedor.
+    """
+    def __init__(self):
+        self.winner = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def claim(self, name):
+        with self._lock:
+            if self.done.is_set():
+                return False
+            self.winner = name
+            self.done.set()
+            return True
+
+    def finish(self):
+        self.done.set()
+
+class RecognitionOrchestrator:
+    """Envia o mesmo áudio a vários motores ao mesmo tempo; vence o primeiro resultado confiável.
+
+    Cada motor roda numa thread de um pool pequeno. O primeiro resultado que
+    corresponde a um comando conhecido e atinge o `min_confidence` do motor (motores
+    sem confiança, como a API web, sempre atingem) vence. Os motores que ainda
+    esperam no pool são cancelados; os que já estão no meio de uma requisição
+    terminam em segundo plano e o resultado é descartado. Se nenhum vencer, fica o
+    melhor resultado abaixo do limiar, como antes. `stream` põe um motor de streaming
+    na mesma disputa, por uma RecognitionRace. `stats` guarda latência, vitórias e
+    erros por motor.
+    """
+    def __init__(self, workers=RECOGNITION_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}  # nome do motor -> contadores e LatencyHistogram
+
+    def _stats(self, backend):
+        stats = self.stats.get(backend.name)
+        if stats is None:
+            stats = self.stats[backend.name] = {"latency": LatencyHistogram(backend.name), "calls": 0,
+                                                "wins": 0, "errors": 0, "empty": 0, "cancelled": 0}
+        return stats
+
+    def _count(self, backend, key):
+        with self._lock:
+            self._stats(backend)[key] += 1
+
+    def _run(self, backend, audio):
+        start = time.perf_counter()
+        try:
+            result = backend.recognize(audio)
+        except Exception as e:
+            print(f"Erro {backend.name}: {e}")
+            self._count(backend, "errors")
+            return None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats(backend)
+            stats["latency"].record(elapsed)
+            if not result:
+                stats["empty"] += 1
+        if backend.metric:
+            metrics.record(backend.metric, elapsed)
+        return result
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="bitblender-reconhecimento")
+        return self._executor
+
+    def stream(self, backend, capture, race, pressed=None):
+        """Começa o streaming de `backend` no pool; ele concorre com a frase gravada pela `race`"""
+        self._count(backend, "calls")
+        return self._pool().submit(self._stream, backend, capture, race, pressed)
+
+    def _stream(self, backend, capture, race, pressed):
+        start = time.perf_counter()
+        try:
+            transcript = stream_voice_command(backend, capture, pressed=pressed, race=race)
+        except Exception as e:
+            print(f"Erro no streaming {backend.name}: {e}")
+            self._count(backend, "errors")
+            raise
+        with self._lock:
+            stats = self._stats(backend)
+            stats["latency"].record(time.perf_counter() - start)
+            stats["wins" if transcript is not None else "empty"] += 1
+        return transcript
+
+    def recognize(self, audio, backends, timeout=RECOGNITION_TIMEOUT, race=None, streams=()):
+        """Retorna (motor, texto, ação) do vencedor, ou None se nenhum motor entendeu.
+
+        `streams` são futuros de `stream` da mesma sessão: o melhor resultado abaixo
+        do limiar só é usado depois que eles terminam sem agir.
+        """
+        futures = {}
+        for backend in backends:
+            self._count(backend, "calls")
+            futures[self._pool().submit(self._run, backend, audio)] = backend
+
+        winner = None
+        fallback = None  # (pontuação, resultado) do melhor resultado abaixo do limiar
+        pending = set(futures) | set(streams)
+        deadline = time.monotonic() + timeout
+        while pending and winner is None and not (race is not None and race.done.is_set()):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"Reconhecimento: nenhum motor respondeu em {timeout:.1f} s")
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = futures.get(future)
+                if backend is None or future.exception():
+                    continue  # um stream terminou (se agiu, `race` já está encerrada)
+                result = future.result()
+                if not result:
+                    continue
+                text, confidence = result
+                action = text if text in voice_commands.handlers else find_voice_command(text)
+                if action and (confidence is None or confidence >= backend.min_confidence):
+                    winner = (backend, text, action)
+                    break
+                score = (action is not None, confidence or 0.0)
+                if fallback is None or score > fallback[0]:
+                    fallback = (score, (backend, text, action))
+        for future, backend in futures.items():
+            if future.cancel():
+                self._count(backend, "cancelled")
+
+        if winner is None and fallback is not None:
+            winner = fallback[1]
+        if winner is not None and race is not None and not race.claim(winner[0].name):
+            winner = None  # o streaming agiu primeiro
+        if winner is not None and winner[2]:
+            self._count(winner[0], "wins")
+        return winner
+
+    def rows(self):
+        with self._lock:
+            rows = []
+            for name, stats in self.stats.items():
+                latency = stats["latency"]
+                rows.append({
+                    "motor": name,
+                    "chamadas": stats["calls"],
+                    "vitorias": stats["wins"],
+                    "vitorias_pct": stats["wins"] / stats["calls"] * 100 if stats["calls"] else 0.0,
+                    "erros": stats["errors"],
+                    "vazios": stats["empty"],
+                    "cancelados": stats["cancelled"],
+                    "p50_ms": latency.percentile(50) * 1000,
+                    "p95_ms": latency.percentile(95) * 1000,
+                })
+            return rows
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+recognition = RecognitionOrchestrator()
+
+def trim_silence(samples, rate, threshold):
+    """Corta o silêncio do início e do fim (VAD por energia em quadros de VAD_FRAME_SECONDS)"""
+    frame = max(1, int(rate * VAD_FRAME_SECONDS))
+    count = len(samples) // frame
+    if count == 0:
+        return samples
+    frames = samples[:count * frame].astype(np.float32).reshape(count, frame)
+    loud = np.sqrt(np.mean(frames ** 2, axis=1)) > threshold
+    if not loud.any():
+        return samples
+    padding = int(VAD_PADDING_SECONDS / VAD_FRAME_SECONDS)
+    first = max(0, int(np.argmax(loud)) - padding)
+    last = min(count, count - int(np.argmax(loud[::-1])) + padding)
+    return samples[first * frame:last * frame]
+
+def prepare_audio(audio):
+    """Reduz a frase antes do envio: corta o silêncio e reamostra para UPLOAD_SAMPLE_RATE.
+
+    O microfone já grava em mono; o resultado é um sr.AudioData PCM 16 bits mono.
+    """
+    samples = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16)
+    samples = trim_silence(samples, audio.sample_rate, voice_recognizer.energy_threshold)
+    rate = audio.sample_rate
+    if rate > UPLOAD_SAMPLE_RATE:
+        samples = resample_linear(samples.astype(np.float32), rate, UPLOAD_SAMPLE_RATE)
+        samples = np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+        rate = UPLOAD_SAMPLE_RATE
+    return sr.AudioData(samples.tobytes(), rate, 2)
+
+def encode_audio(audio):
+    """Codifica para envio; retorna (bytes, codificação do RecognitionConfig).
+
+    Usa FLAC (sem perdas, cerca de metade do PCM) quando o conversor de
+    speech_recognition está disponível e cai para LINEAR16 bruto caso contrário.
+    """
+    global upload_encoding
+    if upload_encoding == 'FLAC':
+        try:
+            return audio.get_flac_data(), 'FLAC'
+        except (OSError, AssertionError) as e:
+            print(f"FLAC indisponível, enviando LINEAR16: {e}")
+            upload_encoding = 'LINEAR16'
+    return audio.get_raw_data(convert_width=2), 'LINEAR16'
+
+lowpass_kernels = {}
+
+def lowpass_kernel(source_rate, target_rate):
+    """FIR windowed-sinc (Blackman) que remove o que dobraria no Nyquist da taxa de destino"""
+    key = (source_rate, target_rate)
+    kernel = lowpass_kernels.get(key)
+    if kernel is None:
+        cutoff = RESAMPLE_CUTOFF * target_rate / source_rate
+        n = np.arange(RESAMPLE_TAPS) - (RESAMPLE_TAPS - 1) / 2
+        kernel = (np.sinc(2 * cutoff * n) * np.blackman(RESAMPLE_TAPS)).astype(np.float32)
+        kernel /= kernel.sum()
+        lowpass_kernels[key] = kernel
+    return kernel
+
+def resample_stream(chunks, source_rate, target_rate):
+    """Reamostra pedaços PCM 16 bits em sequência, mantendo a fase e o filtro entre pedaços"""
+    if source_rate <= target_rate:
+        yield from chunks
+        return
+    step = source_rate / target_rate
+    kernel = lowpass_kernel(source_rate, target_rate)
+    history = np.zeros(len(kernel) - 1, dtype=np.float32)  # entrada anterior que o FIR ainda enxerga
+    position = 0.0  # posição da próxima amostra de saída, relativa ao início de `tail`
+    tail = np.zeros(0, dtype=np.float32)
+    for chunk in chunks:
+        padded = np.concatenate((history, np.frombuffer(chunk, dtype=np.int16).astype(np.float32)))
+        history = padded[len(padded) - len(history):]
+        samples = np.concatenate((tail, np.convolve(padded, kernel, mode='valid')))
+        if len(samples) - 1 < position:
+            tail = samples
+            continue
+        count = int((len(samples) - 1 - position) / step) + 1
+        positions = position + np.arange(count) * step
+        out = np.interp(positions, np.arange(len(samples)), samples)
+        position += count * step
+        keep = min(int(position), len(samples))
+        tail = samples[keep:]
+        position -= keep
+        yield np.clip(np.round(out), -32768, 32767).astype(np.int16).tobytes()
+
+def recognition_backends():
+    """Motores disponíveis agora: o local (se houver exemplos gravados) e os da nuvem"""
+    backends = [local_backend] if keyword_spotter.templates else []
+    return backends + [backend for backend in (google_backend, web_backend) if backend is not None]
+
+def recognize_audio(audio, backends=None, race=None, streams=()):
+    """Reconhece a frase em todos os motores ao mesmo tempo; retorna (motor, texto, ação) ou None"""
+    start = time.perf_counter()
+    audio = prepare_audio(audio)
+    metrics.record('voice_prepare', time.perf_counter() - start)
+    start = time.perf_counter()
+    if backends is None:
+        backends = recognition_backends()
+    result = recognition.recognize(audio, backends, race=race, streams=streams)
+    if result:
+        metrics.record('voice_recognition', time.perf_counter() - start)
+    return result
+
+class AudioCapture:
+    """Microfone aberto permanentemente, gravando num buffer circular.
+
+    Uma thread dedicada lê o dispositivo sem parar para um array int16 de
+    AUDIO_RING_SECONDS segundos. Ao ativar a voz, a frase começa PREROLL_SECONDS
+    antes do toque no botão, mesmo que a sessão só comece depois (um toque que
+    esperou outra sessão terminar), então a primeira sílaba não se perde. O nível de ruído é
+    medido continuamente enquanto ninguém fala e fica em cache em
+    `voice_recognizer.energy_threshold`, sem a espera de adjust_for_ambient_noise.
+    """
+    def __init__(self):
+        self.rate = None
+        self.chunk = None
+        self.buffer = None
+        self.written = 0  # total de amostras já gravadas (posição absoluta)
+        self.written_at = 0.0  # time.monotonic() da última escrita, para achar a posição de um instante
+        self.recording = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._condition = threading.Condition()
+        self._noise = deque(maxlen=64)  # energia dos últimos pedaços sem fala
+        self._last_calibration = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Abre o microfone (idempotente); retorna False se não houver dispositivo"""
+        if not self.running:
+            self._stop.clear()
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self._ready.wait(5.0) and self.running
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _run(self):
+        global microphone_names
+        try:
+            with sr.Microphone() as source:
+                self.rate, self.chunk = source.SAMPLE_RATE, source.CHUNK
+                self.buffer = np.zeros(int(self.rate * AUDIO_RING_SECONDS), dtype=np.int16)
+                self.written = 0
+                self._ready.set()
+                while not self._stop.is_set():
+                    samples = np.frombuffer(source.stream.read(self.chunk), dtype=np.int16)
+                    self._write(samples)
+                    if not self.recording:
+                        self._calibrate(samples)
+        except Exception as e:
+            microphone_names = None  # dispositivo removido ou trocado: refaz a varredura na próxima vez
+            print(f"Erro no microfone: {e}")
+        finally:
+            self._ready.set()
+            with self._condition:
+                self._condition.notify_all()
+
+    def _write(self, samples):
+        size = len(self.buffer)
+        start = self.written % size
+        end = start + len(samples)
+        if end <= size:
+            self.buffer[start:end] = samples
+        else:
+            split = size - start
+            self.buffer[start:] = samples[:split]
+            self.buffer[:end - size] = samples[split:]
+        with self._condition:
+            self.written += len(samples)
+            self.written_at = time.monotonic()
+            self._condition.notify_all()
+
+    def _calibrate(self, samples):
+        """Atualiza o limiar de energia a partir dos pedaços mais silenciosos recentes"""
+        self._noise.append(rms_energy(samples))
+        now = time.monotonic()
+        if now - self._last_calibration >= NOISE_RECALIBRATE_INTERVAL and len(self._noise) >= 8:
+            self._last_calibration = now
+            floor = float(np.percentile(self._noise, 20))
+            voice_recognizer.energy_threshold = max(floor * voice_recognizer.dynamic_energy_ratio,
+                                                    MIN_ENERGY_THRESHOLD)
+
+    def read(self, start, end):
+        """Cópia das amostras [start, end) em posições absolutas"""
+        size = len(self.buffer)
+        start = max(start, self.written - size)
+        count = end - start
+        if count <= 0:
+            return np.zeros(0, dtype=np.int16)
+        first = start % size
+        if first + count <= size:
+            return self.buffer[first:first + count].copy()
+        return np.concatenate((self.buffer[first:], self.buffer[:first + count - size]))
+
+    def follow(self, position):
+        """Gera (posição, amostras) a partir de `position` conforme o áudio chega"""
+        while not self._stop.is_set():
+            with self._condition:
+                if self.written - position < self.chunk:
+                    self._condition.wait(0.5)
+                    if not self.running:
+                        return
+                    continue
+                end = min(self.written, position + self.chunk)  # atraso acumulado sai pedaço a pedaço
+            yield end, self.read(position, end)
+            position = end
+
+    def preroll_position(self, pressed=None):
+        """Posição PREROLL_SECONDS antes do toque `pressed` (time.monotonic()), ou de agora"""
+        with self._condition:
+            written, written_at = self.written, self.written_at
+        anchor = written
+        if pressed is not None:
+            anchor -= int(max(written_at - pressed, 0.0) * self.rate)
+        return max(anchor - int(PREROLL_SECONDS * self.rate), written - len(self.buffer), 0)
+
+    def stream_chunks(self, pressed=None):
+        """Pedaços PCM (bytes) desde o pré-roll, para o reconhecimento em streaming"""
+        for _, samples in self.follow(self.preroll_position(pressed)):
+            yield samples.tobytes()
+
+    def record_phrase(self, timeout=5, phrase_time_limit=7, pause_threshold=None, cancel=None, pressed=None):
+        """Grava uma frase a partir do pré-roll do toque e termina após uma pausa (VAD por energia).
+
+        Retorna None se o evento `cancel` for sinalizado antes do fim da frase.
+        """
+        if pause_threshold is None:
+            pause_threshold = voice_recognizer.pause_threshold
+        start = self.preroll_position(pressed)
+        deadline = self.written + int(timeout * self.rate)  # o timeout conta a partir de agora
+        self.recording = True
+        try:
+            speech_at = None
+            silence = 0.0
+            for end, samples in self.follow(start):
+                if cancel is not None and cancel.is_set():
+                    return None
+                loud = rms_energy(samples) > voice_recognizer.energy_threshold
+                if speech_at is None:
+                    if loud:
+                        speech_at = end
+                    elif end > deadline:
+                        raise sr.WaitTimeoutError("Nenhuma fala detectada")
+                else:
+                    silence = 0.0 if loud else silence + len(samples) / self.rate
+                    if silence >= pause_threshold or (end - speech_at) / self.rate >= phrase_time_limit:
+                        break
+            else:
+                raise sr.WaitTimeoutError("Microfone encerrado")
+            return sr.AudioData(self.read(start, end).tobytes(), self.rate, 2)
+        finally:
+            self.recording = False
+
+def rms_energy(samples):
+    """Energia RMS na mesma escala de speech_recognition (amostras int16)"""
+    if len(samples) == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+audio_capture = AudioCapture()
+
+def stream_voice_command(backend, capture, timeout=5, phrase_time_limit=7, pressed=None, race=None):
+    """Reconhece em streaming enquanto o usuário fala.
+
+    Executa o comando assim que uma hipótese parcial estável corresponde a um comando
+    conhecido, sem esperar o fim da fala. Retorna o texto executado ou None. Com
+    `race`, só executa se ganhar dela, e para de enviar áudio quando outro ganha.
+    """
+    finished = threading.Event()
+    start = time.perf_counter()
+
+    def chunks():
+        deadline = time.monotonic() + timeout + phrase_time_limit
+        for chunk in capture.stream_chunks(pressed):
+            if (finished.is_set() or io_core.stopping.is_set() or time.monotonic() >= deadline
+                    or (race is not None and race.done.is_set())):
+                return
+            yield chunk
+
+    try:
+        pcm = resample_stream(chunks(), capture.rate, UPLOAD_SAMPLE_RATE)
+        for transcript, is_final, stability in backend.stream(pcm, min(capture.rate, UPLOAD_SAMPLE_RATE)):
+            if is_final or (stability >= STREAMING_STABILITY and find_voice_command(transcript)):
+                if race is not None and not race.claim(backend.name):
+                    return None
+                print(f"{backend.name} ({'final' if is_final else 'parcial'}): {transcript}")
+                metrics.record('voice_streaming', time.perf_counter() - start)
+                enqueue_voice_command(transcript, pressed=pressed)
+                return transcript
+    finally:
+        finished.set()  # encerra o envio de áudio e fecha o stream
+    return None
+
+def audio_to_samples(audio, rate=KWS_SAMPLE_RATE):
+    """Converte um sr.AudioData (PCM 16 bits) em float32 mono na taxa pedida"""
+    samples = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16).astype(np.float32) / 32768.0
+    return resample_linear(samples, audio.sample_rate, rate)
+
+def resample_linear(samples, source_rate, target_rate):
+    """Reamostragem por interpolação linear, com passa-baixa antes de reduzir a taxa.
+
+    Sem o filtro, o que houvesse entre o novo Nyquist e o antigo (8-24 kHz vindo de
+    48 kHz) dobraria para dentro da faixa da fala.
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    if source_rate > target_rate:
+        kernel = lowpass_kernel(source_rate, target_rate)
+        delay = (len(kernel) - 1) // 2  # FIR de fase linear: recentra a saída
+        samples = np.convolve(samples, kernel)[delay:delay + len(samples)]
+    count = int(len(samples) * target_rate / source_rate)
+    positions = np.arange(count, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def read_wav_samples(path, rate=KWS_SAMPLE_RATE):
+    """Lê um WAV PCM 16 bits como float32 mono na taxa pedida"""
+    with wave.open(path, "rb") as wav:
+        frames = wav.readframes(wav.getnframes())
+        samples = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+        if wav.getnchannels() > 1:
+            samples = samples.reshape(-1, wav.getnchannels()).mean(axis=1)
+        return resample_linear(samples, wav.getframerate(), rate)
+
+class KeywordSpotter:
+    """Reconhecimento local do vocabulário fixo de comandos, sem rede.
+
+    Cada comando tem gravações de exemplo em `keyword_samples/<ação>/*.wav`. O áudio é
+    convertido em MFCC e comparado com os exemplos por DTW; a confiança é a margem
+    entre a melhor ação e a segunda melhor.
+    """
+    frame_length = 400  # 25 ms a 16 kHz
+    hop_length = 160    # 10 ms
+    n_fft = 512
+    n_mels = 26
+    n_mfcc = 13
+
+    def __init__(self, rate=KWS_SAMPLE_RATE):
+        self.rate = rate
+        self.templates = []  # (ação, mfcc)
+        self._window = np.hamming(self.frame_length).astype(np.float32)
+        self._mel = self._mel_filterbank()
+        k = np.arange(self.n_mels)
+        self._dct = np.cos(np.pi / self.n_mels * (k + 0.5)[None, :] * np.arange(self.n_mfcc)[:, None]).astype(np.float32)
+
+    def _mel_filterbank(self):
+        def to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def to_hz(mel):
+            return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+        points = to_hz(np.linspace(to_mel(60.0), to_mel(self.rate / 2), self.n_mels + 2))
+        bins = np.floor((self.n_fft + 1) * points / self.rate).astype(int)
+        bank = np.zeros((self.n_mels, self.n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, self.n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        return bank
+
+    def features(self, samples):
+        """MFCC com normalização de média, só dos quadros com voz"""
+        if len(samples) < self.frame_length:
+            return None
+        emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])
+        count = 1 + (len(emphasized) - self.frame_length) // self.hop_length
+        index = np.arange(self.frame_length)[None, :] + self.hop_length * np.arange(count)[:, None]
+        frames = emphasized[index] * self._window
+
+        # Descarta o silêncio antes e depois do comando
+        energy = (frames ** 2).mean(axis=1)
+        voiced = np.nonzero(energy > energy.max() * 0.02)[0]
+        if len(voiced) < 5:
+            return None
+        frames = frames[voiced[0]:voiced[-1] + 1]
+
+        power = np.abs(np.fft.rfft(frames, self.n_fft)) ** 2 / self.n_fft
+        mel = np.log(power @ self._mel.T + 1e-10)
+        mfcc = mel @ self._dct.T
+        return mfcc - mfcc.mean(axis=0)
+
+    @staticmethod
+    def dtw_distance(a, b):
+        """DTW normalizado pelo tamanho; cada linha é resolvida de forma vetorizada"""
+        cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+        previous = np.cumsum(cost[0])
+        for i in range(1, len(a)):
+            row = cost[i]
+            # Melhor vindo de cima ou da diagonal; o passo horizontal vira um mínimo acumulado
+            best = np.minimum(previous, np.append(np.inf, previous[:-1])) + row
+            prefix = np.cumsum(row)
+            previous = prefix + np.minimum.accumulate(best - prefix)
+        return previous[-1] / (len(a) + len(b))
+
+    def load(self, directory):
+        """Carrega os exemplos gravados; retorna quantos foram lidos"""
+        self.templates = []
+        if not os.path.isdir(directory):
+            return 0
+        for action in sorted(os.listdir(directory)):
+            folder = os.path.join(directory, action)
+            if action not in voice_commands.aliases or not os.path.isdir(folder):
+                continue
+            for name in sorted(os.listdir(folder)):
+                if name.lower().endswith(".wav"):
+                    try:
+                        mfcc = self.features(read_wav_samples(os.path.join(folder, name), self.rate))
+                    except (OSError, wave.Error) as e:
+                        print(f"Exemplo de voz inválido {name}: {e}")
+                        continue
+                    if mfcc is not None:
+                        self.templates.append((action, mfcc))
+        return len(self.templates)
+
+    def match(self, mfcc, templates=None):
+        """Retorna (ação, confiança) comparando MFCC com os exemplos"""
+        best = {}
+        for action, template in (templates if templates is not None else self.templates):
+            distance = self.dtw_distance(mfcc, template)
+            if distance < best.get(action, np.inf):
+                best[action] = distance
+        if not best:
+            return None, 0.0
+        ranked = sorted(best.items(), key=lambda item: item[1])
+        action, distance = ranked[0]
+        reference = ranked[1][1] if len(ranked) > 1 else KWS_REJECT_DISTANCE
+        return action, float(max(0.0, 1.0 - distance / reference))
+
+    def spot(self, audio):
+        """Reconhece um sr.AudioData; retorna (ação, confiança)"""
+        if not self.templates:
+            return None, 0.0
+        mfcc = self.features(audio_to_samples(audio, self.rate))
+        if mfcc is None:
+            return None, 0.0
+        return self.match(mfcc)
+
+    def benchmark(self):
+        """Avaliação leave-one-out nos exemplos gravados: (acertos, total, latência média, p95)"""
+        hits, latencies = 0, []
+        for i, (expected, mfcc) in enumerate(self.templates):
+            others = self.templates[:i] + self.templates[i + 1:]
+            start = time.perf_counter()
+            action, confidence = self.match(mfcc, others)
+            latencies.append(time.perf_counter() - start)
+            if action == expected and confidence >= KWS_CONFIDENCE:
+                hits += 1
+        if not latencies:
+            return 0, 0, 0.0, 0.0
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return hits, len(latencies), sum(latencies) / len(latencies), p95
+
+keyword_spotter = KeywordSpotter()
+
+class KeywordBackend(RecognizerBackend):
+    """Reconhecimento local pelos exemplos gravados; o texto devolvido é o nome da ação"""
+    name = "Local"
+    min_confidence = KWS_CONFIDENCE
+    metric = 'voice_local'
+
+    def __init__(self, spotter):
+        self.spotter = spotter
+
+    def recognize(self, audio):
+        action, confidence = self.spotter.spot(audio)
+        return (action, confidence) if action else None
+
+local_backend = KeywordBackend(keyword_spotter)
+
+def load_voice_support():
+    """Importa e conecta o subsistema de voz só quando ele é usado.
+
+    speech_recognition (PortAudio) e o cliente gRPC do Google Cloud custam caro
+    para carregar; por isso nada disso acontece no import do addon. Esta função
+    roda no aquecimento em segundo plano do IOCore ou na primeira ativação, o que
+    vier antes, e é segura para chamadas concorrentes. Retorna False se a voz não
+    estiver disponível; nesse caso a próxima ativação tenta de novo.
+    """
+    global sr, speech, voice_recognizer, google_client, google_backend, web_backend, voice_loaded
+    with voice_lock:
+        if voice_loaded:
+            return True
+        start = time.perf_counter()
+        try:
+            import speech_recognition
+            recognizer = speech_recognition.Recognizer()
+        except Exception as e:
+            print(f"Reconhecimento de voz indisponível: {e}")
+            return False
+
+        recognizer.energy_threshold = 300
+        recognizer.dynamic_energy_threshold = False
+        recognizer.pause_threshold = 1.0
+        voice_recognizer = recognizer
+        web_backend = WebSpeechBackend(recognizer)
+
+        if os.path.exists(GOOGLE_CREDENTIALS_PATH):
+            try:
+                from google.cloud import speech_v1p1beta1
+                from google.oauth2 import service_account
+                credentials = service_account.Credentials.from_service_account_file(GOOGLE_CREDENTIALS_PATH)
+                speech = speech_v1p1beta1
+                google_client = speech.SpeechClient(credentials=credentials)
+                google_backend = GoogleCloudBackend(google_client)
+            except Exception as e:
+                print(f"Google Cloud indisponível: {e}")
+
+        keyword_spotter.load(KEYWORD_SAMPLES_DIR)
+        sr = speech_recognition
+        voice_loaded = True
+        print(f"Subsistema de voz carregado em {(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+
+def list_microphones(refresh=False):
+    """Nomes dos microfones; a varredura completa do PortAudio só roda na primeira vez ou com refresh"""
+    global microphone_names
+    if microphone_names is None or refresh:
+        try:
+            microphone_names = sr.Microphone.list_microphone_names()
+        except Exception as e:
+            print(f"Erro ao listar microfones: {e}")
+            microphone_names = []
+    return microphone_names
+
+def open_microphone():
+    """Garante o microfone aberto; se falhar, refaz a varredura (hotplug) e tenta mais uma vez"""
+    if not load_voice_support():
+        return False
+    if list_microphones() and audio_capture.start():
+        return True
+    return bool(list_microphones(refresh=True)) and audio_capture.start()
+
 def test_microphone():
     """Testa o microfone usando o Google Cloud Speech-to-Text"""
-    global google_client
-    
-    if not google_client:
+    load_voice_support()
+    if not google_backend:
         return "Google Cloud credentials not found"
+    if not open_microphone():
+        return "Nenhum microfone detectado"
     
-    r = sr.Recognizer()
-    r.energy_threshold = 400
-    r.pause_threshold = 0.8
-    
-    with sr.Microphone() as source:
-        try:
-            print("Ajustando para ruído ambiente...")
-            r.adjust_for_ambient_noise(source, duration=2)
-            print("Fale agora (aguardando comando)...")
-            
-            audio = r.listen(source, timeout=5, phrase_time_limit=3)
-            
-            # Salva o áudio para debug
-            audio_file = os.path.join(bpy.app.tempdir, "teste_microfone.wav")
-            with open(audio_file, "wb") as f:
-                f.write(audio.get_wav_data())
-            
-            # Configuração do reconhecimento
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=44100,
-                language_code='pt-BR',
-                enable_automatic_punctuation=False,
-                model='command_and_search',
-                speech_contexts=[{
-                    "phrases": ["teste", "cubo", "esfera", "frente", "trás", "render", "renderizar", "cuba", "cilindro", 'textura', 'texture'],
-                    "boost": 15.0
-                }]
-            )
-            
-            # Envia para o Google Cloud
-            audio_content = audio.get_wav_data()
-            response = google_client.recognize(
-                config=config,
-                audio={"content": audio_content}
-            )
+    try:
+        print("Fale agora (aguardando comando)...")
+
+        if use_streaming_recognition:
+            transcript = stream_voice_command(google_backend, audio_capture, phrase_time_limit=3)
+            return f"Comando: {transcript}" if transcript else "Nenhum comando reconhecido"
+        
+        audio = audio_capture.record_phrase(timeout=5, phrase_time_limit=3, pause_threshold=0.8)
+        
+        # Salva o áudio para debug
+        audio_file = os.path.join(bpy.app.tempdir, "teste_microfone.wav")
+        with open(audio_file, "wb") as f:
+            f.write(audio.get_wav_data())
+        
+        result = google_backend.recognize(prepare_audio(audio))
+        if result:
+            transcript, confidence = result
+            process_voice_command(transcript)
+            return f"Comando: {transcript} (Confiança: {confidence:.0%})"
+        else:
+            return "Nenhum comando reconhecido"
             
-            # Processa os resultados
-            if response.results:
-                result = response.results[0].alternatives[0]
-                process_voice_command(result.transcript)
-                return f"Comando: {result.transcript} (Confiança: {result.confidence:.0%})"
+    except sr.WaitTimeoutError:
+        return "Tempo esgotado - nenhum áudio detectado"
+    except Exception as e:
+        return f"Erro: {str(e)}"
+
+def voice_session(pressed=None):
+    """Escuta e reconhece um comando; retorna False se não houver microfone"""
+    global is_listening
+    
+    if not open_microphone():
+        print("Nenhum microfone detectado!")
+        return False
+
+    print("Pronto para receber comandos...")
+    is_listening = True
+    race = RecognitionRace()
+    try:
+        # O streaming (se houver) corre junto com a gravação da frase inteira: age quem
+        # tiver um resultado confiável primeiro, parcial estável ou frase reconhecida
+        streams = []
+        streamer = active_streaming_backend()
+        if streamer and use_streaming_recognition:
+            streams.append(recognition.stream(streamer, audio_capture, race, pressed))
+
+        start = time.perf_counter()
+        audio = audio_capture.record_phrase(timeout=5, phrase_time_limit=7, cancel=race.done, pressed=pressed)
+        recognized = None
+        if audio is not None:
+            metrics.record('voice_capture', time.perf_counter() - start)
+            # O motor do streaming já está recebendo o áudio; só entra aqui se ele falhou
+            streaming_failed = streams and streams[0].done() and streams[0].exception()
+            backends = [b for b in recognition_backends()
+                        if b is not streamer or not streams or streaming_failed]
+            recognized = recognize_audio(audio, backends, race, streams)
+        if recognized:
+            backend, command, action = recognized
+            print(f"{backend.name}: {command}")
+            if backend is local_backend:
+                command = f"{action} (local)"
+            enqueue_voice_command(command, action, pressed)
+        elif race.winner is None:
+            print("Não foi possível entender o áudio")
+        
+    except sr.WaitTimeoutError:
+        print("Tempo limite de escuta atingido")
+    except Exception as e:
+        print(f"Erro na captura de voz: {str(e)}")
+    finally:
+        race.finish()  # encerra um streaming que ainda esteja enviando áudio
+        is_listening = False
+    return True
+
+def parse_legacy_packet(data):
+    """Decodifica o formato texto antigo 'VRX=.. VRY=.. BTN=.. ZOOM=.. comandoVoz=..'
+
+    Texto sem os campos VRX e VRY não é um pacote: levanta ValueError em vez de
+    criar uma placa centralizada a partir de qualquer datagrama.
+    """
+    vrx = vry = None
+    buttons = 0
+    for part in bytes(data).decode(errors="ignore").split():
+        if '=' in part:
+            key, value = part.split('=', 1)
+            if key == 'VRX':
+                vrx = int(value)
+            elif key == 'VRY':
+                vry = int(value)
+            elif key == 'BTN' and value.lower() == 'pressionado':
+                buttons |= BUTTON_JOYSTICK
+            elif key == 'ZOOM' and value.lower() == 'ativo':
+                buttons |= BUTTON_ZOOM
+            elif key == 'comandoVoz' and value.lower() == 'ativo':
+                buttons |= BUTTON_VOICE
+    if vrx is None or vry is None:
+        raise ValueError("pacote de texto sem VRX/VRY")
+    return None, None, vrx, vry, buttons, None
+
+def parse_packet(data):
+    """Decodifica um datagrama em (seq, tempo_placa_ms, vrx, vry, botões, toques).
+
+    Pacotes binários são reconhecidos pelo magic; o resto é tratado como texto legado,
+    que não tem sequência nem tempo da placa (None). `toques` são os contadores de
+    toques da versão 2, ou None. Retorna None se o pacote for inválido.
+    """
+    if len(data) >= PACKET_STRUCT.size and data[:2] == PACKET_MAGIC:
+        version = data[2]
+        if version == PACKET_VERSION_PRESSES and len(data) >= PACKET_STRUCT_V2.size:
+            _, _, buttons, seq, device_ms, vrx, vry, joy, zoom, voice = PACKET_STRUCT_V2.unpack_from(data)
+            return seq, device_ms, vrx, vry, buttons, (joy, zoom, voice)
+        if version != PACKET_VERSION:
+            return None
+        _, _, buttons, seq, device_ms, vrx, vry = PACKET_STRUCT.unpack_from(data)
+        return seq, device_ms, vrx, vry, buttons, None
+    try:
+        return parse_legacy_packet(data)
+    except ValueError:
+        return None
+
+def is_newer_sequence(seq, last_seq):
+    """Aceita só pacotes mais novos que o último (com wraparound de 32 bits)"""
+    if seq is None or last_seq is None:
+        return True
+    delta = (seq - last_seq) & 0xFFFFFFFF
+    if delta == 0:
+        return False  # duplicado
+    if delta < 0x80000000:
+        return True
+    # Muito atrás: a placa reiniciou e a sequência voltou para zero
+    return (last_seq - seq) & 0xFFFFFFFF > SEQ_RESET_WINDOW
+
+def board_restarted(device, device_ms, now):
+    """A placa reiniciou: o relógio dela voltou atrás ou ela ficou muda além de DEVICE_TIMEOUT.
+
+    A sequência sozinha não basta: uma placa que reinicia antes de enviar
+    SEQ_RESET_WINDOW pacotes teria tudo descartado como duplicado até passar do
+    número antigo.
+    """
+    if device.last_seq is None:
+        return False
+    if now - device.last_seen > DEVICE_TIMEOUT:
+        return True
+    if device_ms is None or device.last_device_ms is None:
+        return False
+    back = (device.last_device_ms - device_ms) & 0xFFFFFFFF
+    return DEVICE_CLOCK_RESET_WINDOW < back < 0x80000000
+
+def get_device(address):
+    """Dispositivo do endereço de origem, criado no primeiro pacote"""
+    device = devices.get(address)
+    if device is None:
+        used = {d.area_index for d in list(devices.values())}
+        index = next(i for i in range(len(used) + 1) if i not in used)
+        device = ControllerDevice(address, index)
+        devices[address] = device
+        print(f"Nova placa conectada: {device.name}")
+    return device
+
+def find_device(name):
+    return next((d for d in list(devices.values()) if d.name == name), None)
+
+class ButtonEvent:
+    """Toque ou soltura de um botão, numerado na ordem em que chegou"""
+    __slots__ = ("seq", "device", "button", "pressed", "timestamp")
+
+    def __init__(self, seq, device, button, pressed, timestamp):
+        self.seq = seq
+        self.device = device
+        self.button = button
+        self.pressed = pressed
+        self.timestamp = timestamp  # time.monotonic() da chegada do pacote
+
+def emit_button_event(device, button, pressed, now):
+    """Entrega um toque. O de voz vai direto da thread de rede para o IOCore, sem
+    depender do timer da interface; os que mexem na interface esperam a thread principal.
+    """
+    global button_event_seq
+    if button == BUTTON_VOICE:
+        if pressed:
+            request_voice_session(now)
+        return
+    button_event_seq += 1
+    button_events.append(ButtonEvent(button_event_seq, device, button, pressed, now))
+
+def update_buttons(device, buttons, presses, now):
+    """Transforma o pacote em eventos de botão sem perder toques.
+
+    Com contadores de toques (protocolo v2) cada toque contado pela placa vira um
+    evento, mesmo que tenha começado e terminado entre dois pacotes ou num pacote
+    perdido. Sem contadores, os eventos saem das bordas do nível, com debounce.
+    """
+    previous = device.buttons
+    counts = device.press_counts
+    for index, bit in enumerate(BUTTON_BITS):
+        level = bool(buttons & bit)
+        was = bool(previous & bit)
+        if presses is not None and counts is not None:
+            count = (presses[index] - counts[index]) & 0xFF
+            if count > BUTTON_MAX_PRESSES:
+                count = 0  # contadores reiniciados junto com a placa
+            if count == 0:
+                if was != level:
+                    emit_button_event(device, bit, level, now)
+                continue
+            if was:
+                emit_button_event(device, bit, False, now)
+            for i in range(count):
+                emit_button_event(device, bit, True, now)
+                if i < count - 1 or not level:
+                    emit_button_event(device, bit, False, now)
+        elif level and not was:
+            if now - device.last_press.get(bit, 0.0) >= BUTTON_DEBOUNCE:
+                device.last_press[bit] = now
+                emit_button_event(device, bit, True, now)
             else:
-                return "Nenhum comando reconhecido"
-                
-        except sr.WaitTimeoutError:
-            return "Tempo esgotado - nenhum áudio detectado"
-        except Exception as e:
-            return f"Erro: {str(e)}"
+                buttons &= ~bit  # repique: só vale se continuar apertado depois do debounce
+        elif was and not level:
+            emit_button_event(device, bit, False, now)
+    device.buttons = buttons
+    device.press_counts = presses
+
+def request_voice_session(pressed):
+    """Pede uma sessão de voz ao IOCore a partir de um toque no botão de voz"""
+    io_core.request_voice(pressed)
+
+def drain_button_events():
+    """Executa na thread principal as ações dos toques pendentes, em ordem"""
+    global last_button_event_seq
+    now = time.monotonic()
+    while button_events:
+        event = button_events.popleft()
+        if event.seq != last_button_event_seq + 1 and last_button_event_seq:
+            print(f"{event.seq - last_button_event_seq - 1} eventos de botão descartados (fila cheia)")
+        last_button_event_seq = event.seq
+        if not event.pressed or now - event.timestamp > BUTTON_STALE_AFTER:
+            continue
+        if event.button == BUTTON_JOYSTICK:
+            with view3d_override(event.device.area_index):
+                bpy.ops.wm.call_menu_pie(name="VIEW3D_MT_joystick_pie_menu")
+        else:
+            continue
+        metrics.record('button', time.monotonic() - event.timestamp)
+
+def handle_datagram(data, address):
+    """Decodifica um datagrama e publica o novo estado da placa que o enviou"""
+    now = time.monotonic()
+    accepted = accept_datagram(data, address, now)
+    if accepted:
+        publish_state(accepted[0], accepted[1], now)
+
+def accept_datagram(data, address, now):
+    """Valida um datagrama e entrega seus eventos de botão; retorna (placa, pacote) ou None.
+
+    O estado dos eixos não é publicado aqui: ao esvaziar uma fila de pacotes só o
+    mais novo de cada placa precisa virar JoystickState.
+    """
+    packet = parse_packet(data)
+    if packet is None:
+        return None
+
+    device = get_device(address)
+    seq, device_ms, vrx, vry, buttons, presses = packet
+    if board_restarted(device, device_ms, now):
+        print(f"Placa {device.name} reiniciou")
+        device.last_seq = None
+    if not is_newer_sequence(seq, device.last_seq):
+        return None  # fora de ordem ou duplicado
+    record_packet(device, seq, device_ms, now)
+    device.last_seq = seq
+    device.last_device_ms = device_ms
+    device.last_seen = now
+    update_buttons(device, buttons, presses, now)
+    return device, packet
+
+def publish_state(device, packet, now):
+    """Publica o estado completo com uma única troca de referência"""
+    seq, device_ms, vrx, vry, buttons, _ = packet
+    device.raw = (vrx, vry)
+    x, y = device.profile.apply(vrx, vry)
+    device.state = JoystickState(
+        x=x,
+        y=y,
+        button=bool(buttons & BUTTON_JOYSTICK),
+        zoom=bool(buttons & BUTTON_ZOOM),
+        voice=bool(buttons & BUTTON_VOICE),
+        seq=seq,
+        device_ms=device_ms,
+        timestamp=now,
+    )
+
+def record_packet(device, seq, device_ms, now):
+    """Atualiza perda, jitter e atraso relativo de rede com um pacote aceito"""
+    device.packets += 1
+    if seq is not None and device.last_seq is not None:
+        gap = (seq - device.last_seq) & 0xFFFFFFFF
+        if 1 < gap < 0x80000000:
+            device.lost += gap - 1
+    if device_ms is None:
+        return
+    # Os relógios não são sincronizados: o trânsito só vale comparado com ele mesmo
+    transit = now - device_ms / 1000.0
+    if device.transit is not None:
+        delta = abs(transit - device.transit)
+        if delta < 1.0:  # acima disso a placa reiniciou
+            device.jitter += (delta - device.jitter) / 16.0
+    device.transit = transit
+    if device.min_transit is None or transit < device.min_transit or transit - device.min_transit > 1.0:
+        device.min_transit = transit
+    metrics.record('network', transit - device.min_transit)
+
+def prune_devices():
+    """Esquece placas que pararam de enviar há mais de DEVICE_TIMEOUT"""
+    limit = time.monotonic() - DEVICE_TIMEOUT
+    for address, device in list(devices.items()):
+        if device.last_seen < limit:
+            del devices[address]
+            print(f"Placa desconectada: {device.name}")
+
+class IOCore:
+    """Único laço asyncio do addon, numa thread de fundo, dono da rede e da voz.
+
+    `start` e `stop` são idempotentes e podem ser chamados quantas vezes for
+    preciso: cada ciclo abre os sockets, cria as tarefas e, ao parar, cancela
+    tudo e fecha os sockets. Cada ciclo tem seu próprio laço e executor, e um
+    novo ciclo só começa depois que a thread do anterior terminou, então o número
+    de threads fica constante: o laço, um executor de voz e o microfone persistente.
+    """
+    def __init__(self):
+        self.loop = None
+        self.stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._voice_requests = None
+        self._buffer = bytearray(UDP_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self.largest_batch = 0  # maior número de datagramas lidos num único despertar
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, ports=None):
+        """Inicia o laço; se um stop anterior ainda estiver fechando, espera ele terminar antes"""
+        with self._lock:
+            if self.running and not self.stopping.is_set():
+                return
+            previous = self._thread
+        if previous is not None:
+            previous.join(IO_RESTART_TIMEOUT)  # fora do lock: a thread antiga pode precisar dele
+            if previous.is_alive():
+                print("Servidor anterior ainda fechando; tente iniciar de novo em instantes")
+                return
+        with self._lock:
+            if self._thread is not previous:
+                return  # outra chamada de start já reiniciou
+            self.stopping.clear()
+            # Laço de seletores em todas as plataformas (o Proactor do Windows não tem add_reader)
+            self.loop = asyncio.SelectorEventLoop()
+            self._voice_requests = asyncio.Queue()
+            started = threading.Event()
+            self._thread = threading.Thread(target=self._run,
+                                            args=(self.loop, self._voice_requests, ports or UDP_PORTS, started),
+                                            name="bitblender-io", daemon=True)
+            self._thread.start()
+        started.wait(5.0)
+
+    def stop(self, timeout=IO_STOP_WAIT):
+        """Pede o fim do laço e espera até `timeout` segundos.
+
+        Uma sessão de voz em andamento pode atrasar o fechamento; nesse caso a thread
+        termina sozinha em segundo plano e o próximo `start` espera por ela.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            if not self.stopping.is_set():
+                self.stopping.set()
+                audio_capture.stop()  # libera uma frase que esteja sendo gravada
+                try:
+                    self.loop.call_soon_threadsafe(self.loop.stop)
+                except RuntimeError:
+                    pass  # o laço já terminou
+        thread.join(timeout)
+        with self._lock:
+            if self._thread is thread and not thread.is_alive():
+                self._thread = None
+
+    def request_voice(self, pressed):
+        """Entrega um toque do botão de voz ao laço (seguro a partir de qualquer thread)"""
+        with self._lock:
+            if self.running and not self.stopping.is_set():
+                self.loop.call_soon_threadsafe(self._voice_requests.put_nowait, pressed)
+
+    def _run(self, loop, requests, ports, started):
+        """Corpo da thread de IO; usa só o laço, o executor e os sockets deste ciclo"""
+        asyncio.set_event_loop(loop)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bitblender-voz")
+        sockets = []
+        try:
+            loop.run_until_complete(self._open(loop, requests, executor, sockets, ports))
+            started.set()
+            loop.run_forever()
+        finally:
+            started.set()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            for sock in sockets:
+                loop.remove_reader(sock.fileno())
+                sock.close()
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            audio_capture.stop()
+            executor.shutdown(wait=True)
+            recognition.shutdown()
+            loop.close()
+            print("Servidor parado")
+
+    async def _open(self, loop, requests, executor, sockets, ports):
+        for port in ports:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
+                sock.bind(("0.0.0.0", port))
+            except OSError as e:
+                sock.close()
+                print(f"Erro ao abrir a porta UDP {port}: {e}")
+                continue
+            sock.setblocking(False)
+            loop.add_reader(sock.fileno(), self._drain, sock)
+            sockets.append(sock)
+            rcvbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            print(f"Servidor UDP iniciado na porta {port} (buffer {rcvbuf // 1024} KB)")
+        loop.create_task(self._prune_devices())
+        loop.create_task(self._voice_loop(loop, requests, executor))
+        loop.call_later(VOICE_WARMUP_DELAY, loop.run_in_executor, executor, load_voice_support)
+
+    def _drain(self, sock):
+        """Lê tudo o que está pendente no socket; só o pacote mais novo de cada placa vira estado.
+
+        Depois de um travamento do Blender a fila inteira é consumida num único
+        despertar: os toques de botão de todos os pacotes são entregues e os eixos
+        pulam direto para a leitura mais recente, sem reproduzir o movimento atrasado.
+        """
+        now = time.monotonic()
+        latest = {}
+        count = 0
+        errors = 0
+        error = None
+        while count < UDP_DRAIN_MAX:
+            count += 1  # erros também contam: um socket que sempre falha não prende a thread
+            try:
+                size, address = sock.recvfrom_into(self._buffer)
+                accepted = accept_datagram(self._view[:size], address, now)
+            except (BlockingIOError, InterruptedError):
+                count -= 1
+                break
+            except Exception as e:  # p.ex. ICMP de porta inalcançável no Windows
+                errors += 1
+                error = error or e
+                continue
+            if accepted:
+                latest[accepted[0]] = accepted[1]
+        if errors:
+            print(f"Erro UDP: {error}" + (f" (+{errors - 1})" if errors > 1 else ""))
+        for device, packet in latest.items():
+            publish_state(device, packet, now)
+        if count > self.largest_batch:
+            self.largest_batch = count
+
+    async def _prune_devices(self):
+        while True:
+            await asyncio.sleep(1.0)
+            prune_devices()
+            now = time.monotonic()
+            for device in list(devices.values()):
+                device.update_rate(now)
+
+    async def _voice_loop(self, loop, requests, executor):
+        """Dispara uma sessão de voz (bloqueante, no executor) a cada toque no botão de voz.
+
+        Fica suspenso na fila sem consumir CPU até um toque chegar. As sessões são
+        serializadas; toques que esperaram mais que VOICE_REQUEST_TTL são descartados.
+        """
+        while True:
+            pressed = await requests.get()
+            waited = time.monotonic() - pressed
+            if waited > VOICE_REQUEST_TTL:
+                continue
+            metrics.record('voice_activation', waited)
+            await loop.run_in_executor(executor, voice_session, pressed)
+
+io_core = IOCore()
+
+class BoardSimulator:
+    """Emula o firmware embarcaHack.c: envia quadros binários por UDP sem a placa.
+
+    O joystick descreve um círculo a cada `period` segundos. `loss` e `reorder` são
+    as probabilidades de descartar um pacote ou de trocá-lo de lugar com o seguinte.
+    Taxas de alguns kHz são enviadas em rajadas a cada milissegundo.
+    """
+    def __init__(self, rate=10.0, loss=0.0, reorder=0.0, port=None, amplitude=0.8, period=4.0):
+        self.rate = rate
+        self.loss = loss
+        self.reorder = reorder
+        self.port = port or UDP_PORTS[0]
+        self.amplitude = amplitude
+        self.period = period
+        self.buttons = 0
+        self.sent = 0
+        self.address = None
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def frame(self, seq, elapsed):
+        """Quadro binário do pacote `seq`, `elapsed` segundos após o boot simulado"""
+        angle = 2.0 * math.pi * elapsed / self.period
+        vrx = int(2048 + self.amplitude * 2047 * math.cos(angle))
+        vry = int(2048 + self.amplitude * 2047 * math.sin(angle))
+        return PACKET_STRUCT.pack(PACKET_MAGIC, PACKET_VERSION, self.buttons, seq & 0xFFFFFFFF,
+                                  int(elapsed * 1000) & 0xFFFFFFFF, vrx, vry)
+
+    def start(self):
+        self._stop.clear()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self.address = self._sock.getsockname()
+        self._thread = threading.Thread(target=self._run, name="bitblender-simulador", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2.0)
+            self._thread = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        devices.pop(self.address, None)
+
+    def _run(self):
+        target = ("127.0.0.1", self.port)
+        start = time.monotonic()
+        seq = 0
+        held = None
+        while not self._stop.is_set():
+            due = int((time.monotonic() - start) * self.rate)
+            while seq < due:
+                packet = self.frame(seq, seq / self.rate)
+                seq += 1
+                if random.random() < self.loss:
+                    continue
+                if held is None and random.random() < self.reorder:
+                    held = packet
+                    continue
+                try:
+                    self._sock.sendto(packet, target)
+                    if held is not None:
+                        self._sock.sendto(held, target)
+                        held = None
+                except OSError:
+                    return
+                self.sent += 1
+            self._stop.wait(min(1.0 / self.rate, 0.001 if self.rate > 1000 else 0.005))
+
+class FakeSpeechBackend(RecognizerBackend):
+    """Motor de voz simulado: devolve as frases em sequência após `latency` segundos"""
+    name = "Simulado"
+
+    def __init__(self, phrases, latency=0.05, confidence=1.0, name=None):
+        self.phrases = phrases
+        self.latency = latency
+        self.confidence = confidence
+        if name:
+            self.name = name
+        self._index = 0
+
+    def recognize(self, audio):
+        time.sleep(self.latency)
+        phrase = self.phrases[self._index % len(self.phrases)]
+        self._index += 1
+        return phrase, self.confidence
+
+simulator = None
+
+def load_benchmark_baseline(path):
+    """Referências de um benchmark anterior, ou {} se ainda não houver"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_benchmark_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def compare_with_baseline(results, baseline, tolerance=BENCHMARK_TOLERANCE):
+    """Chaves que pioraram mais que `tolerance` em relação à referência.
+
+    Chaves terminadas em _pps são vazões (maior é melhor); as demais são tempos.
+    """
+    regressions = []
+    for key, value in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        if key.endswith("_pps"):
+            worse = value < reference * (1.0 - tolerance)
+        else:
+            worse = value > reference * (1.0 + tolerance)
+        if worse:
+            regressions.append(key)
+    return regressions
+
+class PerformanceBenchmark:
+    """Mede o addon dentro do Blender com a placa e a voz simuladas.
 
-def voice_capture_thread():
-    global is_listening, last_voice_activation, google_client
-    
-    while not stop_threads:
+    As fases rodam num gerador avançado por bpy.app.timers, então o modal e o
+    timer de comandos continuam rodando entre elas. Os resultados são comparados
+    com BENCHMARK_BASELINE_PATH; uma piora maior que BENCHMARK_TOLERANCE conta
+    como regressão.
+    """
+    def __init__(self):
+        self.running = False
+        self.results = {}
+        self.regressions = []
+        self.save_baseline = False
+        self._phases = None
+
+    def start(self, save_baseline=False):
+        if self.running:
+            return False
+        self.running = True
+        self.results = {}
+        self.regressions = []
+        self.save_baseline = save_baseline
+        self._phases = self._run()
+        bpy.app.timers.register(self._step)
+        return True
+
+    def _step(self):
         try:
-            if not sr.Microphone.list_microphone_names():
-                print("Nenhum microfone detectado!")
-                threading.Event().wait(2.0)
-                continue
-                
-            if datetime.now() - last_voice_activation < timedelta(seconds=3):
-                if not is_listening:
-                    print("Ativando microfone...")
-                    is_listening = True
-                    
-                    with sr.Microphone() as source:
-                        try:
-                            voice_recognizer.adjust_for_ambient_noise(source, duration=1)
-                            print("Pronto para receber comandos...")
-                            
-                            audio = voice_recognizer.listen(source, timeout=5, phrase_time_limit=7)
-                            
-                            # Tenta primeiro com o Google Cloud se disponível
-                            if google_client:
-                                try:
-                                    config = speech.RecognitionConfig(
-                                        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                                        sample_rate_hertz=44100,
-                                        language_code='pt-BR',
-                                        model='command_and_search'
-                                    )
-                                    audio_content = audio.get_wav_data()
-                                    response = google_client.recognize(
-                                        config=config,
-                                        audio={"content": audio_content}
-                                    )
-                                    
-                                    if response.results:
-                                        command = response.results[0].alternatives[0].transcript
-                                        print(f"Google Cloud: {command}")
-                                        process_voice_command(command)
-                                        continue
-                                except Exception as e:
-                                    print(f"Erro Google Cloud: {e}")
-                            
-                            # Fallback para reconhecimento local
-                            command = voice_recognizer.recognize_google(audio, language='pt-BR')
-                            print(f"Reconhecimento local: {command}")
-                            process_voice_command(command)
-                            
-                        except sr.WaitTimeoutError:
-                            print("Tempo limite de escuta atingido")
-                        except sr.UnknownValueError:
-                            print("Não foi possível entender o áudio")
-                        except Exception as e:
-                            print(f"Erro na captura de voz: {str(e)}")
-                    
-                    is_listening = False
-            else:
-                if is_listening:
-                    is_listening = False
-            
-            threading.Event().wait(0.1)
+            return next(self._phases)
+        except StopIteration:
+            self._finish()
         except Exception as e:
-            print(f"Erro crítico na thread de voz: {str(e)}")
-            break
-
-def udp_server_thread(port=8080):
-    global joystick_data, stop_threads, last_voice_activation
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("", port))
-    sock.settimeout(1.0)
-    
-    print(f"Servidor UDP iniciado na porta {port}")
-    
-    while not stop_threads:
+            print(f"Erro no benchmark: {e}")
+            self._phases.close()
+            self.running = False
+        return None
+
+    def _run(self):
+        wm = bpy.context.window_manager
+        saved = (wm.joystick_mode, wm.joystick_keying, wm.joystick_scope)
+        target = wm.joystick_target
+        target_rotation = tuple(target.rotation_euler) if target else None
+        views = [(r, r.view_location.copy(), r.view_rotation.copy())
+                 for r in self._view_regions()]
         try:
-            data, _ = sock.recvfrom(1024)
-            msg = data.decode().strip()
-            
-            if "comandoVoz=Ativo" in msg:
-                last_voice_activation = datetime.now()
-            
-            parts = msg.split()
-            joystick_data.update({"x": 0.0, "y": 0.0, "button": False, "zoom": False})
-            
-            for part in parts:
-                if '=' in part:
-                    key, value = part.split('=', 1)
-                    if key == 'VRX':
-                        x = int(value)
-                        joystick_data["x"] = (x - 2048) / 2048
-                    elif key == 'VRY':
-                        y = int(value)
-                        joystick_data["y"] = (y - 2048) / 2048
-                    elif key == 'BTN':
-                        joystick_data["button"] = value.lower() == 'pressionado'
-                    elif key == 'ZOOM':
-                        joystick_data["zoom"] = value.lower() == 'ativo'
-                    #elif key == 'Microfone':
-                        #joystick_data['Microfone'] = value.lower() == 'ativo'
-                    elif key == 'comandoVoz':
-                        joystick_data["comandoVoz"] = value.lower() == 'ativo'
-            
-        except socket.timeout:
-            continue
-        except Exception as e:
-            print(f"Erro UDP: {e}")
-    
-    sock.close()
+            self._benchmark_parse()
+            yield BENCHMARK_SETTLE
+            for count in BENCHMARK_SELECTION_SIZES:
+                self._benchmark_selection(count)
+                yield BENCHMARK_SETTLE
+
+            wm.joystick_keying = 'PREVIEW'
+            wm.joystick_scope = 'TARGET'
+            for mode, _, _ in JOYSTICK_MODE_ITEMS:
+                if mode != 'FREE' and not target:
+                    print(f"Benchmark: modo {mode} ignorado (sem objeto alvo)")
+                    continue
+                wm.joystick_mode = mode
+                metrics.reset()
+                board = BoardSimulator(rate=BENCHMARK_PACKET_RATE, loss=0.02, reorder=0.02)
+                board.start()
+                try:
+                    yield BENCHMARK_PHASE_SECONDS
+                finally:
+                    board.stop()
+                tick = metrics.histograms['tick']
+                self.results[f"tick_p50_ms_{mode}"] = tick.percentile(50) * 1000
+                self.results[f"tick_p95_ms_{mode}"] = tick.percentile(95) * 1000
+                self.results[f"packet_age_p95_ms_{mode}"] = metrics.histograms['packet_age'].percentile(95) * 1000
+
+            metrics.reset()
+            backend = FakeSpeechBackend(["frente", "trás"])
+            sender = threading.Thread(target=self._send_commands, args=(backend,), daemon=True)
+            sender.start()
+            while sender.is_alive() or command_queue:
+                yield COMMAND_DRAIN_INTERVAL
+            yield COMMAND_DRAIN_INTERVAL * 2
+            total = metrics.histograms['voice_total']
+            self.results["dispatch_p50_ms"] = total.percentile(50) * 1000 - backend.latency * 1000
+            self.results["dispatch_p95_ms"] = total.percentile(95) * 1000 - backend.latency * 1000
+        finally:
+            wm.joystick_mode, wm.joystick_keying, wm.joystick_scope = saved
+            if target and target_rotation:
+                target.rotation_euler = target_rotation
+            for region, location, rotation in views:
+                region.view_location = location
+                region.view_rotation = rotation
+
+    def _benchmark_parse(self):
+        board = BoardSimulator()
+        frames = [board.frame(i, i * 0.01) for i in range(BENCHMARK_PARSE_PACKETS)]
+        start = time.perf_counter()
+        for frame in frames:
+            parse_packet(frame)
+        self.results["parse_pps"] = len(frames) / (time.perf_counter() - start)
+
+        address = ("0.0.0.0", 0)
+        start = time.perf_counter()
+        for frame in frames:
+            handle_datagram(frame, address)
+        self.results["datagram_pps"] = len(frames) / (time.perf_counter() - start)
+        devices.pop(address, None)
+
+    def _benchmark_selection(self, count):
+        """Custo por tick de girar `count` objetos selecionados, numa cena temporária"""
+        scene = bpy.data.scenes.new("BitBlender Benchmark")
+        objects = [bpy.data.objects.new(f"bench_{i}", None) for i in range(count)]
+        try:
+            for obj in objects:
+                scene.collection.objects.link(obj)
+            view_layer = scene.view_layers[0]
+            for obj in objects:
+                obj.select_set(True, view_layer=view_layer)
+            selected = view_layer.objects.selected
+            transform = SelectionTransform()
+            start = time.perf_counter()
+            for _ in range(BENCHMARK_SELECTION_TICKS):
+                transform.offset(selected, "rotation_euler", 0, 0.01)
+            elapsed = (time.perf_counter() - start) / BENCHMARK_SELECTION_TICKS
+            self.results[f"selection_tick_ms_{count}"] = elapsed * 1000
+        finally:
+            bpy.data.batch_remove(objects)
+            bpy.data.scenes.remove(scene)
+
+    def _send_commands(self, backend):
+        for _ in range(BENCHMARK_COMMANDS):
+            pressed = time.monotonic()
+            text, _ = backend.recognize(None)
+            enqueue_voice_command(text, pressed=pressed)
+            time.sleep(COMMAND_MERGE_WINDOW * 0.25)
+
+    def _view_regions(self):
+        regions = []
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D' and area.spaces.active.region_3d:
+                    regions.append(area.spaces.active.region_3d)
+        return regions
+
+    def _finish(self):
+        self.running = False
+        baseline = load_benchmark_baseline(BENCHMARK_BASELINE_PATH)
+        regressions = compare_with_baseline(self.results, baseline)
+        self.regressions.extend(regressions)
+        for key, value in self.results.items():
+            reference = baseline.get(key)
+            status = " REGRESSÃO" if key in regressions else ""
+            print(f"Benchmark {key}: {value:.3f}" + (f" (referência {reference:.3f}){status}" if reference else ""))
+        if self.save_baseline:
+            save_benchmark_baseline(BENCHMARK_BASELINE_PATH, self.results)
+            print(f"Referência salva em {BENCHMARK_BASELINE_PATH}")
+
+benchmark = PerformanceBenchmark()
+
+class SessionRecorder:
+    """Grava a entrada de cada tick e a vista resultante num log binário só de acréscimo.
+
+    O arquivo é um cabeçalho (SESSION_MAGIC, tamanho e JSON com as configurações)
+    seguido de registros de tamanho fixo SESSION_DTYPE, um por placa e por tick, com
+    a vista de antes do tick. Os registros passam por um buffer NumPy e vão para o
+    disco a cada SESSION_FLUSH_ROWS.
+    """
+    def __init__(self, path, settings):
+        self.path = path
+        self.file = open(path, "wb")
+        header = json.dumps(settings).encode("utf-8")
+        self.file.write(SESSION_MAGIC + struct.pack("<I", len(header)) + header)
+        self.buffer = np.zeros(SESSION_FLUSH_ROWS, dtype=SESSION_DTYPE)
+        self.count = 0
+        self.total = 0
+
+    def add(self, device, region, now, dt, mode):
+        state = device.state
+        buttons = (BUTTON_JOYSTICK if state.button else 0) | (BUTTON_ZOOM if state.zoom else 0)
+        self.buffer[self.count] = (now, dt, device.area_index, SESSION_MODE_CODES[mode], buttons,
+                                   state.x, state.y, state.timestamp, tuple(region.view_location),
+                                   tuple(region.view_rotation), region.view_distance)
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer[:self.count].tobytes())
+        self.file.flush()
+        self.total += self.count
+        self.count = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        print(f"Sessão gravada: {self.total} registros em {self.path}")
+
+def open_session_log(path):
+    """Abre um log de sessão; retorna (configurações, registros em memmap)"""
+    with open(path, "rb") as f:
+        if f.read(len(SESSION_MAGIC)) != SESSION_MAGIC:
+            raise ValueError("Arquivo não é um log de sessão do BitBlender")
+        size, = struct.unpack("<I", f.read(4))
+        settings = json.loads(f.read(size).decode("utf-8"))
+    offset = len(SESSION_MAGIC) + 4 + size
+    count = (os.path.getsize(path) - offset) // SESSION_DTYPE.itemsize
+    if count == 0:
+        return settings, np.zeros(0, dtype=SESSION_DTYPE)
+    return settings, np.memmap(path, dtype=SESSION_DTYPE, mode="r", offset=offset, shape=(count,))
+
+class SessionPlayer:
+    """Reproduz um log pelo mesmo `_update_device` do modal, no tempo gravado.
+
+    Cada placa gravada vira um ControllerDevice próprio; os registros FREE e ORBIT
+    passam pelo caminho normal de navegação com o `now` e o `dt` originais, então o
+    resultado é determinístico. Nos demais modos só a vista gravada é aplicada. O
+    desvio entre a vista reproduzida e a gravada é medido a cada registro.
+    """
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.settings, self.records = open_session_log(path)
+        self.index = 0
+        self.started = None
+        self.devices = {}
+        self.max_error = 0.0
+        self._saved = None
+
+    def start(self, wm):
+        self._saved = {key: getattr(wm, key) for key in SESSION_SETTINGS}
+        for key in SESSION_SETTINGS:
+            if key in self.settings:
+                setattr(wm, key, self.settings[key])
+
+    def finish(self, wm):
+        for key, value in self._saved.items():
+            setattr(wm, key, value)
+        print(f"Reprodução concluída: {self.index} registros, desvio máximo {self.max_error:.2e}")
+
+    def step(self, operator, context, areas, now):
+        """Avança os registros até o tempo atual; retorna False quando o log acabou"""
+        records = self.records
+        if self.index >= len(records):
+            return False
+        if self.started is None:
+            self.started = now
+        limit = records['now'][0] + (now - self.started) * self.speed
+        end = max(int(np.searchsorted(records['now'], limit, side='right')), self.index + 1)
+        for record in records[self.index:end]:
+            self._play(operator, context, areas, record)
+        self.index = end
+        return self.index < len(records)
+
+    def _play(self, operator, context, areas, record):
+        device_id = int(record['device'])
+        device = self.devices.get(device_id)
+        first = device is None
+        if first:
+            device = ControllerDevice(("replay", device_id), device_id)
+            self.devices[device_id] = device
+        region = areas[device.area_index % len(areas)].spaces.active.region_3d
+        location = Vector(record['location'].tolist())
+        rotation = Quaternion(record['rotation'].tolist())
+        if first:
+            region.view_location = location
+            region.view_rotation = rotation
+            region.view_distance = float(record['distance'])
+        else:
+            angle = region.view_rotation.rotation_difference(rotation).angle
+            error = max((region.view_location - location).length, min(angle, 2 * math.pi - angle))
+            self.max_error = max(self.max_error, error)
+
+        stamp = float(record['stamp'])
+        if device.state.timestamp != stamp:
+            # Só eixos e zoom entram na navigação; os toques de botão não são reproduzidos
+            device.state = JoystickState(x=float(record['x']), y=float(record['y']),
+                                         zoom=bool(record['buttons'] & BUTTON_ZOOM), timestamp=stamp)
+        mode = JOYSTICK_MODE_ITEMS[record['mode']][0]
+        if mode in {'FREE', 'ORBIT'}:
+            device.mode = mode
+            dt = float(record['dt'])
+            operator._update_device(context, device, areas[device.area_index % len(areas)],
+                                    float(record['now']), dt, dt / TICK_INTERVAL)
+        else:
+            region.view_location = location
+            region.view_rotation = rotation
+
+def bake_session(path, camera, scene, device_id=None):
+    """Grava o caminho da vista de uma placa nas F-Curves da câmera, um quadro por frame.
+
+    Retorna o número de frames gravados.
+    """
+    settings, records = open_session_log(path)
+    if device_id is None and len(records):
+        device_id = int(records['device'][0])
+    rows = records[records['device'] == device_id]
+    if len(rows) == 0:
+        return 0
+
+    fps = scene.render.fps / scene.render.fps_base
+    times = rows['now'] - rows['now'][0]
+    frame_times = np.arange(0.0, times[-1] + 1e-9, 1.0 / fps)
+    picks = np.clip(np.searchsorted(times, frame_times), 0, len(rows) - 1)
+    frames = scene.frame_current + np.arange(len(picks), dtype=np.float64)
+
+    rotation = rows['rotation'][picks].astype(np.float64)
+    # Mantém o sinal do quatérnio contínuo para a interpolação não dar a volta longa
+    flips = np.einsum('ij,ij->i', rotation[1:], rotation[:-1]) < 0.0
+    signs = np.concatenate(([1.0], np.cumprod(np.where(flips, -1.0, 1.0))))
+    rotation *= signs[:, None]
+    w, x, y, z = rotation.T
+    distance = rows['distance'][picks].astype(np.float64)
+    # Câmera = ponto de interesse + rotação da vista aplicada a (0, 0, distância)
+    location = rows['location'][picks].astype(np.float64) + np.stack((
+        2.0 * (x * z + w * y) * distance,
+        2.0 * (y * z - w * x) * distance,
+        (1.0 - 2.0 * (x * x + y * y)) * distance), axis=1)
+
+    camera.rotation_mode = 'QUATERNION'
+    frame_list = frames.tolist()
+    for index in range(3):
+        write_fcurve_keys(camera, "location", index, list(zip(frame_list, location[:, index].tolist())))
+    for index in range(4):
+        write_fcurve_keys(camera, "rotation_quaternion", index, list(zip(frame_list, rotation[:, index].tolist())))
+    return len(frame_list)
+
+session_recorder = None
+session_player = None
 
 class VIEW3D_MT_JoystickPieMenu(Menu):
     bl_label = "Menu do Joystick"
@@ -339,15 +3060,26 @@ class VIEW3D_OT_JoystickNavigation(Operator):
     bl_idname = "view3d.joystick_navigation"
     bl_label = "Joystick View Navigation"
     _timer = None
-    initial_distance = None
+    _timer_duration = 0.0  # time_duration do nosso timer no último tick
+    _window = None
+    _interval = TICK_INTERVAL
+    _idle_since = None
+    _last_tick = None
+    _areas = None
+    _screen = None
 
     def execute(self, context):
         global modal_operator_instance
         wm = context.window_manager
         window = context.window
 
-        self.initial_distance = None
         self._timer = None
+        self._last_tick = None
+        self._idle_since = None
+        self._areas = None
+        self._screen = None
+        for device in list(devices.values()):
+            device.reset_navigation()
 
         if not window:
             for win in wm.windows:
@@ -362,96 +3094,215 @@ class VIEW3D_OT_JoystickNavigation(Operator):
             self.report({'ERROR'}, "Não foi possível encontrar uma janela com área 3D.")
             return {'CANCELLED'}
 
-        self._timer = wm.event_timer_add(0.02, window=window)
+        self._window = window
+        self._set_interval(context, TICK_INTERVAL)
         wm.modal_handler_add(self)
         modal_operator_instance = self
         self.report({'INFO'}, "Joystick View Navigation iniciado.")
         return {'RUNNING_MODAL'}
+
+    def _set_interval(self, context, interval):
+        """Recria o timer do modal com outro intervalo (ativo ou ocioso)"""
+        wm = context.window_manager
+        if self._timer:
+            wm.event_timer_remove(self._timer)
+        self._timer = wm.event_timer_add(interval, window=self._window)
+        self._timer_duration = self._timer.time_duration
+        self._interval = interval
+
+    def _find_areas(self, context):
+        """Áreas 3D em cache; só percorre `screen.areas` de novo quando a tela muda"""
+        screen = context.screen
+        if self._areas and self._screen == screen.as_pointer():
+            try:
+                if all(area.type == 'VIEW_3D' for area in self._areas):
+                    return self._areas
+            except ReferenceError:
+                pass  # uma área foi fechada
+        self._screen = screen.as_pointer()
+        self._areas = [a for a in screen.areas if a.type == 'VIEW_3D']
+        return self._areas
+
+    def _update_idle(self, context, active, now):
+        """Reduz a taxa do timer depois de IDLE_AFTER parado e volta ao normal no primeiro movimento"""
+        if active:
+            self._idle_since = None
+            if self._interval != TICK_INTERVAL:
+                self._set_interval(context, TICK_INTERVAL)
+        elif self._idle_since is None:
+            self._idle_since = now
+        elif self._interval == TICK_INTERVAL and now - self._idle_since > IDLE_AFTER:
+            self._set_interval(context, IDLE_TICK_INTERVAL)
     
     def modal(self, context, event):
-        global joystick_data, previous_button_state
-        wm = context.window_manager
+        if modal_operator_instance is not self:
+            return {'CANCELLED'}  # parado pelo botão "Parar"
 
         if event.type in {'MOUSEMOVE', 'LEFTMOUSE', 'MIDDLEMOUSE', 'RIGHTMOUSE'}:
             return {'PASS_THROUGH'}
         
         if event.type == 'TIMER':
-            area = next((a for a in context.screen.areas if a.type == 'VIEW_3D'), None)
-            if area:
-                space = area.spaces.active
-                region = getattr(space, "region_3d", None)
-                if region:
-                    move_speed = wm.joystick_sensitivity * 0.1
-                    mode = wm.joystick_mode
-                    target_obj = wm.joystick_target
-                    dx = joystick_data["x"]
-                    dy = -joystick_data["y"]
-                    zoom_active = joystick_data.get("zoom", False)
-                    deadzone_threshold = 0.1  # valor típico da zona morta
-
-                    if mode == 'ROTATE_X' and target_obj:
-                        if abs(dy) > deadzone_threshold:
-                            rotate_object(target_obj, 'X', dy * move_speed * 0.5)
-
-                    elif mode == 'ROTATE_Y' and target_obj:
-                        if abs(dx) > deadzone_threshold:
-                            rotate_object(target_obj, 'Y', dx * move_speed * 0.5)
-
-                    elif mode == 'ORBIT' and target_obj:
-                        rot_speed = wm.joystick_orbit_speed * 0.1
-                        #deadzone_threshold = 0.05  # valor típico para zona morta
-
-                        if self.initial_distance is None:
-                            self.initial_distance = (region.view_location - target_obj.location).length
-                            if self.initial_distance < 0.1:
-                                self.initial_distance = 3.0
-
-                        # Aplica zona morta
-                        if abs(dx) > deadzone_threshold:
-                            # Rotação horizontal ao redor do eixo Z global
-                            quat_z = Quaternion((0.0, 0.0, 1.0), -dx * rot_speed * 0.05)
-
-                            # Atualiza a rotação da câmera
-                            region.view_rotation = quat_z @ region.view_rotation
-
-                            # Mantém a distância do objeto após a rotação
-                            region.view_location = target_obj.location + region.view_rotation @ Vector((0.0, 0.0, self.initial_distance))
-
-
-                    elif mode == 'FREE':
-                        # Leitura do joystick
-                        dx = joystick_data.get("x", 0.0)
-                        dy = joystick_data.get("y", 0.0)
-                        zoom_active = joystick_data.get("zoom", False)
-
-                        # Configuração de velocidade e zona morta
-                        move_speed = wm.joystick_orbit_speed * 0.1
-                        deadzone_threshold = 0.05
-
-                        # Vetores de movimentação baseados na orientação da câmera
-                        right = region.view_rotation @ Vector((1.0, 0.0, 0.0))    # mover lateralmente
-                        up = region.view_rotation @ Vector((0.0, 1.0, 0.0))       # subir/descer
-                        forward = region.view_rotation @ Vector((0.0, 0.0, -1.0)) # avançar/recuar
-
-                        if zoom_active:
-                            if abs(dy) > deadzone_threshold:
-                                region.view_location += forward * dy * move_speed * 3.0  # mover para frente/trás
-                        else:
-                            if abs(dx) > deadzone_threshold:
-                                region.view_location += right * dx * move_speed          # mover lateralmente
-                            if abs(dy) > deadzone_threshold:
-                                region.view_location += up * dy * move_speed             # mover verticalmente
-
-                    if joystick_data["button"] and not previous_button_state:
-                        bpy.ops.wm.call_menu_pie(name="VIEW3D_MT_joystick_pie_menu")
-
-                    previous_button_state = joystick_data["button"]
-                    area.tag_redraw()
+            # O evento não diz de qual timer veio; o Blender só avança o time_duration
+            # do timer que disparou, então sem avanço o TIMER é de outro operador
+            duration = self._timer.time_duration
+            if duration == self._timer_duration:
+                return {'PASS_THROUGH'}
+            self._timer_duration = duration
+            now = time.monotonic()
+
+            if self._last_tick:
+                metrics.record('timer_interval', now - self._last_tick)
+            dt = min(now - self._last_tick, MAX_TICK_DT) if self._last_tick else TICK_INTERVAL
+            self._last_tick = now
+            tick_start = time.perf_counter()
+            step = dt / TICK_INTERVAL  # deixa o movimento independente da taxa de ticks
+            areas = self._find_areas(context)
+            if areas and session_player:
+                self._replay(context, areas, now)
+            elif areas:
+                active = False
+                wm = context.window_manager
+                for device in list(devices.values()):
+                    area = areas[device.area_index % len(areas)]
+                    if session_recorder and area.spaces.active.region_3d:
+                        mode = wm.joystick_mode if device.mode == 'DEFAULT' else device.mode
+                        session_recorder.add(device, area.spaces.active.region_3d, now, dt, mode)
+                    if self._update_device(context, device, area, now, dt, step):
+                        active = True
+                self._update_idle(context, active, now)
+                metrics.record('tick', time.perf_counter() - tick_start)
 
         return {'PASS_THROUGH'}
 
+    def _replay(self, context, areas, now):
+        """Avança a sessão em reprodução no lugar das placas reais"""
+        global session_player
+        self._update_idle(context, True, now)
+        if not session_player.step(self, context, areas, now):
+            session_player.finish(context.window_manager)
+            session_player = None
+
+    def _update_device(self, context, device, area, now, dt, step):
+        """Aplica a entrada de uma placa na sua área 3D; retorna True se ela não está parada"""
+        wm = context.window_manager
+        space = area.spaces.active
+        region = getattr(space, "region_3d", None)
+        if not region:
+            return False
+
+        state = device.state  # um snapshot consistente por tick
+        if state is not device.last_consumed and state.timestamp:
+            device.last_consumed = state
+            metrics.record('packet_age', now - state.timestamp)
+        if state.timestamp and now - state.timestamp > INPUT_STALE_AFTER:
+            # A placa parou de enviar: solta o joystick em vez de repetir a última leitura
+            if device.stale_state is None or device.stale_state.timestamp != state.timestamp:
+                device.stale_state = JoystickState(seq=state.seq, timestamp=state.timestamp)
+            state = device.stale_state
+        if (device.input is None or device.input.filter_type != wm.joystick_filter
+                or device.input.filters[0].smoothing != wm.joystick_smoothing):
+            device.input = JoystickInputStage(wm.joystick_filter, wm.joystick_smoothing)
+        input_x, input_y = device.input.sample(state, now, dt)
+
+        move_speed = wm.joystick_sensitivity * 0.1 * step
+        mode = wm.joystick_mode if device.mode == 'DEFAULT' else device.mode
+        target_obj = wm.joystick_target
+        dx = input_x
+        dy = -input_y
+        zoom_active = state.zoom
+        deadzone_threshold = MOTION_THRESHOLD  # a zona morta já veio do perfil da placa
+        recorder = device.recorder
+
+        keying = wm.joystick_keying
+        tolerance = wm.joystick_key_tolerance
+
+        use_selection = wm.joystick_scope == 'SELECTION'
+        if mode not in {'ROTATE_X', 'ROTATE_Y'} or use_selection or not target_obj:
+            recorder.finish(now)
+        if mode not in {'ROTATE_X', 'ROTATE_Y'} or not use_selection:
+            device.selection.finish(context, keying)
+
+        if mode in {'ROTATE_X', 'ROTATE_Y'} and use_selection:
+            # Gira toda a seleção com um foreach_get/foreach_set por tick
+            index, value = (0, dy) if mode == 'ROTATE_X' else (1, dx)
+            if abs(value) > deadzone_threshold:
+                device.selection.rotate(context, index, value * move_speed * 0.5)
+            else:
+                device.selection.finish(context, keying)
+
+        elif mode == 'ROTATE_X' and target_obj:
+            if abs(dy) > deadzone_threshold:
+                recorder.add(target_obj, 0, now, keying, tolerance)
+                rotate_object(target_obj, 'X', dy * move_speed * 0.5)
+            else:
+                recorder.finish(now)
+
+        elif mode == 'ROTATE_Y' and target_obj:
+            if abs(dx) > deadzone_threshold:
+                recorder.add(target_obj, 1, now, keying, tolerance)
+                rotate_object(target_obj, 'Y', dx * move_speed * 0.5)
+            else:
+                recorder.finish(now)
+
+        elif mode == 'ORBIT' and target_obj:
+            rot_speed = wm.joystick_orbit_speed * 0.1 * step
+
+            if device.initial_distance is None:
+                device.initial_distance = (region.view_location - target_obj.location).length
+                if device.initial_distance < 0.1:
+                    device.initial_distance = 3.0
+
+            # Só gira com o joystick fora do centro
+            if abs(dx) > deadzone_threshold:
+                # Rotação horizontal ao redor do eixo Z global
+                quat_z = Quaternion((0.0, 0.0, 1.0), -dx * rot_speed * 0.05)
+
+                # Atualiza a rotação da câmera
+                region.view_rotation = quat_z @ region.view_rotation
+
+                # Mantém a distância do objeto após a rotação
+                region.view_location = target_obj.location + region.view_rotation @ Vector((0.0, 0.0, device.initial_distance))
+
+
+        elif mode == 'FREE':
+            # Leitura do joystick
+            dx = input_x
+            dy = input_y
+
+            # Configuração de velocidade
+            move_speed = wm.joystick_orbit_speed * 0.1 * step
+
+            # Vetores de movimentação baseados na orientação da câmera
+            right = region.view_rotation @ Vector((1.0, 0.0, 0.0))    # mover lateralmente
+            up = region.view_rotation @ Vector((0.0, 1.0, 0.0))       # subir/descer
+            forward = region.view_rotation @ Vector((0.0, 0.0, -1.0)) # avançar/recuar
+
+            if zoom_active:
+                if abs(dy) > deadzone_threshold:
+                    region.view_location += forward * dy * move_speed * 3.0  # mover para frente/trás
+            else:
+                if abs(dx) > deadzone_threshold:
+                    region.view_location += right * dx * move_speed          # mover lateralmente
+                if abs(dy) > deadzone_threshold:
+                    region.view_location += up * dy * move_speed             # mover verticalmente
+
+        # Só redesenha quando a vista ou o objeto alvo mudaram de fato
+        view = (region.view_location.copy(), region.view_rotation.copy(), region.view_distance,
+                tuple(target_obj.rotation_euler) if target_obj else None, device.selection.revision)
+        if view != device.last_view:
+            device.last_view = view
+            area.tag_redraw()
+            if metrics.redraw_pending is None:
+                metrics.redraw_pending = time.perf_counter()
+
+        return (abs(input_x) > MOTION_THRESHOLD or abs(input_y) > MOTION_THRESHOLD
+                or state.button or state.zoom)
+
     def cancel(self, context):
         wm = context.window_manager
+        for device in list(devices.values()):
+            device.recorder.finish(time.monotonic())
+            device.selection.finish(context, wm.joystick_keying)
         if self._timer:
             wm.event_timer_remove(self._timer)
         self.report({'INFO'}, "Joystick View Navigation cancelado.")
@@ -461,11 +3312,10 @@ class VIEW3D_OT_StartJoystickNavigation(Operator):
     bl_label = "Iniciar Navegação"
 
     def execute(self, context):
-        global stop_threads
-        stop_threads = False
-        t = threading.Thread(target=udp_server_thread, daemon=True)
-        t.start()
+        io_core.start()
         print("Servidor UDP iniciado e aguardando dados do joystick...")
+        if modal_operator_instance:
+            return {'FINISHED'}  # a navegação já está rodando
         return bpy.ops.view3d.joystick_navigation()
 
 class VIEW3D_OT_StopJoystickNavigation(Operator):
@@ -473,14 +3323,145 @@ class VIEW3D_OT_StopJoystickNavigation(Operator):
     bl_label = "Parar Navegação"
 
     def execute(self, context):
-        global stop_threads, modal_operator_instance
-        stop_threads = True
+        global modal_operator_instance, simulator, session_recorder
+        if simulator:
+            simulator.stop()
+            simulator = None
+        if session_recorder:
+            session_recorder.close()
+            session_recorder = None
+        io_core.stop()
         if modal_operator_instance:
             modal_operator_instance.cancel(context)
             modal_operator_instance = None
         self.report({'INFO'}, "Navegação com joystick parada.")
         return {'FINISHED'}
 
+class VIEW3D_OT_JoystickDeviceSettings(Operator):
+    bl_idname = "view3d.joystick_device_settings"
+    bl_label = "Configurar Placa"
+    bl_description = "Escolhe o modo e a viewport controlados por uma placa"
+
+    device_name: StringProperty(name="Placa")
+    mode: EnumProperty(
+        name="Modo",
+        items=[('DEFAULT', "Padrão", "Usa o modo escolhido no painel")] + JOYSTICK_MODE_ITEMS
+    )
+    area_index: IntProperty(name="Viewport", min=0, default=0)
+    deadzone: FloatProperty(name="Zona Morta", min=0.0, max=0.5, default=DEADZONE)
+    expo: FloatProperty(name="Curva Expo", description="0 = linear, 1 = cúbica (mais precisão perto do centro)",
+                        min=0.0, max=1.0, default=0.0)
+    gain: FloatProperty(name="Ganho", min=0.1, max=2.0, default=1.0)
+
+    def invoke(self, context, event):
+        device = find_device(self.device_name)
+        if device is None:
+            return {'CANCELLED'}
+        self.mode = device.mode
+        self.area_index = device.area_index
+        self.deadzone = device.profile.deadzone
+        self.expo = device.profile.expo
+        self.gain = device.profile.gain
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "mode")
+        layout.prop(self, "area_index")
+        layout.prop(self, "deadzone", slider=True)
+        layout.prop(self, "expo", slider=True)
+        layout.prop(self, "gain", slider=True)
+        layout.operator("view3d.calibrate_device", icon='ORIENTATION_GIMBAL').device_name = self.device_name
+
+    def execute(self, context):
+        device = find_device(self.device_name)
+        if device is None:
+            self.report({'WARNING'}, "Placa desconectada.")
+            return {'CANCELLED'}
+        device.mode = self.mode
+        device.area_index = self.area_index
+        device.reset_navigation()
+        profile = device.profile
+        if (profile.deadzone, profile.expo, profile.gain) != (self.deadzone, self.expo, self.gain):
+            values = profile.to_dict()
+            values.update(deadzone=self.deadzone, expo=self.expo, gain=self.gain)
+            set_profile(device, JoystickProfile(**values))
+        return {'FINISHED'}
+
+class VIEW3D_OT_CalibrateDevice(Operator):
+    bl_idname = "view3d.calibrate_device"
+    bl_label = "Calibrar Placa"
+    bl_description = "Mede o centro em repouso e os limites do joystick e salva o perfil da placa"
+
+    device_name: StringProperty(name="Placa")
+
+    def invoke(self, context, event):
+        device = find_device(self.device_name)
+        if device is None:
+            self.report({'WARNING'}, "Placa desconectada.")
+            return {'CANCELLED'}
+        self._device = device
+        self._phase = 'REST'
+        self._phase_start = time.monotonic()
+        self._samples = []
+        self._last_state = None
+        self._timer = context.window_manager.event_timer_add(0.02, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        context.workspace.status_text_set("Calibração: solte o joystick e não toque nele (Esc cancela)")
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._finish(context)
+            self.report({'INFO'}, "Calibração cancelada.")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        device = self._device
+        if device.state is not self._last_state:
+            self._last_state = device.state
+            self._samples.append(device.raw)
+
+        elapsed = time.monotonic() - self._phase_start
+        if self._phase == 'REST' and elapsed >= CALIBRATION_REST_SECONDS:
+            self._rest = np.array(self._samples or [device.raw], dtype=np.float64)
+            self._phase = 'RANGE'
+            self._phase_start = time.monotonic()
+            self._samples = []
+            context.workspace.status_text_set("Calibração: gire o joystick em círculos até o limite (Esc cancela)")
+        elif self._phase == 'RANGE' and elapsed >= CALIBRATION_RANGE_SECONDS:
+            self._finish(context)
+            profile = self._build_profile(device)
+            set_profile(device, profile)
+            self.report({'INFO'}, f"Placa calibrada: centro ({profile.center_x}, {profile.center_y}), "
+                                  f"zona morta {profile.deadzone:.2f}")
+            return {'FINISHED'}
+        return {'PASS_THROUGH'}
+
+    def _build_profile(self, device):
+        """Centro pela mediana do repouso, zona morta pelo ruído e limites pelos extremos"""
+        center = np.median(self._rest, axis=0)
+        travel = np.array(self._samples or [device.raw], dtype=np.float64)
+        low, high = travel.min(axis=0), travel.max(axis=0)
+        old = device.profile
+        limits = []
+        for axis, (default_low, default_high) in enumerate(((old.min_x, old.max_x), (old.min_y, old.max_y))):
+            limits.append((int(low[axis]) if center[axis] - low[axis] >= CALIBRATION_MIN_TRAVEL else default_low,
+                           int(high[axis]) if high[axis] - center[axis] >= CALIBRATION_MIN_TRAVEL else default_high))
+        half_range = np.array([min(center[i] - limits[i][0], limits[i][1] - center[i]) for i in range(2)])
+        noise = float(np.max(np.abs(self._rest - center) / np.maximum(half_range, 1.0)))
+        return JoystickProfile(
+            center_x=int(round(center[0])), center_y=int(round(center[1])),
+            min_x=limits[0][0], max_x=limits[0][1], min_y=limits[1][0], max_y=limits[1][1],
+            deadzone=min(max(CALIBRATION_MIN_DEADZONE, noise * 2.0), 0.5),
+            expo=old.expo, gain=old.gain,
+        )
+
+    def _finish(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+
 class VIEW3D_OT_SetMode(Operator):
     bl_idname = "view3d.set_mode"
     bl_label = "Trocar Modo"
@@ -532,6 +3513,268 @@ class VIEW3D_OT_TestMicrophone(Operator):
         self.report({'INFO'}, result)
         return {'FINISHED'}
 
+class VIEW3D_OT_RecordVoiceSample(Operator):
+    bl_idname = "view3d.record_voice_sample"
+    bl_label = "Gravar Exemplo de Voz"
+    bl_description = "Grava um exemplo do comando para o reconhecimento local sem rede"
+
+    action: EnumProperty(
+        name="Comando",
+        items=[(action, action.capitalize(), "") for action in voice_commands.actions]
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        if not open_microphone():
+            self.report({'ERROR'}, "Nenhum microfone detectado")
+            return {'CANCELLED'}
+        try:
+            audio = audio_capture.record_phrase(timeout=5, phrase_time_limit=2, pause_threshold=0.5)
+        except sr.WaitTimeoutError:
+            self.report({'WARNING'}, "Tempo esgotado - nenhum áudio detectado")
+            return {'CANCELLED'}
+
+        folder = os.path.join(KEYWORD_SAMPLES_DIR, self.action)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, datetime.now().strftime("%Y%m%d_%H%M%S.wav"))
+        with open(path, "wb") as f:
+            f.write(audio.get_wav_data(convert_rate=KWS_SAMPLE_RATE, convert_width=2))
+        count = keyword_spotter.load(KEYWORD_SAMPLES_DIR)
+        self.report({'INFO'}, f"Exemplo salvo ({count} exemplos carregados)")
+        return {'FINISHED'}
+
+class VIEW3D_OT_BenchmarkKeywords(Operator):
+    bl_idname = "view3d.benchmark_keywords"
+    bl_label = "Avaliar Reconhecimento Local"
+    bl_description = "Mede acerto e latência do reconhecimento local com os exemplos gravados"
+
+    def execute(self, context):
+        keyword_spotter.load(KEYWORD_SAMPLES_DIR)
+        hits, total, mean, p95 = keyword_spotter.benchmark()
+        if not total:
+            self.report({'WARNING'}, "Nenhum exemplo gravado")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Acerto {hits}/{total} ({hits / total:.0%}), "
+                              f"latência média {mean * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+        return {'FINISHED'}
+
+class VIEW3D_OT_RecordSession(Operator):
+    bl_idname = "view3d.record_session"
+    bl_label = "Gravar Sessão"
+    bl_description = "Liga ou desliga a gravação da entrada do joystick e da vista num log binário"
+
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.bblog", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        if session_recorder:
+            return self.execute(context)
+        self.filepath = datetime.now().strftime("sessao_%Y%m%d_%H%M%S.bblog")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        global session_recorder
+        if session_recorder:
+            session_recorder.close()
+            session_recorder = None
+            self.report({'INFO'}, "Gravação da sessão encerrada.")
+            return {'FINISHED'}
+        wm = context.window_manager
+        now = time.monotonic()
+        for device in list(devices.values()):
+            # Filtros e distância orbital recomeçam do zero, como na reprodução
+            device.recorder.finish(now)
+            device.reset_navigation()
+        try:
+            session_recorder = SessionRecorder(self.filepath, {key: getattr(wm, key) for key in SESSION_SETTINGS})
+        except OSError as e:
+            self.report({'ERROR'}, f"Erro ao criar o log: {e}")
+            return {'CANCELLED'}
+        bpy.ops.view3d.start_joystick_server()
+        self.report({'INFO'}, f"Gravando sessão em {self.filepath}")
+        return {'FINISHED'}
+
+class VIEW3D_OT_ReplaySession(Operator):
+    bl_idname = "view3d.replay_session"
+    bl_label = "Reproduzir Sessão"
+    bl_description = "Reproduz um log gravado pelo mesmo caminho de navegação do joystick"
+
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.bblog", options={'HIDDEN'})
+    speed: FloatProperty(name="Velocidade", min=0.1, max=100.0, default=1.0)
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        global session_player
+        if session_recorder:
+            self.report({'WARNING'}, "Encerre a gravação antes de reproduzir.")
+            return {'CANCELLED'}
+        try:
+            player = SessionPlayer(self.filepath, self.speed)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Erro ao abrir o log: {e}")
+            return {'CANCELLED'}
+        if not len(player.records):
+            self.report({'WARNING'}, "Log vazio.")
+            return {'CANCELLED'}
+        if session_player:
+            session_player.finish(context.window_manager)
+        player.start(context.window_manager)
+        session_player = player
+        bpy.ops.view3d.start_joystick_server()
+        self.report({'INFO'}, f"Reproduzindo {len(player.records)} registros")
+        return {'FINISHED'}
+
+class VIEW3D_OT_BakeSession(Operator):
+    bl_idname = "view3d.bake_session"
+    bl_label = "Gravar na Câmera"
+    bl_description = "Converte o caminho de um log em animação da câmera da cena a partir do frame atual"
+
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.bblog", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        obj = context.active_object
+        camera = obj if obj and obj.type == 'CAMERA' else context.scene.camera
+        if camera is None:
+            self.report({'ERROR'}, "Nenhuma câmera ativa na cena.")
+            return {'CANCELLED'}
+        try:
+            frames = bake_session(self.filepath, camera, context.scene)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Erro ao abrir o log: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{frames} frames gravados em {camera.name}")
+        return {'FINISHED'}
+
+class VIEW3D_OT_SimulateBoard(Operator):
+    bl_idname = "view3d.simulate_board"
+    bl_label = "Simular Placa"
+    bl_description = "Liga ou desliga uma BitDogLab simulada enviando pacotes para o servidor local"
+
+    rate: FloatProperty(name="Taxa (Hz)", min=1.0, max=5000.0, default=10.0)
+    loss: FloatProperty(name="Perda", min=0.0, max=0.9, default=0.0, subtype='FACTOR')
+    reorder: FloatProperty(name="Fora de ordem", min=0.0, max=0.9, default=0.0, subtype='FACTOR')
+
+    def invoke(self, context, event):
+        if simulator:
+            return self.execute(context)
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        global simulator
+        if simulator:
+            simulator.stop()
+            simulator = None
+            self.report({'INFO'}, "Placa simulada desligada.")
+            return {'FINISHED'}
+        bpy.ops.view3d.start_joystick_server()
+        simulator = BoardSimulator(self.rate, self.loss, self.reorder)
+        simulator.start()
+        self.report({'INFO'}, f"Placa simulada em {self.rate:.0f} Hz.")
+        return {'FINISHED'}
+
+class VIEW3D_OT_RunBenchmark(Operator):
+    bl_idname = "view3d.run_benchmark"
+    bl_label = "Benchmark"
+    bl_description = ("Mede decodificação, custo do tick por modo e despacho de comandos "
+                      "com placa e voz simuladas, comparando com a referência salva")
+
+    save_baseline: BoolProperty(name="Salvar como referência", default=False)
+
+    def execute(self, context):
+        if simulator:
+            self.report({'WARNING'}, "Desligue a placa simulada antes do benchmark.")
+            return {'CANCELLED'}
+        bpy.ops.view3d.start_joystick_server()
+        if not benchmark.start(self.save_baseline):
+            self.report({'WARNING'}, "Benchmark já em andamento.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Benchmark iniciado; resultados no console.")
+        return {'FINISHED'}
+
+class VIEW3D_OT_RenderView(Operator):
+    bl_idname = "view3d.render_view"
+    bl_label = "Renderizar em Segundo Plano"
+    bl_description = "Coloca uma renderização da vista atual na fila de workers do Blender"
+
+    def execute(self, context):
+        job = render_queue.submit(context)
+        if job is None:
+            self.report({'WARNING'}, "Fila de renderização cheia.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Renderização {job.id} na fila.")
+        return {'FINISHED'}
+
+class VIEW3D_OT_CancelRenderJob(Operator):
+    bl_idname = "view3d.cancel_render_job"
+    bl_label = "Cancelar Renderização"
+    bl_description = "Cancela uma renderização da fila (0 cancela todas)"
+
+    job_id: IntProperty(name="Job", default=0)
+
+    def execute(self, context):
+        render_queue.cancel(self.job_id or None)
+        return {'FINISHED'}
+
+class VIEW3D_OT_BatchUnwrap(Operator):
+    bl_idname = "view3d.batch_unwrap"
+    bl_label = "Desembrulhar Seleção"
+    bl_description = "Smart UV Project em todas as malhas selecionadas, pulando as que não mudaram"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    force: BoolProperty(name="Refazer todas", default=False)
+
+    def execute(self, context):
+        unwrapped, skipped, elapsed, saved = batch_unwrap(context, self.force)
+        if not unwrapped and not skipped:
+            self.report({'WARNING'}, "Nenhuma malha selecionada.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{unwrapped} desembrulhadas em {elapsed:.2f} s, {skipped} puladas "
+                              f"(~{saved:.2f} s economizados)")
+        return {'FINISHED'}
+
+class VIEW3D_OT_ExportMetrics(Operator):
+    bl_idname = "view3d.export_metrics"
+    bl_label = "Exportar Métricas"
+    bl_description = "Salva as latências e contadores em JSON ou CSV para análise"
+
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.json;*.csv", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        self.filepath = datetime.now().strftime("bitblender_metricas_%Y%m%d_%H%M%S.json")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            metrics.export(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Erro ao exportar: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Métricas salvas em {self.filepath}")
+        return {'FINISHED'}
+
+class VIEW3D_OT_ResetMetrics(Operator):
+    bl_idname = "view3d.reset_metrics"
+    bl_label = "Zerar Métricas"
+    bl_description = "Descarta as amostras acumuladas"
+
+    def execute(self, context):
+        metrics.reset()
+        return {'FINISHED'}
+
 class VIEW3D_PT_JoystickPanel(Panel):
     bl_label = "BitBlender Menu"
     bl_idname = "VIEW3D_PT_joystick_view"
@@ -556,18 +3799,37 @@ class VIEW3D_PT_JoystickPanel(Panel):
         row.operator("view3d.stop_joystick_server", icon='PAUSE')
         layout.separator()
 
+        box = layout.box()
+        box.label(text=f"Placas conectadas: {len(devices)}")
+        for device in list(devices.values()):
+            row = box.row()
+            mode = "Padrão" if device.mode == 'DEFAULT' else device.mode
+            row.label(text=f"{device.name} | Viewport {device.area_index} | {mode}")
+            row.operator("view3d.joystick_device_settings", text="", icon='PREFERENCES').device_name = device.name
+        box.operator("view3d.simulate_board", text="Desligar Simulação" if simulator else "Simular Placa",
+                     depress=simulator is not None)
+
         row = layout.row()
         row.prop(wm, "joystick_mode", expand=True)
         
         layout.prop(wm, "joystick_sensitivity", slider=True)
+        row = layout.row(align=True)
+        row.prop(wm, "joystick_filter", text="")
+        row.prop(wm, "joystick_smoothing", slider=True)
         
-        if wm.joystick_mode in {'ORBIT', 'ROTATE_X', 'ROTATE_Y'}:
+        if wm.joystick_mode in {'ROTATE_X', 'ROTATE_Y'}:
+            layout.prop(wm, "joystick_scope", expand=True)
+        if wm.joystick_mode == 'ORBIT' or (wm.joystick_mode in {'ROTATE_X', 'ROTATE_Y'}
+                                           and wm.joystick_scope == 'TARGET'):
             layout.prop_search(wm, "joystick_target", context.scene, "objects", text="Objeto Alvo")
-            
+        if wm.joystick_mode in {'ORBIT', 'ROTATE_X', 'ROTATE_Y'}:
             if wm.joystick_mode == 'ORBIT':
                 layout.prop(wm, "joystick_orbit_speed", slider=True, text="Velocidade Orbital")
             else:
                 layout.label(text=f"Rotacionando no eixo {'X' if wm.joystick_mode == 'ROTATE_X' else 'Y'}")
+                layout.prop(wm, "joystick_keying", expand=True)
+                if wm.joystick_keying == 'RECORD':
+                    layout.prop(wm, "joystick_key_tolerance")
         
         
         #layout.separator()
@@ -580,6 +3842,7 @@ class VIEW3D_PT_JoystickPanel(Panel):
             if obj.type == 'MESH':
                 row.operator("view3d.set_mode", text="Editar").mode = 'EDIT'
                 row.operator("view3d.set_mode", text="Esculpir").mode = 'SCULPT'
+                layout.operator("view3d.batch_unwrap", icon='UV')
         else:
             layout.label(text="Selecione um objeto!", icon='PAUSE')
 
@@ -591,14 +3854,47 @@ class VIEW3D_PT_JoystickPanel(Panel):
         layout.separator()
         layout.operator("view3d.reset_viewport", icon='PAUSE')
 
+        box = layout.box()
+        box.label(text="Sessões")
+        row = box.row(align=True)
+        row.operator("view3d.record_session", text="Parar Gravação" if session_recorder else "Gravar",
+                     icon='REC', depress=session_recorder is not None)
+        row.operator("view3d.replay_session", text="Reproduzir", icon='PLAY')
+        row.operator("view3d.bake_session", text="", icon='CAMERA_DATA')
+        if session_player:
+            box.label(text=f"Reproduzindo {session_player.index}/{len(session_player.records)}")
+
         layout.separator()
         layout.separator()
 
+        box = layout.box()
+        row = box.row()
+        row.label(text="Renderizações")
+        row.prop(wm, "render_workers")
+        row = box.row(align=True)
+        row.operator("view3d.render_view", icon='RENDER_STILL')
+        if render_queue.pending:
+            row.operator("view3d.cancel_render_job", text="", icon='CANCEL').job_id = 0
+        status_labels = {'QUEUED': "Na fila", 'RUNNING': "Renderizando", 'DONE': "Pronta",
+                         'FAILED': "Falhou", 'CANCELLED': "Cancelada"}
+        for job in render_queue.jobs[-RENDER_PANEL_JOBS:]:
+            row = box.row()
+            text = f"#{job.id} {status_labels[job.status]}"
+            if job.status == 'RUNNING':
+                text += f" {job.progress:.0%}"
+            if job.started is not None:
+                text += f" | {job.elapsed:.1f} s"
+            row.label(text=text)
+            if job.status in {'QUEUED', 'RUNNING'}:
+                row.operator("view3d.cancel_render_job", text="", icon='X').job_id = job.id
+
+        layout.separator()
         box = layout.box()
         box.label(text="Controle por Voz", icon='PAUSE')
         
         if google_client:
             box.label(text="Google Cloud: Ativo", icon='PAUSE')
+            box.prop(wm, "voice_streaming")
         #else:
         #    box.label(text="Google Cloud: Inativo", icon='PAUSE')
         
@@ -615,22 +3911,87 @@ class VIEW3D_PT_JoystickPanel(Panel):
         box.separator()
         box.label(text=f"Último comando:", icon='PAUSE')
         box.label(text=f"'{wm.last_voice_command}'", icon='PAUSE')
+        if command_history:
+            last = command_history[-1]
+            box.label(text=f"Fila {last.wait * 1000:.0f} ms | Execução {last.duration * 1000:.0f} ms")
+        
+        box.separator()
+        box.label(text=f"Reconhecimento local: {len(keyword_spotter.templates)} exemplos")
+        row = box.row(align=True)
+        row.operator("view3d.record_voice_sample", text="Gravar Exemplo")
+        row.operator("view3d.benchmark_keywords", text="Avaliar")
         
         #box.separator()
         #box.operator("view3d.test_microphone", icon='PAUSE')
 
+        layout.separator()
+        box = layout.box()
+        box.prop(wm, "joystick_show_metrics", icon='TRIA_DOWN' if wm.joystick_show_metrics else 'TRIA_RIGHT')
+        if wm.joystick_show_metrics:
+            labels = dict(METRIC_STAGES)
+            stages = METRICS_PANEL_STAGES if not wm.joystick_all_metrics else [s for s, _ in METRIC_STAGES]
+            for stage in stages:
+                histogram = metrics.histograms[stage]
+                if not histogram.count:
+                    continue
+                box.label(text=f"{labels[stage]}: {histogram.percentile(50) * 1000:.1f} / "
+                               f"{histogram.percentile(95) * 1000:.1f} / {histogram.percentile(99) * 1000:.1f} ms")
+            for device in list(devices.values()):
+                row = device.counters()
+                box.label(text=f"{device.name}: {row['taxa_hz']:.0f} Hz | perda {row['perda_pct']:.1f}% "
+                               f"| jitter {row['jitter_ms']:.1f} ms")
+            for row in recognition.rows():
+                box.label(text=f"{row['motor']}: {row['p50_ms']:.0f} / {row['p95_ms']:.0f} ms "
+                               f"| vitórias {row['vitorias_pct']:.0f}% | erros {row['erros']}")
+            box.label(text=f"Maior rajada UDP num despertar: {io_core.largest_batch}")
+            box.prop(wm, "joystick_all_metrics")
+            row = box.row(align=True)
+            row.operator("view3d.export_metrics", icon='EXPORT')
+            row.operator("view3d.reset_metrics", text="", icon='TRASH')
+            row = box.row(align=True)
+            row.enabled = not benchmark.running
+            row.operator("view3d.run_benchmark", icon='TIME')
+            row.operator("view3d.run_benchmark", text="", icon='FILE_TICK').save_baseline = True
+            if benchmark.running:
+                box.label(text="Benchmark em andamento...")
+            elif benchmark.results:
+                box.label(text=f"Benchmark: {len(benchmark.regressions)} regressões",
+                          icon='ERROR' if benchmark.regressions else 'CHECKMARK')
+
 classes = [
     VIEW3D_MT_JoystickPieMenu,
     VIEW3D_OT_JoystickNavigation,
     VIEW3D_OT_StartJoystickNavigation,
     VIEW3D_OT_StopJoystickNavigation,
+    VIEW3D_OT_JoystickDeviceSettings,
+    VIEW3D_OT_CalibrateDevice,
     VIEW3D_OT_SetMode,
     VIEW3D_OT_ResetViewport,
     VIEW3D_OT_TestMicrophone,
+    VIEW3D_OT_RecordVoiceSample,
+    VIEW3D_OT_BenchmarkKeywords,
+    VIEW3D_OT_RecordSession,
+    VIEW3D_OT_ReplaySession,
+    VIEW3D_OT_BakeSession,
+    VIEW3D_OT_SimulateBoard,
+    VIEW3D_OT_RunBenchmark,
+    VIEW3D_OT_RenderView,
+    VIEW3D_OT_CancelRenderJob,
+    VIEW3D_OT_BatchUnwrap,
+    VIEW3D_OT_ExportMetrics,
+    VIEW3D_OT_ResetMetrics,
     VIEW3D_PT_JoystickPanel,
 ]
 
+def update_render_workers(self, context):
+    render_queue.workers = self.render_workers
+
+def update_voice_streaming(self, context):
+    global use_streaming_recognition
+    use_streaming_recognition = self.voice_streaming
+
 def register():
+    global metrics_draw_handler
     for cls in classes:
         bpy.utils.register_class(cls)
 
@@ -641,12 +4002,7 @@ def register():
 
     bpy.types.WindowManager.joystick_mode = EnumProperty(
         name="Modo de Navegação",
-        items=[
-            ('FREE', "Livre", "Navegação livre da viewport"),
-            ('ORBIT', "Orbital", "Orbitar em torno do objeto"),
-            ('ROTATE_X', "Rotacionar X", "Rotacionar objeto no eixo X"),
-            ('ROTATE_Y', "Rotacionar Y", "Rotacionar objeto no eixo Y")
-        ],
+        items=JOYSTICK_MODE_ITEMS,
         default='FREE'
     )
     
@@ -672,15 +4028,108 @@ def register():
         default=1.0
     )
 
-    global stop_voice_thread
-    stop_voice_thread = False
+    bpy.types.WindowManager.voice_streaming = BoolProperty(
+        name="Reconhecimento em Streaming",
+        description="Envia o áudio enquanto você fala e age no primeiro resultado parcial estável",
+        default=True,
+        update=update_voice_streaming
+    )
+
+    bpy.types.WindowManager.joystick_keying = EnumProperty(
+        name="Chaves de Rotação",
+        items=[
+            ('KEYFRAME', "Chave", "Insere uma chave no frame atual ao fim de cada gesto"),
+            ('RECORD', "Gravar", "Grava o gesto ao longo do tempo a partir do frame atual"),
+            ('PREVIEW', "Prévia", "Só rotaciona, sem inserir chaves")
+        ],
+        default='KEYFRAME'
+    )
+
+    bpy.types.WindowManager.joystick_key_tolerance = FloatProperty(
+        name="Tolerância",
+        description="Erro máximo (radianos) ao simplificar a curva gravada",
+        min=0.0, max=0.1,
+        default=0.005,
+        precision=4
+    )
+
+    bpy.types.WindowManager.joystick_filter = EnumProperty(
+        name="Filtro",
+        items=[
+            ('NONE', "Nenhum", "Usa a leitura crua do joystick"),
+            ('EXPONENTIAL', "Exponencial", "Suavização exponencial simples"),
+            ('ONE_EURO', "One Euro", "Suaviza parado e responde rápido em movimento")
+        ],
+        default='ONE_EURO'
+    )
+
+    bpy.types.WindowManager.joystick_smoothing = FloatProperty(
+        name="Suavização",
+        min=0.0, max=1.0,
+        default=0.5
+    )
+
+    bpy.types.WindowManager.joystick_scope = EnumProperty(
+        name="Aplicar em",
+        items=[
+            ('TARGET', "Objeto Alvo", "Rotaciona só o objeto alvo"),
+            ('SELECTION', "Seleção", "Rotaciona e move por voz todos os objetos selecionados")
+        ],
+        default='TARGET'
+    )
+
+    bpy.types.WindowManager.render_workers = IntProperty(
+        name="Workers",
+        description="Renderizações simultâneas em processos do Blender em segundo plano",
+        min=1, max=8,
+        default=1,
+        update=update_render_workers
+    )
+
+    bpy.types.WindowManager.joystick_show_metrics = BoolProperty(
+        name="Métricas (p50 / p95 / p99)",
+        default=False
+    )
+
+    bpy.types.WindowManager.joystick_all_metrics = BoolProperty(
+        name="Todas as etapas",
+        default=False
+    )
+
+    voice_commands.compile()
+    load_profiles()
+
+    if metrics_draw_handler is None:
+        metrics_draw_handler = bpy.types.SpaceView3D.draw_handler_add(
+            metrics_draw_callback, (), 'WINDOW', 'POST_PIXEL')
+    
+    if not bpy.app.timers.is_registered(drain_command_queue):
+        bpy.app.timers.register(drain_command_queue, persistent=True)
     
-    threading.Thread(target=udp_server_thread, daemon=True).start()
-    threading.Thread(target=voice_capture_thread, daemon=True).start()
+    io_core.start()
 
 def unregister():
-    global stop_voice_thread
-    stop_voice_thread = True
+    global metrics_draw_handler, simulator, session_recorder, session_player
+    if simulator:
+        simulator.stop()
+        simulator = None
+    if session_recorder:
+        session_recorder.close()
+        session_recorder = None
+    session_player = None
+    io_core.stop()
+
+    if metrics_draw_handler is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(metrics_draw_handler, 'WINDOW')
+        metrics_draw_handler = None
+
+    if bpy.app.timers.is_registered(drain_command_queue):
+        bpy.app.timers.unregister(drain_command_queue)
+    render_queue.cancel()
+    if bpy.app.timers.is_registered(render_queue._update):
+        bpy.app.timers.unregister(render_queue._update)
+    command_queue.clear()
+    button_events.clear()
 
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
@@ -690,6 +4139,15 @@ def unregister():
     del bpy.types.WindowManager.joystick_sensitivity
     del bpy.types.WindowManager.joystick_shift
     del bpy.types.WindowManager.joystick_orbit_speed
+    del bpy.types.WindowManager.voice_streaming
+    del bpy.types.WindowManager.joystick_keying
+    del bpy.types.WindowManager.joystick_key_tolerance
+    del bpy.types.WindowManager.joystick_filter
+    del bpy.types.WindowManager.joystick_smoothing
+    del bpy.types.WindowManager.joystick_scope
+    del bpy.types.WindowManager.render_workers
+    del bpy.types.WindowManager.joystick_show_metrics
+    del bpy.types.WindowManager.joystick_all_metrics
 
 if __name__ == "__main__":
     register()
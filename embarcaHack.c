@@ -25,9 +25,26 @@
 #define BTN_GP5 5   // Botao adicional para zoom
 #define BTN_GP6 6   // botao de microfone
 
+// ==== PROTOCOLO ====
+// Quadro binário de tamanho fixo, little-endian (ver PACKET_STRUCT_V2 em BitBlender.py):
+// magic "BB"(2) versão(1) botões(1) sequência(4) tempo em ms(4) VRX(2) VRY(2)
+// contadores de toques JOY(1) ZOOM(1) VOZ(1) reservado(1)
+// Os contadores são incrementados por interrupção, então um toque mais curto que
+// o intervalo entre pacotes (ou em um pacote perdido) ainda chega ao Blender.
+#define USE_LEGACY_TEXT_PACKET 0  // 1 = envia o formato texto antigo
+#define PACKET_VERSION 2
+#define PACKET_SIZE 20
+#define BUTTON_JOYSTICK 0x01
+#define BUTTON_ZOOM     0x02
+#define BUTTON_VOICE    0x04
+#define DEBOUNCE_US 30000  // ignora repiques do botão por 30 ms
+
 // ==== VARIÁVEIS ====
 struct udp_pcb *udp_conn;
 ip_addr_t notebook_addr;
+uint32_t packet_seq = 0;
+volatile uint8_t press_count[3] = {0, 0, 0};  // JOY, ZOOM, VOZ (com wraparound)
+uint64_t last_press_us[3] = {0, 0, 0};
 
 void init_leds() {
     gpio_init(LED_WIFI_OK);
@@ -61,6 +78,25 @@ void init_joystick() {
 
 }
 
+// Conta toques (borda de descida, botões puxados para cima) com debounce
+void button_irq(uint gpio, uint32_t events) {
+    int index = gpio == JOY_SW ? 0 : gpio == BTN_GP5 ? 1 : gpio == BTN_GP6 ? 2 : -1;
+    if (index < 0 || !(events & GPIO_IRQ_EDGE_FALL)) {
+        return;
+    }
+    uint64_t now = time_us_64();
+    if (now - last_press_us[index] >= DEBOUNCE_US) {
+        press_count[index]++;
+        last_press_us[index] = now;
+    }
+}
+
+void init_button_irqs() {
+    gpio_set_irq_enabled_with_callback(JOY_SW, GPIO_IRQ_EDGE_FALL, true, &button_irq);
+    gpio_set_irq_enabled(BTN_GP5, GPIO_IRQ_EDGE_FALL, true);
+    gpio_set_irq_enabled(BTN_GP6, GPIO_IRQ_EDGE_FALL, true);
+}
+
 uint16_t read_adc(uint channel) {
     adc_select_input(channel);
     return adc_read();
@@ -105,30 +141,71 @@ bool setup_udp() {
     return true;
 }
 
-void send_udp_message(const char *message) {
-    struct pbuf *p = pbuf_alloc(PBUF_TRANSPORT, strlen(message), PBUF_RAM);
+bool send_udp_data(const void *data, size_t len) {
+    struct pbuf *p = pbuf_alloc(PBUF_TRANSPORT, len, PBUF_RAM);
     if (!p) {
         printf("Erro alocando buffer\n");
-        return;
+        return false;
     }
 
-    memcpy(p->payload, message, strlen(message));
+    memcpy(p->payload, data, len);
     err_t err = udp_sendto(udp_conn, p, &notebook_addr, UDP_PORT);
     pbuf_free(p);
 
     if (err != ERR_OK) {
         printf("Erro enviando mensagem: %d\n", err);
         gpio_put(LED_STATUS, 0);
-    } else {
+        return false;
+    }
+    gpio_put(LED_STATUS, 1);
+    return true;
+}
+
+void send_udp_message(const char *message) {
+    if (send_udp_data(message, strlen(message))) {
         printf("Mensagem enviada: %s\n", message);
-        gpio_put(LED_STATUS, 1);
     }
 }
 
+static void put_u16_le(uint8_t *dst, uint16_t v) {
+    dst[0] = v & 0xFF;
+    dst[1] = v >> 8;
+}
+
+static void put_u32_le(uint8_t *dst, uint32_t v) {
+    dst[0] = v & 0xFF;
+    dst[1] = (v >> 8) & 0xFF;
+    dst[2] = (v >> 16) & 0xFF;
+    dst[3] = v >> 24;
+}
+
+void send_joystick_packet(uint16_t x, uint16_t y, uint8_t buttons) {
+    uint8_t frame[PACKET_SIZE];
+    frame[0] = 'B';
+    frame[1] = 'B';
+    frame[2] = PACKET_VERSION;
+    frame[3] = buttons;
+    put_u32_le(&frame[4], packet_seq);
+    put_u32_le(&frame[8], to_ms_since_boot(get_absolute_time()));
+    put_u16_le(&frame[12], x);
+    put_u16_le(&frame[14], y);
+    frame[16] = press_count[0];
+    frame[17] = press_count[1];
+    frame[18] = press_count[2];
+    frame[19] = 0;
+
+    if (send_udp_data(frame, sizeof(frame))) {
+        printf("Pacote %lu enviado: VRX=%u VRY=%u botoes=0x%02x\n",
+               (unsigned long)packet_seq, x, y, buttons);
+    }
+    packet_seq++;
+}
+
 int main() {
     stdio_init_all();
     init_leds();
     init_joystick();
+    init_button_irqs();
 
     if (!connect_wifi() || !setup_udp()) {
         while (1) sleep_ms(1000);  // Loop de erro
@@ -169,6 +246,7 @@ int main() {
             gpio_put(LED_STATUS, 0);
         }
 
+#if USE_LEGACY_TEXT_PACKET
         char msg[128];
         snprintf(msg, sizeof(msg),
             "VRX=%u VRY=%u BTN=%s ZOOM=%s comandoVoz=%s",
@@ -178,6 +256,12 @@ int main() {
             voice_triggered ? "Ativo" : "Inativo"
         );
         send_udp_message(msg);
+#else
+        uint8_t buttons = (joy_pressed ? BUTTON_JOYSTICK : 0)
+                        | (zoom_pressed ? BUTTON_ZOOM : 0)
+                        | (voice_triggered ? BUTTON_VOICE : 0);
+        send_joystick_packet(x, y, buttons);
+#endif
         //step++;
         sleep_ms(100);
     }
@@ -0,0 +1,160 @@
+"""Roda BitBlender.py fora do Blender: põe os stubs de bpy/mathutils no caminho de import.
+
+As classes Fake* imitam só o pedaço da API do Blender que o modal toca por tick
+(área 3D, região da vista, objeto alvo e window manager), o microfone e o
+reconhecimento em streaming.
+"""
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(TESTS_DIR, "stubs"), os.path.dirname(TESTS_DIR)]
+
+import bpy  # noqa: E402
+from mathutils import Euler, Quaternion, Vector  # noqa: E402
+
+import BitBlender  # noqa: E402
+
+
+class FakeRegion:
+    def __init__(self):
+        self.view_location = Vector((0.0, 0.0, 0.0))
+        self.view_rotation = Quaternion()
+        self.view_distance = 10.0
+
+
+class FakeArea:
+    type = 'VIEW_3D'
+
+    def __init__(self):
+        self.spaces = SimpleNamespace(active=SimpleNamespace(region_3d=FakeRegion()))
+        self.redraws = 0
+
+    def tag_redraw(self):
+        self.redraws += 1
+
+
+class FakeObject:
+    def __init__(self, name="Cubo"):
+        self.name = name
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.rotation_euler = Euler((0.0, 0.0, 0.0))
+        self.keys = 0
+
+    def keyframe_insert(self, data_path, index=-1):
+        self.keys += 1
+
+
+class FakeCapture:
+    """Microfone falso: a frase termina `speech_seconds` depois de começar"""
+    rate = 16000
+
+    def __init__(self, speech_seconds):
+        self.speech_seconds = speech_seconds
+        self.cancelled = False
+
+    def stream_chunks(self, pressed=None):
+        while True:
+            time.sleep(0.01)
+            yield bytes(320)
+
+    def record_phrase(self, timeout=5, phrase_time_limit=7, pause_threshold=None, cancel=None, pressed=None):
+        deadline = time.monotonic() + self.speech_seconds
+        while time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                self.cancelled = True
+                return None
+            time.sleep(0.01)
+        return "frase gravada"
+
+
+class FakeStreamingBackend(BitBlender.RecognizerBackend):
+    """Streaming simulado: um roteiro de resultados parciais e finais.
+
+    `script` é uma lista de (atraso, texto, final, estabilidade). Como no servidor
+    real, cada resultado só chega depois de `atraso` segundos de áudio recebido; se o
+    áudio acabar antes, o stream termina sem ele. Para usá-lo no lugar do Google,
+    atribua a instância a `BitBlender.streaming_backend`.
+    """
+    name = "Simulado (streaming)"
+    supports_streaming = True
+
+    def __init__(self, script, name=None):
+        self.script = script
+        if name:
+            self.name = name
+        self.chunks = 0      # pedaços de áudio recebidos
+        self.delivered = 0   # resultados do roteiro já entregues
+
+    def recognize(self, audio):
+        finals = [text for _, text, is_final, _ in self.script if is_final]
+        return (finals[-1], 1.0) if finals else None
+
+    def stream(self, chunks, sample_rate):
+        chunks = iter(chunks)
+        for delay, text, is_final, stability in self.script:
+            deadline = time.monotonic() + delay
+            while time.monotonic() < deadline:
+                if next(chunks, None) is None:
+                    return  # o áudio acabou antes deste resultado
+                self.chunks += 1
+            self.delivered += 1
+            yield text, is_final, stability
+
+
+@pytest.fixture
+def bb():
+    """O módulo do addon com a tabela de placas e as filas limpas a cada teste"""
+    BitBlender.devices.clear()
+    BitBlender.command_queue.clear()
+    BitBlender.button_events.clear()
+    BitBlender.metrics.reset()
+    yield BitBlender
+    BitBlender.io_core.stop(timeout=5.0)
+    BitBlender.devices.clear()
+
+
+@pytest.fixture
+def context(bb):
+    """bpy.context com as propriedades do painel nos valores padrão"""
+    wm = bpy.context.window_manager
+    wm.joystick_mode = 'FREE'
+    wm.joystick_target = FakeObject()
+    wm.joystick_sensitivity = 0.2
+    wm.joystick_orbit_speed = 1.0
+    wm.joystick_filter = 'ONE_EURO'
+    wm.joystick_smoothing = 0.5
+    wm.joystick_keying = 'PREVIEW'
+    wm.joystick_key_tolerance = 0.005
+    wm.joystick_scope = 'TARGET'
+    wm.last_voice_command = ""
+    return bpy.context
+
+
+@pytest.fixture
+def voice_thread(bb, monkeypatch):
+    """Roda como a thread do IOCore: um núcleo parado por outro teste cortaria o áudio"""
+    monkeypatch.setattr(bb.io_core, "stopping", threading.Event())
+
+
+@pytest.fixture
+def session(bb, monkeypatch, voice_thread):
+    """voice_session com microfone, preparo de áudio e motores falsos"""
+    def setup(capture, streaming, batch):
+        monkeypatch.setattr(bb, "open_microphone", lambda: True)
+        monkeypatch.setattr(bb, "audio_capture", capture)
+        monkeypatch.setattr(bb, "prepare_audio", lambda audio: audio)
+        monkeypatch.setattr(bb, "sr", SimpleNamespace(WaitTimeoutError=TimeoutError))
+        monkeypatch.setattr(bb, "google_backend", None)
+        monkeypatch.setattr(bb, "streaming_backend", streaming)
+        monkeypatch.setattr(bb, "web_backend", batch)
+        monkeypatch.setattr(bb, "use_streaming_recognition", True)
+        bb.recognition.reset()
+        assert bb.voice_session(time.monotonic())
+        return [command.action for command in bb.command_queue]
+    return setup
@@ -0,0 +1,78 @@
+"""Stub do módulo bpy para rodar BitBlender.py fora do Blender.
+
+Cobre o que o addon toca no import, no register() e nos caminhos usados pelos
+testes. Operadores (bpy.ops) e dados (bpy.data) aceitam qualquer chamada. Os
+timers guardam as funções registradas e, como no Blender, comparam por
+identidade: um método ligado novo a cada acesso não é a mesma função.
+"""
+import contextlib
+import tempfile
+from types import SimpleNamespace
+
+from . import props, types
+
+
+class _Anything:
+    """Aceita qualquer atributo e qualquer chamada (bpy.ops, bpy.data...)"""
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Anything(f"{self._name}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        return {'FINISHED'}
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __repr__(self):
+        return f"<stub {self._name}>"
+
+
+class _Timers:
+    def __init__(self):
+        self.functions = []
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self.functions.append(function)
+
+    def is_registered(self, function):
+        return any(f is function for f in self.functions)
+
+    def unregister(self, function):
+        for i, f in enumerate(self.functions):
+            if f is function:
+                del self.functions[i]
+                return
+        raise ValueError("Error: function is not registered")
+
+
+class _Context(_Anything):
+    def __init__(self):
+        super().__init__("bpy.context")
+        self.window_manager = types.WindowManager()
+        self.selected_objects = []
+        self.active_object = None
+
+    def temp_override(self, **kwargs):
+        return contextlib.nullcontext()
+
+
+app = SimpleNamespace(
+    timers=_Timers(),
+    handlers=SimpleNamespace(load_post=[], save_pre=[]),
+    tempdir=tempfile.gettempdir(),
+    binary_path="blender",
+    version=(4, 0, 0),
+)
+context = _Context()
+data = _Anything("bpy.data")
+ops = _Anything("bpy.ops")
+path = SimpleNamespace(abspath=lambda p: p)
+utils = SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
@@ -0,0 +1,17 @@
+"""Propriedades do stub: cada uma vira (tipo, argumentos)"""
+
+
+def _property(kind):
+    def make(**kwargs):
+        return (kind, kwargs)
+    make.__name__ = kind
+    return make
+
+
+BoolProperty = _property("BoolProperty")
+CollectionProperty = _property("CollectionProperty")
+EnumProperty = _property("EnumProperty")
+FloatProperty = _property("FloatProperty")
+IntProperty = _property("IntProperty")
+PointerProperty = _property("PointerProperty")
+StringProperty = _property("StringProperty")
@@ -0,0 +1,72 @@
+"""Classes base do stub; o suficiente para declarar operadores, painéis e menus"""
+
+
+class bpy_struct:
+    pass
+
+
+class Operator(bpy_struct):
+    def __init__(self):
+        self.reports = []
+
+    def report(self, level, message):
+        self.reports.append((level, message))
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class Menu(bpy_struct):
+    pass
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class Object(bpy_struct):
+    pass
+
+
+class Timer(bpy_struct):
+    """Como no Blender, time_duration só avança quando este timer dispara"""
+    def __init__(self, time_step):
+        self.time_step = time_step
+        self.time_delta = 0.0
+        self.time_duration = 0.0
+
+    def fire(self):
+        self.time_delta = self.time_step
+        self.time_duration += self.time_step
+
+
+class WindowManager(bpy_struct):
+    def __init__(self):
+        self.windows = []
+        self.timers = []
+
+    def event_timer_add(self, time_step, window=None):
+        timer = Timer(time_step)
+        self.timers.append(timer)
+        return timer
+
+    def event_timer_remove(self, timer):
+        self.timers.remove(timer)
+
+    def modal_handler_add(self, operator):
+        return True
+
+
+class SpaceView3D(bpy_struct):
+    @staticmethod
+    def draw_handler_add(callback, args, region_type, draw_type):
+        return (callback, args)
+
+    @staticmethod
+    def draw_handler_remove(handler, region_type):
+        pass
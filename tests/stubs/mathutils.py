@@ -0,0 +1,106 @@
+"""Stub de mathutils com a aritmética usada pelo addon (Vector, Euler e Quaternion)"""
+import math
+
+
+class Vector:
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._values = [float(v) for v in values]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __setitem__(self, index, value):
+        self._values[index] = float(value)
+
+    def _get(index):
+        return property(lambda self: self._values[index],
+                        lambda self, value: self.__setitem__(index, value))
+
+    x, y, z = _get(0), _get(1), _get(2)
+    del _get
+
+    def __add__(self, other):
+        return type(self)(a + b for a, b in zip(self, other))
+
+    def __sub__(self, other):
+        return type(self)(a - b for a, b in zip(self, other))
+
+    def __mul__(self, scalar):
+        return type(self)(a * scalar for a in self)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self * -1.0
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and self._values == other._values
+
+    @property
+    def length(self):
+        return math.sqrt(sum(a * a for a in self))
+
+    def copy(self):
+        return type(self)(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({tuple(self._values)})"
+
+
+class Euler(Vector):
+    pass
+
+
+class Quaternion:
+    def __init__(self, values=(1.0, 0.0, 0.0, 0.0), angle=None):
+        if angle is None:
+            self.w, self.x, self.y, self.z = (float(v) for v in values)
+        else:
+            norm = math.sqrt(sum(a * a for a in values)) or 1.0
+            s = math.sin(angle / 2.0) / norm
+            self.w = math.cos(angle / 2.0)
+            self.x, self.y, self.z = (a * s for a in values)
+
+    def __iter__(self):
+        return iter((self.w, self.x, self.y, self.z))
+
+    def __matmul__(self, other):
+        if isinstance(other, Quaternion):
+            w1, x1, y1, z1 = self
+            w2, x2, y2, z2 = other
+            return Quaternion((w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                               w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                               w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                               w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2))
+        rotated = self @ Quaternion((0.0, *other)) @ self.conjugated()
+        return Vector((rotated.x, rotated.y, rotated.z))
+
+    def __eq__(self, other):
+        return isinstance(other, Quaternion) and tuple(self) == tuple(other)
+
+    def conjugated(self):
+        return Quaternion((self.w, -self.x, -self.y, -self.z))
+
+    def rotation_difference(self, other):
+        return self.conjugated() @ other
+
+    @property
+    def angle(self):
+        return 2.0 * math.atan2(math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2), self.w)
+
+    def copy(self):
+        return Quaternion(tuple(self))
+
+    def __repr__(self):
+        return f"Quaternion({tuple(self)})"
+
+
+class Matrix:
+    def __init__(self, rows=()):
+        self.rows = [list(row) for row in rows]
@@ -0,0 +1,102 @@
+"""Microfone persistente (AudioCapture) alimentado por uma thread, sem PortAudio"""
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+RATE = 16000
+CHUNK = 160  # 10 ms
+
+
+class Feeder:
+    """Escreve pedaços de 10 ms no anel em tempo real; `loud` liga a "fala"."""
+    def __init__(self, capture):
+        self.capture = capture
+        self.loud = False
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        tone = (5000 * np.sin(np.arange(CHUNK) * 2 * np.pi * 440 / RATE)).astype(np.int16)
+        silence = np.zeros(CHUNK, dtype=np.int16)
+        start = time.monotonic()
+        written = 0
+        while not self.stop.is_set():
+            # Como um microfone de verdade, acompanha o relógio mesmo se a thread atrasar
+            while written < (time.monotonic() - start) * RATE / CHUNK:
+                self.capture._write(tone if self.loud else silence)
+                written += 1
+            time.sleep(0.002)
+
+
+@pytest.fixture
+def capture(bb, monkeypatch):
+    monkeypatch.setattr(bb, "voice_recognizer", SimpleNamespace(
+        energy_threshold=300, pause_threshold=0.3, dynamic_energy_ratio=1.5))
+    monkeypatch.setattr(bb, "sr", SimpleNamespace(
+        AudioData=lambda data, rate, width: np.frombuffer(data, dtype=np.int16),
+        WaitTimeoutError=TimeoutError))
+    capture = bb.AudioCapture()
+    capture.rate, capture.chunk = RATE, CHUNK
+    capture.buffer = np.zeros(RATE * bb.AUDIO_RING_SECONDS, dtype=np.int16)
+    feeder = Feeder(capture)
+    capture._thread = feeder.thread
+    feeder.thread.start()
+    yield capture, feeder
+    feeder.stop.set()
+    feeder.thread.join()
+
+
+def test_phrase_spoken_while_the_press_waited_is_kept(capture):
+    capture, feeder = capture
+    time.sleep(0.5)
+    pressed = time.monotonic()
+    feeder.loud = True  # fala logo depois do toque...
+    time.sleep(0.3)
+    feeder.loud = False
+    time.sleep(0.7)  # ...enquanto o toque esperava outra sessão terminar
+    audio = capture.record_phrase(timeout=1, pressed=pressed)
+    loud = np.abs(audio) > 1000
+    assert loud.sum() / RATE == pytest.approx(0.3, abs=0.05)
+    assert np.argmax(loud) / RATE == pytest.approx(0.4, abs=0.05)  # o pré-roll vem antes da fala
+
+
+def test_without_press_the_phrase_starts_now(capture):
+    capture, feeder = capture
+    time.sleep(0.5)
+    feeder.loud = True
+    time.sleep(0.3)
+    feeder.loud = False
+    time.sleep(0.6)
+    with pytest.raises(TimeoutError):
+        capture.record_phrase(timeout=0.5)  # a fala acabou antes da sessão
+
+
+def tone_levels(samples, rate, frequencies):
+    """Amplitude de cada frequência no sinal (correlação com a senoide complexa)"""
+    t = np.arange(len(samples)) / rate
+    return [2 * abs(np.mean(samples * np.exp(-2j * np.pi * f * t))) for f in frequencies]
+
+
+@pytest.mark.parametrize("source_rate", [48000, 44100])
+def test_out_of_band_tone_does_not_alias(bb, source_rate):
+    # 12 kHz acima do Nyquist de 16 kHz dobraria para 4 kHz, bem no meio da fala
+    t = np.arange(source_rate) / source_rate
+    signal = 8000 * np.sin(2 * np.pi * 1000 * t) + 8000 * np.sin(2 * np.pi * 12000 * t)
+    alias = bb.UPLOAD_SAMPLE_RATE - 12000
+
+    batch = bb.resample_linear(signal.astype(np.float32), source_rate, bb.UPLOAD_SAMPLE_RATE)
+    chunks = [signal[i:i + 441].astype(np.int16).tobytes() for i in range(0, len(signal), 441)]
+    stream = np.frombuffer(b"".join(bb.resample_stream(chunks, source_rate, bb.UPLOAD_SAMPLE_RATE)),
+                           dtype=np.int16).astype(np.float32)
+
+    for out in (batch, stream):
+        speech, folded = tone_levels(out[200:-200], bb.UPLOAD_SAMPLE_RATE, [1000, alias])
+        assert speech == pytest.approx(8000, rel=0.05)
+        assert folded < 8000 * 0.01  # -40 dB
+
+
+def test_short_input_keeps_its_length(bb):
+    assert len(bb.resample_linear(np.ones(30, dtype=np.float32), 48000, 16000)) == 10
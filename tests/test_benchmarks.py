@@ -0,0 +1,172 @@
+"""Benchmarks headless: vazão do parser, custo do tick por modo, casamento de comandos
+e latência de despacho.
+
+Por padrão só valem propriedades relativas (o parser binário mais rápido que o
+texto legado, o tick parado sem pedir redesenho); tempos absolutos dependem da
+máquina. Com BITBLENDER_BENCHMARK=1 os resultados também são comparados com a
+referência local benchmark_baseline.json (tolerância BENCHMARK_TOLERANCE, ou
+BITBLENDER_BENCHMARK_TOLERANCE no ambiente), que não vai para o repositório. Para
+gravá-la nesta máquina: BITBLENDER_SAVE_BASELINE=1 python -m pytest tests; cada
+chave medida é sobrescrita pelo valor novo. Cada medida é a melhor de ROUNDS
+rodadas.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import FakeArea
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+TICKS = 2000
+COMMANDS = 60
+SEND_INTERVAL = 0.01
+DRAIN_POLL = 0.002  # timer fino: mede a passagem entre threads, não a fase do COMMAND_DRAIN_INTERVAL
+ROUNDS = 3  # vale a melhor rodada: um atraso do escalonador não é regressão do código
+MATCHES = 2000
+LEGACY_SLOWDOWN = 1.5  # o texto legado (decode + split) custa pelo menos isso a mais que o binário
+
+results = {}
+
+
+def check_baseline(bb, keys):
+    """Grava ou compara com a referência local; sem BITBLENDER_BENCHMARK não faz nada"""
+    measured = {key: results[key] for key in keys}
+    if os.environ.get("BITBLENDER_SAVE_BASELINE"):
+        baseline = bb.load_benchmark_baseline(BASELINE_PATH)
+        baseline.update(measured)
+        bb.save_benchmark_baseline(BASELINE_PATH, baseline)
+        return
+    if not os.environ.get("BITBLENDER_BENCHMARK"):
+        return
+    baseline = bb.load_benchmark_baseline(BASELINE_PATH)
+    if not all(key in baseline for key in keys):
+        pytest.skip(f"sem referência para {keys} em {BASELINE_PATH}; grave com BITBLENDER_SAVE_BASELINE=1")
+    tolerance = float(os.environ.get("BITBLENDER_BENCHMARK_TOLERANCE", bb.BENCHMARK_TOLERANCE))
+    regressions = bb.compare_with_baseline(measured, baseline, tolerance)
+    assert not regressions, {key: (measured[key], baseline[key]) for key in regressions}
+
+
+def packets_per_second(bb, frames):
+    best = 0.0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for frame in frames:
+            bb.parse_packet(frame)
+        best = max(best, len(frames) / (time.perf_counter() - start))
+    return best
+
+
+def test_parse_throughput(bb):
+    benchmark = bb.PerformanceBenchmark()
+    for _ in range(ROUNDS):
+        benchmark._benchmark_parse()
+        for key in ("parse_pps", "datagram_pps"):
+            results[key] = max(results.get(key, 0.0), benchmark.results[key])
+    assert results["parse_pps"] > 0 and results["datagram_pps"] > 0
+    check_baseline(bb, ["parse_pps", "datagram_pps"])
+
+
+def test_binary_parse_beats_legacy_text(bb):
+    board = bb.BoardSimulator()
+    binary = [board.frame(i, i * 0.01) for i in range(bb.BENCHMARK_PARSE_PACKETS)]
+    legacy = [f"VRX={2048 + i % 100} VRY=2000 BTN=solto".encode() for i in range(bb.BENCHMARK_PARSE_PACKETS)]
+    assert packets_per_second(bb, binary) > packets_per_second(bb, legacy) * LEGACY_SLOWDOWN
+
+
+@pytest.mark.parametrize("mode", ['FREE', 'ORBIT', 'ROTATE_X', 'ROTATE_Y'])
+def test_tick_cost_per_mode(bb, context, mode):
+    context.window_manager.joystick_mode = mode
+    target = context.window_manager.joystick_target
+    device = bb.get_device(("127.0.0.1", 9000))
+    area = FakeArea()
+    region = area.spaces.active.region_3d
+    operator = bb.VIEW3D_OT_JoystickNavigation()
+    view = (region.view_location.copy(), region.view_rotation.copy(), tuple(target.rotation_euler))
+
+    now = time.monotonic()
+    costs = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for i in range(TICKS):
+            if i % 5 == 0:  # um pacote a cada 5 ticks (placa a 10 Hz, modal a 50 Hz)
+                device.state = bb.JoystickState(x=0.6, y=-0.5, seq=i // 5, timestamp=now)
+            operator._update_device(context, device, area, now, bb.TICK_INTERVAL, 1.0)
+            now += bb.TICK_INTERVAL
+        costs.append((time.perf_counter() - start) / TICKS * 1000)
+    results[f"tick_ms_{mode}"] = min(costs)
+
+    # O tick precisa ter mexido na vista ou no alvo e pedido redesenho
+    assert (region.view_location.copy(), region.view_rotation.copy(), tuple(target.rotation_euler)) != view
+    assert area.redraws > 0
+    check_baseline(bb, [f"tick_ms_{mode}"])
+
+
+@pytest.mark.parametrize("mode", ['FREE', 'ORBIT', 'ROTATE_X', 'ROTATE_Y'])
+def test_idle_tick_does_not_redraw(bb, context, mode):
+    context.window_manager.joystick_mode = mode
+    device = bb.get_device(("127.0.0.1", 9000))
+    area = FakeArea()
+    operator = bb.VIEW3D_OT_JoystickNavigation()
+    now = time.monotonic()
+    for i in range(TICKS // 10):
+        if i % 5 == 0:
+            device.state = bb.JoystickState(seq=i // 5, timestamp=now)
+        assert not operator._update_device(context, device, area, now, bb.TICK_INTERVAL, 1.0)
+        now += bb.TICK_INTERVAL
+    assert area.redraws == 1  # só o primeiro tick, que registra a vista inicial
+
+
+@pytest.mark.parametrize("path, text, action", [
+    ("exact", "gerar cubo", 'cube'),
+    ("prefix", "renderização", 'render'),
+    ("fuzzy", "xilindro", 'cylinder'),    # uma letra trocada
+    ("phonetic", "esphera", 'sphere'),    # duas edições, mesmo som
+    ("miss", "abacaxi amarelo", None),    # percorre todos os caminhos sem achar
+])
+def test_match_cost_per_path(bb, path, text, action):
+    registry = bb.voice_commands
+    assert registry.match(text) == action
+    costs = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(MATCHES):
+            registry.match(text)
+        costs.append((time.perf_counter() - start) / MATCHES * 1e6)
+    results[f"match_us_{path}"] = min(costs)
+    check_baseline(bb, [f"match_us_{path}"])
+
+
+def test_dispatch_latency(bb, context, monkeypatch):
+    executed = []
+    for action in ("front", "back"):
+        monkeypatch.setitem(bb.voice_commands.handlers, action, lambda action=action: executed.append(action))
+    backend = bb.FakeSpeechBackend(["frente", "trás"], latency=0.0)
+
+    def send():
+        for _ in range(COMMANDS):
+            pressed = time.monotonic()
+            text, _ = backend.recognize(None)
+            bb.enqueue_voice_command(text, pressed=pressed)
+            time.sleep(SEND_INTERVAL)
+
+    p50, p95 = [], []
+    for _ in range(ROUNDS):
+        bb.metrics.reset()
+        executed.clear()
+        sender = threading.Thread(target=send)
+        sender.start()
+        while sender.is_alive() or bb.command_queue:
+            bb.drain_command_queue()  # o que o bpy.app.timers faria na thread principal
+            time.sleep(DRAIN_POLL)
+        sender.join()
+
+        total = bb.metrics.histograms['voice_total']
+        assert total.count == COMMANDS
+        assert executed == ["front", "back"] * (COMMANDS // 2)
+        p50.append(total.percentile(50) * 1000)
+        p95.append(total.percentile(95) * 1000)
+    results["dispatch_p50_ms"] = min(p50)
+    results["dispatch_p95_ms"] = min(p95)
+    check_baseline(bb, ["dispatch_p50_ms", "dispatch_p95_ms"])
@@ -0,0 +1,39 @@
+"""Vocabulário de voz: frase reconhecida -> ação"""
+import pytest
+
+PHRASES = [
+    ("cubo", 'cube'),
+    ("gerar cubo", 'cube'),
+    ("gera cubo", 'cube'),
+    ("gerar esfera", 'sphere'),
+    ("gravar cilindro", 'cylinder'),
+    ("travar cubo", 'cube'),
+    ("gerar imagem", 'render'),
+    ("gerar", 'render'),
+    ("gravar", 'render'),
+    ("renderizar", 'render'),
+    ("renderização", 'render'),
+    ("move up", 'up'),
+    ("sobe", 'up'),
+    ("frente", 'front'),
+    ("para trás", 'back'),
+    ("esquerda", 'left'),
+    ("textura", 'texture'),
+    ("cilindru", 'cylinder'),
+    ("bom dia", None),
+]
+
+
+@pytest.mark.parametrize("text, action", PHRASES)
+def test_phrase_resolves_to_action(bb, text, action):
+    assert bb.find_voice_command(text) == action
+
+
+def test_registry_is_extensible_with_generic_words(bb):
+    registry = bb.CommandRegistry()
+    registry.register('light', ['luz', 'acender'], lambda: None)
+    registry.register('camera', ['camera', 'câmera'], lambda: None)
+    assert registry.match("acender camera") == 'light'
+    registry.mark_generic("Acender")
+    assert registry.match("acender camera") == 'camera'
+    assert registry.match("acender") == 'light'
@@ -0,0 +1,81 @@
+"""Import e register() sem carregar a voz; tempos contra um orçamento fixo só sob pedido.
+
+Roda num interpretador novo: no processo do pytest o módulo já está em cache.
+Por padrão só confere que speech_recognition e o Google Cloud ficam fora de
+sys.modules depois do import e do register(). Com BITBLENDER_BENCHMARK=1 também
+compara os tempos com IMPORT_BUDGET e REGISTER_BUDGET.
+"""
+import json
+import os
+import subprocess
+import sys
+import types
+
+from conftest import TESTS_DIR
+from test_simulator import free_port
+
+IMPORT_BUDGET = 0.5    # segundos para importar o addon (numpy incluído)
+REGISTER_BUDGET = 0.1  # segundos para register() e para unregister()
+
+SCRIPT = """
+import json, sys, time
+sys.path[:0] = [{stubs!r}, {root!r}]
+
+def voice_modules():
+    return sorted(m for m in sys.modules if m.startswith(("speech_recognition", "google")))
+
+start = time.perf_counter()
+import BitBlender
+imported = time.perf_counter()
+after_import = voice_modules()
+BitBlender.UDP_PORTS = [{port}]
+BitBlender.register()
+registered = time.perf_counter()
+after_register = voice_modules()
+BitBlender.unregister()
+unregistered = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "register": registered - imported,
+    "unregister": unregistered - registered,
+    "after_import": after_import,
+    "after_register": after_register,
+}}))
+"""
+
+
+def measure():
+    script = SCRIPT.format(stubs=os.path.join(TESTS_DIR, "stubs"), root=os.path.dirname(TESTS_DIR),
+                           port=free_port())
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            check=True, timeout=30).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_import_and_register_do_not_load_voice():
+    measured = measure()
+    assert measured["after_import"] == []
+    assert measured["after_register"] == []
+    if os.environ.get("BITBLENDER_BENCHMARK"):
+        assert measured["import"] < IMPORT_BUDGET, measured
+        assert measured["register"] < REGISTER_BUDGET, measured
+        assert measured["unregister"] < REGISTER_BUDGET, measured
+
+
+def test_failed_voice_load_is_retried(bb, monkeypatch, tmp_path):
+    for name in ("sr", "voice_recognizer", "web_backend", "google_backend", "voice_loaded"):
+        monkeypatch.setattr(bb, name, getattr(bb, name))  # restaurados no fim do teste
+    monkeypatch.setattr(bb.keyword_spotter, "templates", list(bb.keyword_spotter.templates))
+    monkeypatch.setattr(bb, "GOOGLE_CREDENTIALS_PATH", str(tmp_path / "sem_credenciais.json"))
+    monkeypatch.setattr(bb, "KEYWORD_SAMPLES_DIR", str(tmp_path))
+
+    monkeypatch.setitem(sys.modules, "speech_recognition", None)  # import falha
+    assert not bb.load_voice_support()
+    assert not bb.voice_loaded
+
+    module = types.ModuleType("speech_recognition")
+    module.Recognizer = lambda: types.SimpleNamespace()
+    monkeypatch.setitem(sys.modules, "speech_recognition", module)
+    assert bb.load_voice_support()
+    assert bb.sr is module and bb.voice_loaded
+    assert bb.load_voice_support()
@@ -0,0 +1,45 @@
+"""Estágio de entrada do joystick: extrapolação entre pacotes e filtros"""
+import pytest
+
+
+def run(bb, filter_type, values, ticks_per_packet=5, packet_dt=0.1):
+    stage = bb.JoystickInputStage(filter_type)
+    outputs = []
+    for i, value in enumerate(values):
+        state = bb.JoystickState(x=value, timestamp=i * packet_dt)
+        for k in range(ticks_per_packet):
+            now = i * packet_dt + k * packet_dt / ticks_per_packet
+            outputs.append(stage.sample(state, now, packet_dt / ticks_per_packet)[0])
+    return outputs
+
+
+@pytest.mark.parametrize("filter_type", ['NONE', 'EXPONENTIAL', 'ONE_EURO'])
+def test_release_never_overshoots_center(bb, filter_type):
+    outputs = run(bb, filter_type, [0.8, 0.8, 0.8, 0.0, 0.0])
+    released = outputs[15:]
+    assert min(released) >= 0.0
+    assert all(b <= a for a, b in zip(released, released[1:]))  # só se aproxima do centro
+
+
+def test_push_is_extrapolated_away_from_center(bb):
+    outputs = run(bb, 'NONE', [0.0, 0.4])
+    assert outputs[5] == pytest.approx(0.4)
+    assert outputs[-1] > 0.4
+
+
+def test_sign_change_is_not_extrapolated(bb):
+    outputs = run(bb, 'NONE', [0.5, -0.5])
+    assert outputs[5:] == [-0.5] * 5
+
+
+@pytest.mark.parametrize("filter_type", ['NONE', 'ONE_EURO'])
+@pytest.mark.parametrize("device_ms", [(1000, 1100), (None, None)])
+def test_bunched_arrival_does_not_jump(bb, filter_type, device_ms):
+    # Enviados a 100 ms um do outro, chegaram com 2 ms de diferença (rajada do Wi-Fi)
+    stage = bb.JoystickInputStage(filter_type)
+    first = bb.JoystickState(x=0.2, device_ms=device_ms[0], timestamp=10.0)
+    second = bb.JoystickState(x=0.4, device_ms=device_ms[1], timestamp=10.002)
+    stage.sample(first, 10.0, bb.TICK_INTERVAL)
+    outputs = [stage.sample(second, 10.002 + k * bb.TICK_INTERVAL, bb.TICK_INTERVAL)[0] for k in range(6)]
+    # 0.2 por pacote de 100 ms: no horizonte de 100 ms o eixo vai no máximo a 0.6
+    assert max(outputs) <= 0.6 + 1e-9
@@ -0,0 +1,77 @@
+"""Reconhecimento local (MFCC + DTW) com "palavras" sintéticas de tons em sequência"""
+import numpy as np
+import pytest
+
+RATE = 16000
+WORDS = {
+    'cube': [400, 1200, 700],
+    'sphere': [2000, 600, 1500],
+    'cylinder': [900, 2500, 300],
+}
+
+
+def word(freqs, seconds=0.3, seed=0):
+    """Silêncio, um tom (com harmônico) por "sílaba", silêncio e um pouco de ruído"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * RATE)) / RATE
+    syllables = [0.5 * np.sin(2 * np.pi * f * t) + 0.3 * np.sin(2 * np.pi * 2.7 * f * t) for f in freqs]
+    gap = np.zeros(int(0.1 * RATE))
+    samples = np.concatenate([gap] + syllables + [gap])
+    return (samples + rng.normal(0, 0.005, len(samples))).astype(np.float32)
+
+
+class FakeAudio:
+    """O pedaço de sr.AudioData que audio_to_samples usa"""
+    def __init__(self, samples, rate=RATE):
+        self.sample_rate = rate
+        self._data = np.clip(samples * 32767, -32768, 32767).astype(np.int16).tobytes()
+
+    def get_raw_data(self, convert_width=2):
+        return self._data
+
+
+@pytest.fixture
+def spotter(bb):
+    spotter = bb.KeywordSpotter()
+    spotter.templates = [(action, spotter.features(word(freqs))) for action, freqs in WORDS.items()]
+    return spotter
+
+
+@pytest.mark.parametrize("action", list(WORDS))
+def test_same_word_matches(bb, spotter, action):
+    found, confidence = spotter.match(spotter.features(word(WORDS[action], seed=1)))
+    assert found == action and confidence >= bb.KWS_CONFIDENCE
+
+
+@pytest.mark.parametrize("seconds", [0.2, 0.45])
+def test_time_stretched_word_matches(bb, spotter, seconds):
+    stretched = spotter.features(word(WORDS['cube'], seconds=seconds, seed=2))
+    found, confidence = spotter.match(stretched)
+    assert found == 'cube' and confidence >= bb.KWS_CONFIDENCE
+    same = spotter.dtw_distance(stretched, spotter.templates[0][1])
+    other = spotter.dtw_distance(stretched, spotter.templates[1][1])
+    assert same < other / 2
+
+
+def test_noise_and_silence_are_rejected(bb, spotter):
+    noise = np.random.default_rng(3).normal(0, 0.3, RATE).astype(np.float32)
+    assert spotter.match(spotter.features(noise))[1] < bb.KWS_CONFIDENCE
+    assert spotter.match(spotter.features(word([5000] * 3)))[1] < bb.KWS_CONFIDENCE  # fora do vocabulário
+    assert spotter.features(np.zeros(RATE, dtype=np.float32)) is None
+    assert bb.KeywordBackend(spotter).recognize(FakeAudio(np.zeros(RATE))) is None
+
+
+def test_backend_resamples_captured_audio(bb, spotter):
+    samples = word(WORDS['sphere'], seed=4)
+    upsampled = np.interp(np.arange(len(samples) * 3) / 3, np.arange(len(samples)), samples)
+    text, confidence = bb.KeywordBackend(spotter).recognize(FakeAudio(upsampled, rate=48000))
+    assert text == 'sphere' and confidence >= bb.KWS_CONFIDENCE
+
+
+def test_empty_template_set(bb, tmp_path):
+    spotter = bb.KeywordSpotter()
+    assert spotter.load(str(tmp_path / "nada")) == 0
+    assert spotter.load(str(tmp_path)) == 0
+    assert spotter.spot(FakeAudio(word(WORDS['cube']))) == (None, 0.0)
+    assert spotter.match(spotter.features(word(WORDS['cube'])), []) == (None, 0.0)
+    assert bb.KeywordBackend(spotter).recognize(FakeAudio(word(WORDS['cube']))) is None
@@ -0,0 +1,59 @@
+"""Dezenas de placas simuladas ao mesmo tempo pelo IOCore real"""
+import math
+import socket
+import time
+
+from test_simulator import free_port, wait_for
+
+BOARDS = 40
+RATE = 50.0
+
+
+def test_many_boards_keep_separate_state(bb):
+    port = free_port()
+    bb.io_core.start([port])
+    boards = []
+    try:
+        for index in range(BOARDS):
+            board = bb.BoardSimulator(rate=RATE, port=port, amplitude=0.2 + 0.015 * index)
+            board.buttons = bb.BUTTON_JOYSTICK if index % 2 else 0
+            board.start()
+            boards.append(board)
+
+        assert wait_for(lambda: all(b.address in bb.devices for b in boards), timeout=5.0)
+        time.sleep(1.0)
+        assert wait_for(lambda: all(bb.devices[b.address].packets >= b.sent * 0.95 for b in boards), timeout=5.0)
+
+        assert set(bb.devices) == {b.address for b in boards}
+        assert len({d.area_index for d in bb.devices.values()}) == BOARDS
+        for index, board in enumerate(boards):
+            device = bb.devices[board.address]
+            assert device.packets >= RATE * 0.5
+            assert device.lost == 0
+            state = device.state
+            assert state.seq is not None and state.timestamp > 0
+            assert state.button == bool(index % 2)
+            # Cada placa descreve um círculo de raio próprio: estados cruzados apareceriam aqui
+            vrx, vry = device.raw
+            radius = math.hypot(vrx - 2048, vry - 2048)
+            assert abs(radius - board.amplitude * 2047) <= 3
+    finally:
+        for board in boards:
+            board.stop()
+
+
+def test_garbage_datagram_creates_no_device(bb):
+    assert bb.parse_packet(b"garbage") is None
+    assert bb.parse_packet(b"BTN=pressionado") is None
+    assert bb.parse_packet(b"VRX=100 VRY=4000 BTN=pressionado")[2:5] == (100, 4000, bb.BUTTON_JOYSTICK)
+
+    port = free_port()
+    bb.io_core.start([port])
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.sendto(b"garbage", ("127.0.0.1", port))
+        sock.sendto(b"\x00\x01\x02", ("127.0.0.1", port))
+        time.sleep(0.3)
+        assert not bb.devices
+        sock.sendto(b"VRX=2048 VRY=2048", ("127.0.0.1", port))
+        assert wait_for(lambda: sock.getsockname() in bb.devices)
@@ -0,0 +1,44 @@
+"""Modal de navegação: ticks só no timer do próprio operador"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+TIMER = SimpleNamespace(type='TIMER')
+
+
+@pytest.fixture
+def operator(bb, context, monkeypatch):
+    monkeypatch.setattr(bb, "modal_operator_instance", None)
+    monkeypatch.setattr(context, "window", SimpleNamespace(), raising=False)
+    operator = bb.VIEW3D_OT_JoystickNavigation()
+    assert operator.execute(context) == {'RUNNING_MODAL'}
+    operator.ticks = 0
+
+    def find_areas(context):
+        operator.ticks += 1
+        return []
+    monkeypatch.setattr(operator, "_find_areas", find_areas)
+    return operator
+
+
+def test_foreign_timer_events_do_not_tick(bb, context, operator):
+    operator._set_interval(context, bb.IDLE_TICK_INTERVAL)
+    for _ in range(5):
+        time.sleep(bb.IDLE_TICK_INTERVAL * 0.6)  # outro operador com timer mais rápido
+        assert operator.modal(context, TIMER) == {'PASS_THROUGH'}
+    assert operator.ticks == 0
+
+    operator._timer.fire()
+    operator.modal(context, TIMER)
+    operator.modal(context, TIMER)  # outro TIMER no mesmo ciclo de eventos
+    assert operator.ticks == 1
+
+
+def test_new_timer_after_interval_change_ticks(bb, context, operator):
+    operator._timer.fire()
+    operator.modal(context, TIMER)
+    operator._set_interval(context, bb.IDLE_TICK_INTERVAL)  # timer novo, time_duration de volta a zero
+    operator._timer.fire()
+    operator.modal(context, TIMER)
+    assert operator.ticks == 2
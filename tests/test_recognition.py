@@ -0,0 +1,49 @@
+"""Reconhecimento em paralelo com motores falsos de atraso conhecido"""
+import time
+
+import pytest
+
+
+@pytest.fixture
+def orchestrator(bb):
+    orchestrator = bb.RecognitionOrchestrator()
+    yield orchestrator
+    orchestrator.shutdown()
+
+
+def test_first_confident_result_wins(bb, orchestrator):
+    fast = bb.FakeSpeechBackend(["frente"], latency=0.01, confidence=0.3, name="rápido")
+    medium = bb.FakeSpeechBackend(["trás"], latency=0.05, confidence=0.9, name="médio")
+    slow = bb.FakeSpeechBackend(["frente"], latency=0.5, confidence=0.95, name="lento")
+
+    start = time.perf_counter()
+    backend, text, action = orchestrator.recognize(None, [slow, fast, medium])
+    elapsed = time.perf_counter() - start
+
+    assert (backend, text, action) == (medium, "trás", 'back')
+    assert elapsed < slow.latency / 2  # não esperou o lento
+    rows = {row["motor"]: row for row in orchestrator.rows()}
+    assert rows["médio"]["vitorias"] == 1 and rows["lento"]["vitorias"] == 0
+
+
+def test_low_confidence_result_is_used_when_nobody_is_confident(bb, orchestrator):
+    fast = bb.FakeSpeechBackend(["frente"], latency=0.01, confidence=0.3, name="rápido")
+    noise = bb.FakeSpeechBackend(["bom dia"], latency=0.02, confidence=0.9, name="ruído")
+    backend, _, action = orchestrator.recognize(None, [fast, noise])
+    assert (backend, action) == (fast, 'front')
+
+
+def test_errors_and_timeouts(bb, orchestrator):
+    class Broken(bb.RecognizerBackend):
+        name = "quebrado"
+
+        def recognize(self, audio):
+            raise RuntimeError("sem rede")
+
+    assert orchestrator.recognize(None, [Broken()]) is None
+    hung = bb.FakeSpeechBackend(["frente"], latency=1.0, name="travado")
+    start = time.perf_counter()
+    assert orchestrator.recognize(None, [hung], timeout=0.1) is None
+    assert time.perf_counter() - start < 0.5
+    rows = {row["motor"]: row for row in orchestrator.rows()}
+    assert rows["quebrado"]["erros"] == 1
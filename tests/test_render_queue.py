@@ -0,0 +1,16 @@
+"""Fila de renderização: um único timer por fila, mesmo com vários envios"""
+import bpy
+
+
+def test_submit_registers_one_removable_timer(bb, context, monkeypatch):
+    monkeypatch.setattr(bpy.data, "filepath", "", raising=False)
+    monkeypatch.setattr(bb.RenderQueue, "_capture_view", staticmethod(lambda context: None))
+    queue = bb.RenderQueue()
+    before = len(bpy.app.timers.functions)
+
+    assert queue.submit(context) and queue.submit(context)
+    assert len(bpy.app.timers.functions) == before + 1
+    assert bpy.app.timers.is_registered(queue._update)
+
+    bpy.app.timers.unregister(queue._update)
+    assert len(bpy.app.timers.functions) == before
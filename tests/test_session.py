@@ -0,0 +1,127 @@
+"""Sessão gravada: gravar, reproduzir pelo modal e converter em animação da câmera"""
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import FakeArea
+from mathutils import Quaternion, Vector
+
+TIMER = SimpleNamespace(type='TIMER')
+TICKS = 60
+FPS = 25
+
+
+class FakeKeyframes(list):
+    def add(self, count):
+        self.extend(SimpleNamespace(co=[0.0, 0.0]) for _ in range(count))
+
+    def remove(self, key, fast=False):
+        list.remove(self, key)
+
+    def foreach_get(self, attribute, values):
+        values[:] = [c for key in self for c in key.co]
+
+    def foreach_set(self, attribute, values):
+        for i, key in enumerate(self):
+            key.co = list(values[2 * i:2 * i + 2])
+
+
+class FakeAction:
+    def __init__(self):
+        self.curves = {}
+
+    @property
+    def fcurves(self):
+        return self
+
+    def find(self, data_path, index=0):
+        return self.curves.get((data_path, index))
+
+    def new(self, data_path, index=0, action_group=""):
+        curve = SimpleNamespace(keyframe_points=FakeKeyframes(), update=lambda: None)
+        self.curves[(data_path, index)] = curve
+        return curve
+
+
+@pytest.fixture
+def navigation(bb, context, monkeypatch):
+    """Modal com uma área 3D e um relógio que anda um TICK_INTERVAL por tick"""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(bb.time, "monotonic", lambda: clock.now)
+    monkeypatch.setattr(bb, "modal_operator_instance", None)
+    monkeypatch.setattr(bb, "session_recorder", None)
+    monkeypatch.setattr(bb, "session_player", None)
+    monkeypatch.setattr(context, "window", SimpleNamespace(), raising=False)
+    area = FakeArea()
+    region = area.spaces.active.region_3d
+    region.view_location = Vector((1.0, 2.0, 3.0))
+
+    operator = bb.VIEW3D_OT_JoystickNavigation()
+    assert operator.execute(context) == {'RUNNING_MODAL'}
+    operator._find_areas = lambda context: [area]
+
+    def tick():
+        clock.now += bb.TICK_INTERVAL
+        operator._timer.fire()
+        operator.modal(context, TIMER)
+    return SimpleNamespace(clock=clock, region=region, tick=tick)
+
+
+def test_record_replay_bake_round_trip(bb, context, navigation, tmp_path):
+    path = str(tmp_path / "sessao.bblog")
+    device = bb.ControllerDevice(("10.0.0.2", 4210), 0)
+    bb.devices[device.address] = device
+    wm = context.window_manager
+
+    recorder = bb.VIEW3D_OT_RecordSession()
+    recorder.filepath = path
+    assert recorder.execute(context) == {'FINISHED'}
+    for i in range(TICKS):
+        wm.joystick_mode = 'FREE' if i < TICKS // 2 else 'ORBIT'
+        if i % 3 == 0:  # um pacote a cada três ticks
+            x, y = (0.6, -0.4) if i < TICKS // 2 else (-0.8, 0.0)
+            device.state = bb.JoystickState(x=x, y=y, timestamp=navigation.clock.now)
+        navigation.tick()
+    assert recorder.execute(context) == {'FINISHED'}
+    assert bb.session_recorder is None
+
+    recorded_location = navigation.region.view_location.copy()
+    recorded_rotation = navigation.region.view_rotation.copy()
+    assert (recorded_location - Vector((1.0, 2.0, 3.0))).length > 0.1
+    assert recorded_rotation.rotation_difference(Quaternion()).angle > 0.01
+
+    # A reprodução parte de outra vista e de nenhuma placa
+    bb.devices.clear()
+    navigation.region.view_location = Vector((0.0, 0.0, 0.0))
+    navigation.region.view_rotation = Quaternion()
+    replay = bb.VIEW3D_OT_ReplaySession()
+    replay.filepath = path
+    replay.speed = 1.0
+    assert replay.execute(context) == {'FINISHED'}
+    player = bb.session_player
+    assert len(player.records) == TICKS
+    for _ in range(2 * TICKS):
+        if bb.session_player is None:
+            break
+        navigation.tick()
+    assert bb.session_player is None
+    assert player.index == TICKS
+    assert player.max_error < 1e-5  # só o arredondamento float32 do log
+    assert (navigation.region.view_location - recorded_location).length < 1e-5
+    angle = navigation.region.view_rotation.rotation_difference(recorded_rotation).angle
+    assert min(angle, 2 * math.pi - angle) < 1e-5
+
+    camera = SimpleNamespace(name="Camera", rotation_mode='XYZ',
+                             animation_data=SimpleNamespace(action=FakeAction()))
+    scene = SimpleNamespace(render=SimpleNamespace(fps=FPS, fps_base=1.0), frame_current=10)
+    frames = bb.bake_session(path, camera, scene)
+    # (TICKS - 1) ticks de 20 ms = 1,18 s: frames em 0, 0,04 ... 1,16 s
+    assert frames == 30
+    assert camera.rotation_mode == 'QUATERNION'
+    curves = camera.animation_data.action.curves
+    assert sorted(curves) == [("location", i) for i in range(3)] + [("rotation_quaternion", i) for i in range(4)]
+    for curve in curves.values():
+        keys = [key.co[0] for key in curve.keyframe_points]
+        assert len(keys) == frames
+        assert (keys[0], keys[-1]) == (10.0, 10.0 + frames - 1)
@@ -0,0 +1,104 @@
+"""Firmware simulado contra o IOCore real: taxa, perda e reordenação chegam à tabela de placas"""
+import socket
+import time
+
+import pytest
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_frame_round_trip(bb):
+    board = bb.BoardSimulator(amplitude=0.8, period=4.0)
+    board.buttons = bb.BUTTON_JOYSTICK
+    seq, device_ms, vrx, vry, buttons, presses = bb.parse_packet(board.frame(7, 1.0))
+    assert (seq, device_ms, buttons, presses) == (7, 1000, bb.BUTTON_JOYSTICK, None)
+    assert 0 <= vrx <= bb.ADC_MAX and 0 <= vry <= bb.ADC_MAX
+
+
+def test_failing_socket_is_bounded_per_wakeup(bb, capsys):
+    class ResetSocket:
+        calls = 0
+
+        def recvfrom_into(self, buffer):
+            self.calls += 1
+            raise ConnectionResetError("porta inalcançável")  # ICMP no Windows
+
+    sock = ResetSocket()
+    bb.io_core._drain(sock)
+    assert sock.calls == bb.UDP_DRAIN_MAX
+    assert capsys.readouterr().out.count("Erro UDP") == 1
+
+
+def test_early_reboot_is_accepted(bb):
+    board = bb.BoardSimulator()
+    address = ("127.0.0.1", 9100)
+    for seq in range(500):  # 50 s de uptime: menos que SEQ_RESET_WINDOW pacotes
+        assert bb.accept_datagram(board.frame(seq, seq * 0.1), address, 100.0 + seq * 0.1)
+    device = bb.devices[address]
+    assert not bb.accept_datagram(board.frame(498, 49.8), address, 150.0)  # atrasado: descartado
+
+    # Reiniciou: sequência e relógio da placa recomeçam
+    assert bb.accept_datagram(board.frame(0, 3.0), address, 155.0)
+    assert bb.accept_datagram(board.frame(1, 3.1), address, 155.1)
+    assert device.last_seq == 1 and device.lost == 0
+
+
+def test_long_silence_resets_the_sequence(bb):
+    board = bb.BoardSimulator()
+    address = ("127.0.0.1", 9101)
+    assert bb.accept_datagram(board.frame(500, 50.0), address, 100.0)
+    assert not bb.accept_datagram(board.frame(400, 49.9), address, 101.0)
+    assert bb.accept_datagram(board.frame(400, 49.9), address, 101.0 + bb.DEVICE_TIMEOUT + 1.0)
+
+
+def test_voice_button_bypasses_the_main_thread(bb, monkeypatch):
+    sessions = []
+    monkeypatch.setattr(bb, "voice_session", sessions.append)
+    port = free_port()
+    bb.io_core.start([port])
+    board = bb.BoardSimulator(rate=50.0, port=port)
+    board.buttons = bb.BUTTON_VOICE | bb.BUTTON_JOYSTICK
+    board.start()
+    try:
+        # Ninguém roda drain_button_events: a sessão sai só da thread de rede
+        assert wait_for(lambda: sessions)
+        time.sleep(0.2)
+    finally:
+        board.stop()
+    assert len(sessions) == 1  # um toque, mesmo com o botão segurado
+    assert [event.button for event in bb.button_events] == [bb.BUTTON_JOYSTICK]
+
+
+@pytest.mark.parametrize("rate, loss, reorder", [(10.0, 0.0, 0.0), (2000.0, 0.1, 0.05)])
+def test_simulated_board_through_iocore(bb, rate, loss, reorder):
+    port = free_port()
+    bb.io_core.start([port])
+    board = bb.BoardSimulator(rate=rate, loss=loss, reorder=reorder, port=port)
+    board.start()
+    try:
+        assert wait_for(lambda: board.address in bb.devices)
+        time.sleep(1.0)
+        device = bb.devices[board.address]
+        assert wait_for(lambda: device.packets >= board.sent * 0.99)
+        packets, lost = device.packets, device.lost
+        state = device.state
+    finally:
+        board.stop()
+
+    total = packets + lost
+    assert total == pytest.approx(rate * 1.0, rel=0.3)
+    # Um pacote trocado de lugar chega depois do seguinte e é descartado: conta como perda
+    assert lost / total == pytest.approx(loss + (1 - loss) * reorder, abs=0.05)
+    assert state.seq is not None and state.timestamp > 0
+    assert -1.0 <= state.x <= 1.0 and -1.0 <= state.y <= 1.0
@@ -0,0 +1,55 @@
+"""Streaming com o motor falso: um parcial estável age antes do resultado final"""
+import time
+
+from conftest import FakeCapture, FakeStreamingBackend
+
+
+def test_stable_partial_is_acted_on_before_the_final(bb, voice_thread):
+    streaming = FakeStreamingBackend([
+        (0.05, "cu", False, 0.1),        # instável
+        (0.05, "bom dia", False, 0.9),   # estável, mas não é comando
+        (0.05, "cubo", False, 0.9),
+        (1.0, "cubo", True, 1.0),
+    ])
+    start = time.perf_counter()
+    assert bb.stream_voice_command(streaming, FakeCapture(speech_seconds=2.0)) == "cubo"
+    assert time.perf_counter() - start < 0.5
+    assert streaming.delivered == 3  # o final nunca foi esperado
+    assert [command.action for command in bb.command_queue] == ['cube']
+
+
+def test_final_is_used_when_no_partial_is_stable(bb, voice_thread):
+    streaming = FakeStreamingBackend([(0.05, "cu", False, 0.1), (0.05, "esfera", True, 0.9)])
+    assert bb.stream_voice_command(streaming, FakeCapture(speech_seconds=2.0)) == "esfera"
+    assert [command.action for command in bb.command_queue] == ['sphere']
+
+
+def test_stream_ends_without_result_when_audio_stops(bb, voice_thread):
+    streaming = FakeStreamingBackend([(1.0, "cubo", True, 1.0)])
+    assert bb.stream_voice_command(streaming, FakeCapture(speech_seconds=2.0), timeout=0.1,
+                                   phrase_time_limit=0.1) is None
+    assert streaming.delivered == 0 and not bb.command_queue
+
+
+def test_stable_streaming_partial_beats_the_recorded_phrase(bb, session):
+    capture = FakeCapture(speech_seconds=1.0)
+    streaming = FakeStreamingBackend([(0.05, "cu", False, 0.1), (0.05, "cubo", False, 0.9),
+                                         (1.0, "cubo", True, 1.0)])
+    batch = bb.FakeSpeechBackend(["esfera"], latency=0.01)
+    start = time.perf_counter()
+    assert session(capture, streaming, batch) == ['cube']
+    assert time.perf_counter() - start < 0.5
+    assert capture.cancelled  # a gravação parou assim que o streaming agiu
+    assert batch._index == 0
+
+
+def test_recorded_phrase_beats_slow_streaming(bb, session):
+    capture = FakeCapture(speech_seconds=0.1)
+    streaming = FakeStreamingBackend([(2.0, "cubo", True, 1.0)])
+    batch = bb.FakeSpeechBackend(["esfera"], latency=0.02)
+    start = time.perf_counter()
+    assert session(capture, streaming, batch) == ['sphere']
+    assert time.perf_counter() - start < 1.0
+    assert streaming.delivered == 0  # parou de receber áudio quando a frase venceu
+    rows = {row["motor"]: row for row in bb.recognition.rows()}
+    assert rows["Simulado"]["vitorias"] == 1